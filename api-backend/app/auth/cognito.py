@@ -1,8 +1,15 @@
 import requests
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 from fastapi import HTTPException,Depends
 from fastapi.security import HTTPBearer,HTTPAuthorizationCredentials
-from jose import jwt
+from jose import jwt, jwk
+from jose.backends.base import Key
+from starlette.concurrency import run_in_threadpool
 
 
 
@@ -13,12 +20,118 @@ COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID","us-east-1_1Qfz8qLsw")
 COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID","3o46972ns1ataqhvnf1jm19sdp")
 
 JWKS_URL = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}/.well-known/jwks.json"
-
-jwks = requests.get(JWKS_URL).json()
+ISSUER = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}"
+
+JWKS_TTL_SECONDS = int(os.getenv("JWKS_TTL_SECONDS", "3600"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "3"))
+# An unknown kid triggers at most one JWKS refetch per interval, so forged kids cannot flood Cognito
+JWKS_MIN_REFRESH_SECONDS = 30
+CLAIMS_CACHE_SIZE = 1024
+# Cognito subs (comma separated) allowed to use admin routes such as listing every user
+ADMIN_USER_IDS = frozenset(user_id.strip() for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip())
+
+
+class JWKSCache:
+    """Cognito signing keys, fetched on first use and kept for JWKS_TTL_SECONDS.
+
+    An unknown kid forces a refresh (rate limited) to pick up rotated keys,
+    and public keys are constructed once per kid instead of on every decode.
+    """
+
+    def __init__(self, url: str, ttl: int = JWKS_TTL_SECONDS):
+        self.url = url
+        self.ttl = ttl
+        self._jwks: dict[str, dict] = {}
+        self._keys: dict[str, Key] = {}
+        self._loaded_at: Optional[float] = None
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def cached_key(self, kid: str) -> Optional[Key]:
+        """Return the constructed key without any I/O, or None when a fetch may be needed"""
+        return self._keys.get(kid) if self._is_fresh() else None
+
+    def _refresh(self, force: bool) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._is_fresh():
+                return
+            if force and now - self._last_attempt < JWKS_MIN_REFRESH_SECONDS:
+                return
+            self._last_attempt = now
+            try:
+                response = requests.get(self.url, timeout=JWKS_FETCH_TIMEOUT)
+                response.raise_for_status()
+                jwks = {key["kid"]: key for key in response.json()["keys"]}
+            except Exception as e:
+                if not self._jwks:
+                    raise
+                # Keep serving the previous keys if Cognito is briefly unreachable
+                print(f"Error refreshing JWKS, using cached keys: {e}")
+                return
+            # Constructed keys survive a refresh only if their JWK is unchanged
+            self._keys = {kid: key for kid, key in self._keys.items() if jwks.get(kid) == self._jwks.get(kid)}
+            self._jwks = jwks
+            self._loaded_at = now
+
+    def get_key(self, kid: str) -> Optional[Key]:
+        """Return the public key for kid, fetching the JWKS when stale or when kid is unknown"""
+        if not self._is_fresh():
+            self._refresh(force=False)
+        if kid not in self._jwks:
+            self._refresh(force=True)
+        key = self._keys.get(kid)
+        if key is None and kid in self._jwks:
+            key = jwk.construct(self._jwks[kid], "RS256")
+            self._keys[kid] = key
+        return key
+
+
+class ClaimsCache:
+    """Recently verified token claims, kept until the token's exp (bounded LRU)"""
+
+    def __init__(self, max_size: int = CLAIMS_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                return None
+            if claims.get("exp", 0) <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+jwks_cache = JWKSCache(JWKS_URL)
+claims_cache = ClaimsCache()
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security))->str:
     try:
         token = credentials.credentials
+        claims = claims_cache.get(token)
+        if claims is not None:
+            return claims["sub"]
         print(f"Received token: {token[:20]}...")
         try:
           header = jwt.get_unverified_header(token)
@@ -29,7 +142,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         kid = header["kid"]
         if not kid:
             raise HTTPException(status_code=401, detail="Token missing key id")
-        key = next((k for k in jwks["keys"] if k["kid"] == kid), None)
+        key = jwks_cache.cached_key(kid)
+        if key is None:
+            # Fetching the JWKS blocks, so it runs off the event loop
+            key = await run_in_threadpool(jwks_cache.get_key, kid)
         if not key:
             raise HTTPException(status_code=401, detail="Token key not found")
         
@@ -38,18 +154,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             key,
             algorithms=["RS256"],
             audience=COGNITO_CLIENT_ID,
-            issuer=f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}",
+            issuer=ISSUER,
         )
+        claims_cache.put(token, decoded)
         return decoded["sub"]
     except Exception as e:
         print(f"Error decoding token: {e}")
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
-
-
-
-
-
-
-
+async def get_admin_user(current_user_id: str = Depends(get_current_user)) -> str:
+    if current_user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user_id
@@ -0,0 +1,332 @@
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+import boto3
+from botocore.exceptions import ClientError
+from app.utils.timestamps import to_utc_naive
+
+
+# Where aged logs are archived: "s3://bucket/prefix" or a local directory.
+# Empty disables the archive and every read goes to DynamoDB only.
+ARCHIVE_LOCATION = os.getenv('ARCHIVE_LOCATION', '')
+# Logs older than this many days move from DynamoDB to the archive
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '30'))
+# Manifests are re-read after this many seconds so new partitions show up
+ARCHIVE_MANIFEST_TTL = float(os.getenv('ARCHIVE_MANIFEST_TTL', '60'))
+
+# Partition file layout: MAGIC, a little-endian uint32 header length, a JSON
+# header and then one zlib-compressed block per column. The header gives each
+# column's type, offset and length so readers fetch only the columns they need.
+MAGIC = b'BSLA1'
+_PREFIX = struct.Struct('<5sI')
+# First read of a partition; large enough for the header in one request
+HEADER_PROBE_BYTES = 4096
+# Column ranges closer together than this are fetched in one request
+RANGE_MERGE_GAP = 64 * 1024
+_EPOCH = datetime(1970, 1, 1)
+_MISSING_INT = -1
+_BOOL_CODES = {None: 2, False: 0, True: 1}
+_BOOL_VALUES = (False, True, None)
+
+# Every archived log attribute and its column type. endpoint_id and user_id
+# come from the partition path, and secure_protocol mirrors is_secure.
+COLUMN_TYPES = {
+    'timestamp': 'timestamp',
+    'region': 'str',
+    'log_id': 'str',
+    'status_code': 'int',
+    'response_time': 'float',
+    'dns_latency': 'float',
+    'connection_latency': 'float',
+    'tls_handshake_latency': 'float',
+    'ttfb': 'float',
+    'total_latency': 'float',
+    'is_up': 'bool',
+    'certificate_valid': 'bool',
+    'certificate_expiry_date': 'str',
+    'certificate_issuer': 'str',
+    'tls_version': 'str',
+    'error_message': 'str',
+    'is_secure': 'bool',
+    'measurement_mode': 'str',
+    'connection_reused': 'bool',
+}
+# Always read: rows are filtered and ordered by them
+KEY_COLUMNS = ('timestamp', 'region')
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _timestamp_micros(value: str) -> int:
+    delta = datetime.fromisoformat(value) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _encode_column(kind: str, values: list) -> bytes:
+    if kind == 'timestamp':
+        # Sorted microseconds delta-encoded: successive checks compress to a few bytes
+        micros = [_timestamp_micros(value) for value in values]
+        raw = _little_endian(array('q', [b - a for a, b in zip([0] + micros, micros)])).tobytes()
+    elif kind == 'float':
+        raw = _little_endian(array('d', [float('nan') if value is None else float(value) for value in values])).tobytes()
+    elif kind == 'int':
+        raw = _little_endian(array('i', [_MISSING_INT if value is None else int(value) for value in values])).tobytes()
+    elif kind == 'bool':
+        raw = bytes(_BOOL_CODES[None if value is None else bool(value)] for value in values)
+    else:
+        # Dictionary encoding: distinct values once, then one index per row
+        dictionary = {}
+        indices = array('I', [dictionary.setdefault(value, len(dictionary)) for value in values])
+        encoded = json.dumps(list(dictionary)).encode('utf-8')
+        raw = struct.pack('<I', len(encoded)) + encoded + _little_endian(indices).tobytes()
+    return zlib.compress(raw, 6)
+
+
+def _decode_column(kind: str, block: bytes) -> list:
+    raw = zlib.decompress(block)
+    if kind == 'timestamp':
+        micros, total = _little_endian(array('q', raw)), 0
+        values = []
+        for delta in micros:
+            total += delta
+            values.append((_EPOCH + timedelta(microseconds=total)).isoformat())
+        return values
+    if kind == 'float':
+        return [None if value != value else value for value in _little_endian(array('d', raw))]
+    if kind == 'int':
+        return [None if value == _MISSING_INT else value for value in _little_endian(array('i', raw))]
+    if kind == 'bool':
+        return [_BOOL_VALUES[code] for code in raw]
+    length = struct.unpack_from('<I', raw)[0]
+    dictionary = json.loads(raw[4:4 + length])
+    return [dictionary[index] for index in _little_endian(array('I', raw[4 + length:]))]
+
+
+def encode_partition(items: list[dict]) -> tuple[bytes, dict]:
+    """Encode log items into one partition file; returns (file bytes, header)"""
+    items = sorted(items, key=lambda item: f"{item['timestamp']}#{item.get('region')}")
+    blocks = []
+    columns = {}
+    offset = 0
+    for name, kind in COLUMN_TYPES.items():
+        block = _encode_column(kind, [item.get(name) for item in items])
+        columns[name] = {'type': kind, 'offset': offset, 'length': len(block)}
+        blocks.append(block)
+        offset += len(block)
+    header = {
+        'rows': len(items),
+        'min_timestamp': items[0]['timestamp'] if items else None,
+        'max_timestamp': items[-1]['timestamp'] if items else None,
+        'columns': columns
+    }
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    return _PREFIX.pack(MAGIC, len(encoded)) + encoded + b''.join(blocks), header
+
+
+class LocalStore:
+    """Archive objects as files under a directory, for local runs"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(data)
+        os.replace(path + '.tmp', path)
+
+    def get(self, key: str, start: int = 0, end: Optional[int] = None) -> Optional[bytes]:
+        """Bytes [start, end) of an object, or None if it does not exist"""
+        try:
+            with open(os.path.join(self.root, key), 'rb') as file:
+                file.seek(start)
+                return file.read() if end is None else file.read(end - start)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(os.path.join(self.root, key))
+        except FileNotFoundError:
+            pass
+
+
+class S3Store:
+    """Archive objects in an S3 (or S3-compatible) bucket under a prefix"""
+
+    def __init__(self, bucket: str, prefix: str = ''):
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.s3 = boto3.client('s3', endpoint_url=os.getenv('ARCHIVE_S3_ENDPOINT_URL') or None)
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}/{key}' if self.prefix else key
+
+    def put(self, key: str, data: bytes) -> None:
+        self.s3.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def get(self, key: str, start: int = 0, end: Optional[int] = None) -> Optional[bytes]:
+        """Bytes [start, end) of an object, or None if it does not exist"""
+        kwargs = {'Bucket': self.bucket, 'Key': self._key(key)}
+        if start or end is not None:
+            kwargs['Range'] = f"bytes={start}-{'' if end is None else end - 1}"
+        try:
+            return self.s3.get_object(**kwargs)['Body'].read()
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return None
+            raise
+
+    def delete(self, key: str) -> None:
+        self.s3.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+def open_store(location: str = ARCHIVE_LOCATION):
+    if not location:
+        return None
+    if location.startswith('s3://'):
+        bucket, _, prefix = location[len('s3://'):].partition('/')
+        return S3Store(bucket, prefix)
+    return LocalStore(location)
+
+
+store = open_store()
+_manifests: dict[str, tuple[float, dict]] = {}
+_manifests_lock = threading.Lock()
+
+
+def endpoint_prefix(user_id: str, endpoint_id: str) -> str:
+    return f'{user_id}/{endpoint_id}'
+
+
+def partition_key(user_id: str, endpoint_id: str, day: str) -> str:
+    return f'{endpoint_prefix(user_id, endpoint_id)}/{day}.bsla'
+
+
+def empty_manifest() -> dict:
+    return {'archived_through': None, 'partitions': {}}
+
+
+def load_manifest(user_id: str, endpoint_id: str, use_cache: bool = True) -> dict:
+    """An endpoint's manifest: archived_through and a header summary per day partition.
+
+    Everything before archived_through is in the archive and nothing after
+    it is; partitions are only listed once they are fully written.
+    """
+    if store is None:
+        return empty_manifest()
+    key = f'{endpoint_prefix(user_id, endpoint_id)}/manifest.json'
+    now = time.monotonic()
+    with _manifests_lock:
+        cached = _manifests.get(key)
+    if use_cache and cached is not None and cached[0] > now:
+        return cached[1]
+    data = store.get(key)
+    manifest = json.loads(data) if data else empty_manifest()
+    with _manifests_lock:
+        _manifests[key] = (now + ARCHIVE_MANIFEST_TTL, manifest)
+    return manifest
+
+
+def save_manifest(user_id: str, endpoint_id: str, manifest: dict) -> None:
+    key = f'{endpoint_prefix(user_id, endpoint_id)}/manifest.json'
+    store.put(key, json.dumps(manifest, separators=(',', ':')).encode('utf-8'))
+    with _manifests_lock:
+        _manifests[key] = (time.monotonic() + ARCHIVE_MANIFEST_TTL, manifest)
+
+
+def archived_through(user_id: str, endpoint_id: str) -> Optional[datetime]:
+    """Time before which this endpoint's logs live in the archive, or None"""
+    value = load_manifest(user_id, endpoint_id)['archived_through']
+    return datetime.fromisoformat(value) if value else None
+
+
+def _read_partition(key: str, columns: tuple[str, ...]) -> dict[str, list]:
+    """Decode the named columns of one partition file, fetching only their byte ranges"""
+    head = store.get(key, 0, HEADER_PROBE_BYTES)
+    if head is None:
+        raise RuntimeError(f'Archive partition {key} is listed in the manifest but missing')
+    magic, header_length = _PREFIX.unpack_from(head)
+    if magic != MAGIC:
+        raise RuntimeError(f'Archive partition {key} has an unknown format')
+    data_start = _PREFIX.size + header_length
+    if len(head) < data_start:
+        head += store.get(key, len(head), data_start)
+    header = json.loads(head[_PREFIX.size:data_start])
+    wanted = sorted(
+        ((name, header['columns'][name]) for name in columns if name in header['columns']),
+        key=lambda entry: entry[1]['offset']
+    )
+    # Merge nearby column blocks so a request reads in as few ranges as possible
+    ranges = []
+    for name, column in wanted:
+        start, end = column['offset'], column['offset'] + column['length']
+        if ranges and start - ranges[-1][1] <= RANGE_MERGE_GAP:
+            ranges[-1][1] = end
+            ranges[-1][2].append((name, column))
+        else:
+            ranges.append([start, end, [(name, column)]])
+    decoded = {}
+    for start, end, members in ranges:
+        data = store.get(key, data_start + start, data_start + end)
+        for name, column in members:
+            offset = column['offset'] - start
+            decoded[name] = _decode_column(column['type'], data[offset:offset + column['length']])
+    return decoded
+
+
+def _day_bounds(day: str) -> tuple[datetime, datetime]:
+    start = datetime.fromisoformat(day)
+    return start, start + timedelta(days=1)
+
+
+def iter_archived_logs(endpoint_id: str, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, columns: Optional[tuple[str, ...]] = None, newest_first: bool = False, before_key: Optional[str] = None) -> Iterator[list[dict]]:
+    """Yield archived log items in [start_date, end_date] one day partition at a time.
+
+    Partitions outside the range are skipped using the manifest alone, and
+    only the requested columns (all by default) are read. Items look like
+    the DynamoDB items they were compacted from, including timestamp_key.
+    before_key continues a newest-first read below a "<timestamp>#<region>" key.
+    """
+    if store is None:
+        return
+    manifest = load_manifest(user_id, endpoint_id)
+    start = to_utc_naive(start_date) if start_date else None
+    end = to_utc_naive(end_date) if end_date else None
+    selected = tuple(dict.fromkeys(KEY_COLUMNS + tuple(columns or COLUMN_TYPES)))
+    start_text = start.isoformat() if start else ''
+    end_text = f'{end.isoformat()}#~' if end else '~'
+    for day in sorted(manifest['partitions'], reverse=newest_first):
+        day_start, day_end = _day_bounds(day)
+        if (start and day_end <= start) or (end and day_start > end):
+            continue
+        if before_key and day_start.isoformat() >= before_key:
+            continue
+        decoded = _read_partition(partition_key(user_id, endpoint_id, day), selected)
+        items = []
+        for row in zip(*(decoded.get(name, [None] * manifest['partitions'][day]['rows']) for name in selected)):
+            item = {name: value for name, value in zip(selected, row) if value is not None}
+            item['timestamp_key'] = f"{item['timestamp']}#{item.get('region')}"
+            if not start_text <= item['timestamp_key'] <= end_text:
+                continue
+            if before_key and item['timestamp_key'] >= before_key:
+                continue
+            item['endpoint_id'] = endpoint_id
+            item['user_id'] = user_id
+            items.append(item)
+        if newest_first:
+            items.reverse()
+        if items:
+            yield items
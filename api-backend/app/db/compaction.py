@@ -0,0 +1,172 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from boto3.dynamodb.conditions import Key
+from app.db import archive
+from app.db.archive import ARCHIVE_AFTER_DAYS
+from app.db.dynamodb import get_table, batch_write
+from app.db.endpoints import TABLE_NAME as ENDPOINTS_TABLE_NAME
+from app.db.logsFetch import TABLE_NAME as LOGS_TABLE_NAME
+from app.db.retention import get_user_plan, policy_for
+
+
+# Stop starting new partitions once less than this much time is left in the run
+COMPACTION_MARGIN_SECONDS = float(os.getenv('COMPACTION_MARGIN_SECONDS', '30'))
+QUERY_PAGE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def compaction_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Midnight ARCHIVE_AFTER_DAYS ago; only whole days are archived"""
+    now = now or datetime.utcnow()
+    return (now - timedelta(days=ARCHIVE_AFTER_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _iter_endpoint_keys():
+    """Every (user_id, endpoint_id) in the endpoints table"""
+    table = get_table(ENDPOINTS_TABLE_NAME)
+    scan_kwargs = {
+        'ProjectionExpression': 'user_id, endpoint_id'
+    }
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response['Items']:
+            yield item['user_id'], item['endpoint_id']
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def _iter_days_before(user_id: str, endpoint_id: str, cutoff: datetime):
+    """Yield (day, items) for an endpoint's hot logs before cutoff, oldest day first"""
+    table = get_table(LOGS_TABLE_NAME)
+    query_kwargs = {
+        'KeyConditionExpression': Key('endpoint_key').eq(f'{user_id}#{endpoint_id}')
+            & Key('timestamp_key').lt(cutoff.isoformat()),
+        'Limit': QUERY_PAGE_SIZE,
+        'ScanIndexForward': True
+    }
+    day, items = None, []
+    while True:
+        response = table.query(**query_kwargs)
+        for item in response['Items']:
+            item_day = item['timestamp'][:10]
+            if item_day != day and items:
+                yield day, items
+                items = []
+            day = item_day
+            items.append(item)
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    if items:
+        yield day, items
+
+
+def _delete_hot(items: list[dict]) -> int:
+    """Delete log items from DynamoDB; returns how many were deleted"""
+    failed = batch_write(LOGS_TABLE_NAME, [
+        {'DeleteRequest': {'Key': {'endpoint_key': item['endpoint_key'], 'timestamp_key': item['timestamp_key']}}}
+        for item in items
+    ])
+    return len(items) - len(failed)
+
+
+def _expire_partitions(user_id: str, endpoint_id: str, manifest: dict, expire_before: datetime) -> int:
+    """Delete day partitions that ended before expire_before; returns how many"""
+    expired = [day for day in manifest['partitions'] if datetime.fromisoformat(day) + timedelta(days=1) <= expire_before]
+    if not expired:
+        return 0
+    for day in expired:
+        del manifest['partitions'][day]
+    # The manifest goes first so readers never look for a deleted partition
+    archive.save_manifest(user_id, endpoint_id, manifest)
+    for day in expired:
+        archive.store.delete(archive.partition_key(user_id, endpoint_id, day))
+    return len(expired)
+
+
+def compact_endpoint(user_id: str, endpoint_id: str, cutoff: datetime, deadline: Optional[float] = None, expire_before: Optional[datetime] = None) -> dict:
+    """Move one endpoint's logs before cutoff into day partitions, then delete them from DynamoDB.
+
+    Each day is written, recorded in the manifest and only then deleted, so a
+    run stopped at any point leaves every log readable exactly once. Logs
+    already in their day's partition (left by an interrupted run) are
+    deleted without being archived again. Days that ended before
+    expire_before are past the plan's retention: their logs are deleted
+    without being archived and their partitions are removed.
+    """
+    manifest = archive.load_manifest(user_id, endpoint_id, use_cache=False)
+    stats = {'partitions': 0, 'archived': 0, 'deleted': 0, 'expired': 0, 'complete': True}
+    if expire_before is not None:
+        stats['expired'] = _expire_partitions(user_id, endpoint_id, manifest, expire_before)
+    for day, items in _iter_days_before(user_id, endpoint_id, cutoff):
+        if deadline is not None and time.monotonic() >= deadline:
+            stats['complete'] = False
+            break
+        day_start = datetime.fromisoformat(day)
+        day_end = day_start + timedelta(days=1)
+        if expire_before is not None and day_end <= expire_before:
+            stats['deleted'] += _delete_hot(items)
+            continue
+        existing = []
+        if day in manifest['partitions']:
+            existing = [item for page in archive.iter_archived_logs(endpoint_id, user_id, day_start, day_end - timedelta(microseconds=1)) for item in page]
+        known = {item['timestamp_key'] for item in existing}
+        new_items = [item for item in items if item['timestamp_key'] not in known]
+        if new_items:
+            # A day that was already archived is rewritten whole with the late items added
+            data, header = archive.encode_partition(existing + new_items)
+            archive.store.put(archive.partition_key(user_id, endpoint_id, day), data)
+            manifest['partitions'][day] = {
+                'rows': header['rows'],
+                'bytes': len(data),
+                'min_timestamp': header['min_timestamp'],
+                'max_timestamp': header['max_timestamp']
+            }
+            manifest['archived_through'] = max(manifest['archived_through'] or '', min(day_end, cutoff).isoformat())
+            archive.save_manifest(user_id, endpoint_id, manifest)
+            stats['partitions'] += 1
+            stats['archived'] += len(new_items)
+        stats['deleted'] += _delete_hot(items)
+    return stats
+
+
+def compact_logs(now: Optional[datetime] = None, deadline: Optional[float] = None) -> dict:
+    """Archive every endpoint's logs older than ARCHIVE_AFTER_DAYS and drop what is past its plan's retention.
+
+    deadline is a time.monotonic() value.
+    """
+    if archive.store is None:
+        raise RuntimeError('ARCHIVE_LOCATION is not set')
+    now = now or datetime.utcnow()
+    cutoff = compaction_cutoff(now)
+    plans = {}
+    totals = {'endpoints': 0, 'partitions': 0, 'archived': 0, 'deleted': 0, 'expired': 0, 'complete': True}
+    for user_id, endpoint_id in _iter_endpoint_keys():
+        if deadline is not None and time.monotonic() >= deadline:
+            totals['complete'] = False
+            break
+        if user_id not in plans:
+            plans[user_id] = get_user_plan(user_id)
+        expire_before = now - timedelta(days=policy_for(plans[user_id])['logs'])
+        stats = compact_endpoint(user_id, endpoint_id, cutoff, deadline, expire_before)
+        totals['endpoints'] += 1
+        for name in ('partitions', 'archived', 'deleted', 'expired'):
+            totals[name] += stats[name]
+        if not stats['complete']:
+            totals['complete'] = False
+            break
+    logger.info(f"Compacted logs before {cutoff.isoformat()}: {totals}")
+    return totals
+
+
+def handle_compaction_event(event: dict, context) -> dict:
+    """Lambda entry point for the scheduled compaction run"""
+    deadline = None
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - COMPACTION_MARGIN_SECONDS
+    return compact_logs(deadline=deadline)
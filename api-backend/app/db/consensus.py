@@ -0,0 +1,114 @@
+from app.db.rollups import query_rollups, BUCKET_FORMAT
+from app.db.status import get_endpoint_statuses
+from app.schemas import RegionResult, ConsensusWindow, RegionConsensusResponse
+from app.utils.timestamps import to_utc_naive
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from typing import Optional
+import math
+import os
+import statistics
+
+# Regions that must see an endpoint down for the consensus to be down, capped
+# at the number of regions reporting in a window
+CONSENSUS_QUORUM = int(os.getenv('CONSENSUS_QUORUM', '2'))
+MAX_CONSENSUS_RANGE = timedelta(days=1)
+
+
+def _p95(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def consensus_verdict(window_start: datetime, regions: list[RegionResult], quorum: int = CONSENSUS_QUORUM) -> ConsensusWindow:
+    """Merge one window's per-region results into a single verdict"""
+    down = sum(1 for region in regions if not region.is_up)
+    latencies = {region.region: region.average_response_time for region in regions if region.average_response_time is not None}
+    return ConsensusWindow(
+        window_start=window_start,
+        is_up=down < max(1, min(quorum, len(regions))),
+        regions_reporting=len(regions),
+        regions_up=len(regions) - down,
+        regions_down=down,
+        median_response_time=round(statistics.median(latencies.values()), 2) if latencies else None,
+        p95_response_time=round(_p95(list(latencies.values())), 2) if latencies else None,
+        slowest_region=max(latencies, key=latencies.get) if latencies else None,
+        regions=sorted(regions, key=lambda region: region.region)
+    )
+
+
+def _region_results(items: list[dict]) -> list[RegionResult]:
+    """Per-region totals of a window's minute buckets; a region is up when most of its checks were"""
+    totals: dict[str, dict] = {}
+    for item in items:
+        region = totals.setdefault(item['region'], {'checks': 0, 'up': 0, 'sum': 0.0, 'count': 0})
+        region['checks'] += int(item.get('check_count', 0))
+        region['up'] += int(item.get('up_count', 0))
+        region['sum'] += float(item.get('response_time_sum', 0))
+        region['count'] += int(item.get('response_time_count', 0))
+    return [
+        RegionResult(
+            region=name,
+            is_up=region_totals['up'] * 2 >= region_totals['checks'],
+            checks=region_totals['checks'],
+            up_checks=region_totals['up'],
+            average_response_time=round(region_totals['sum'] / region_totals['count'], 2) if region_totals['count'] else None
+        )
+        for name, region_totals in totals.items()
+        if region_totals['checks']
+    ]
+
+
+def get_region_consensus(endpoint_id: str, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, window_minutes: int = 5) -> RegionConsensusResponse:
+    """Consensus verdicts across regions for windows of window_minutes, plus the current one.
+
+    Windows are built from the minute rollups, so each region contributes its
+    aggregated checks for the window rather than raw log rows. Defaults to the
+    last hour.
+    """
+    try:
+        end = to_utc_naive(end_date) if end_date else datetime.utcnow()
+        start = to_utc_naive(start_date) if start_date else end - timedelta(hours=1)
+        if start >= end:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        if end - start > MAX_CONSENSUS_RANGE:
+            raise HTTPException(status_code=400, detail="Consensus is limited to a one day range")
+        start = start.replace(second=0, microsecond=0)
+        items = query_rollups(user_id, endpoint_id, 'minute', start, end)
+
+        by_window: dict[datetime, list[dict]] = {}
+        for item in items:
+            bucket = datetime.strptime(item['bucket'], BUCKET_FORMAT)
+            # Windows are aligned to the clock (e.g. :00, :05, :10) rather than to start
+            minute_of_day = bucket.hour * 60 + bucket.minute
+            by_window.setdefault(bucket - timedelta(minutes=minute_of_day % window_minutes), []).append(item)
+        windows = [
+            consensus_verdict(window_start, regions)
+            for window_start, regions in ((window_start, _region_results(by_window[window_start])) for window_start in sorted(by_window))
+            if regions
+        ]
+
+        current = None
+        status = get_endpoint_statuses([endpoint_id], user_id)[0]
+        if status.regions:
+            current = consensus_verdict(status.last_checked_at, [
+                RegionResult(
+                    region=region.region,
+                    is_up=region.is_up,
+                    checks=1,
+                    up_checks=1 if region.is_up else 0,
+                    average_response_time=region.response_time
+                )
+                for region in status.regions
+            ])
+        return RegionConsensusResponse(
+            endpoint_id=endpoint_id,
+            quorum=CONSENSUS_QUORUM,
+            window_minutes=window_minutes,
+            current=current,
+            windows=windows
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing region consensus: {str(e)}")
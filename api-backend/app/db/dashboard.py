@@ -0,0 +1,74 @@
+from app.db.dynamodb import run_db
+from app.db.endpoints import get_all_endpoints
+from app.db.status import get_endpoint_statuses
+from app.db.rollups import query_rollups, BUCKET_FORMAT
+from app.schemas import EndPointOut, EndpointStatus, EndpointSummary, DashboardSummaryResponse
+from datetime import datetime, timedelta
+import asyncio
+
+SPARKLINE_HOURS = 24
+
+
+def _summarise(endpoint: EndPointOut, status: EndpointStatus, hour_items: list[dict], hours: list[str]) -> EndpointSummary:
+    """Combine an endpoint's status records and its hourly rollups (all regions) into one card"""
+    checks = sum(int(item.get('check_count', 0)) for item in hour_items)
+    up = sum(int(item.get('up_count', 0)) for item in hour_items)
+    sums = dict.fromkeys(hours, 0.0)
+    counts = dict.fromkeys(hours, 0)
+    for item in hour_items:
+        bucket = item.get('bucket')
+        if bucket in sums:
+            sums[bucket] += float(item.get('response_time_sum', 0))
+            counts[bucket] += int(item.get('response_time_count', 0))
+    summary = EndpointSummary(
+        endpoint_id=endpoint.endpoint_id,
+        url=endpoint.url,
+        is_active=endpoint.is_active,
+        check_interval=endpoint.check_interval,
+        measurement_mode=endpoint.measurement_mode,
+        uptime_24h=round(up * 100 / checks, 3) if checks else None,
+        checks_24h=checks,
+        sparkline=[round(sums[hour] / counts[hour], 2) if counts[hour] else None for hour in hours]
+    )
+    if status.regions:
+        latest = max(status.regions, key=lambda region: region.checked_at)
+        summary.is_up = latest.is_up
+        summary.last_checked_at = latest.checked_at
+        summary.last_status_code = latest.status_code
+        summary.last_response_time = latest.response_time
+        summary.last_region = latest.region
+        summary.consecutive_failures = latest.consecutive_failures
+        summary.last_change_at = latest.last_change_at
+    return summary
+
+
+async def get_dashboard_summary(user_id: str) -> DashboardSummaryResponse:
+    """Build every endpoint card for the dashboard in one request.
+
+    Current state comes from the status table in batches of key lookups and
+    the last 24 hour rollups are queried concurrently alongside, so the page
+    costs one round of parallel reads instead of a request per card.
+    """
+    now = datetime.utcnow()
+    end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    start = end - timedelta(hours=SPARKLINE_HOURS)
+    hours = [(start + timedelta(hours=i)).strftime(BUCKET_FORMAT) for i in range(SPARKLINE_HOURS)]
+
+    endpoints = await run_db(get_all_endpoints, user_id)
+    statuses, rollups = await asyncio.gather(
+        run_db(get_endpoint_statuses, [endpoint.endpoint_id for endpoint in endpoints], user_id),
+        asyncio.gather(*(run_db(query_rollups, user_id, endpoint.endpoint_id, 'hour', start, end) for endpoint in endpoints))
+    )
+    summaries = [
+        _summarise(endpoint, status, hour_items, hours)
+        for endpoint, status, hour_items in zip(endpoints, statuses, rollups)
+    ]
+    up = sum(1 for summary in summaries if summary.is_up)
+    down = sum(1 for summary in summaries if summary.is_up is False)
+    return DashboardSummaryResponse(
+        endpoints=summaries,
+        total_endpoints=len(summaries),
+        up_endpoints=up,
+        down_endpoints=down,
+        generated_at=now
+    )
@@ -1,21 +1,102 @@
+import asyncio
 import boto3
+import functools
+import random
+import time
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, TypeVar
 import os
 
+T = TypeVar('T')
 
-dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION','us-east-1'))
+# Upper bound on DynamoDB calls in flight per process; the connection pool and
+# the executor share it so a blocked call always has a connection to use
+DB_MAX_CONCURRENCY = int(os.getenv('DB_MAX_CONCURRENCY', '32'))
+
+# One session, resource and connection pool shared by every data-access module
+session = boto3.session.Session()
+dynamodb = session.resource(
+    'dynamodb',
+    region_name=os.getenv('AWS_REGION','us-east-1'),
+    config=Config(max_pool_connections=DB_MAX_CONCURRENCY, retries={'mode': 'standard'})
+)
+# BatchWriteItem/BatchGetItem request limits and the retry budget for unprocessed items
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+BATCH_MAX_RETRIES = int(os.getenv('DB_BATCH_MAX_RETRIES', '6'))
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_CONCURRENCY, thread_name_prefix='dynamodb')
+_tables = {}
 
 def get_table(table_name: str):
     try:
-       print(f"Getting table: {table_name}")
-       return dynamodb.Table(table_name)
+       if table_name not in _tables:
+           print(f"Getting table: {table_name}")
+           _tables[table_name] = dynamodb.Table(table_name)
+       return _tables[table_name]
     except ClientError as e:
         print(e.response['Error']['Message'])
         raise e
-       
 
 
+def is_condition_failure(error: ClientError) -> bool:
+    return error.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+
+def _backoff(attempt: int) -> None:
+    # Full-jitter exponential backoff, capped at 2 seconds
+    time.sleep(random.uniform(0, min(2.0, 0.05 * 2 ** attempt)))
+
+
+def batch_write(table_name: str, requests: list[dict]) -> list[dict]:
+    """Write PutRequest/DeleteRequest entries in batches of 25, retrying unprocessed ones.
+
+    Returns the requests still unprocessed once the retry budget is spent.
+    """
+    failed = []
+    for start in range(0, len(requests), BATCH_WRITE_SIZE):
+        pending = requests[start:start + BATCH_WRITE_SIZE]
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            if attempt:
+                _backoff(attempt)
+            response = dynamodb.batch_write_item(RequestItems={table_name: pending})
+            pending = response.get('UnprocessedItems', {}).get(table_name, [])
+            if not pending:
+                break
+        failed.extend(pending)
+    return failed
+
+
+def batch_get(table_name: str, keys: list[dict]) -> list[dict]:
+    """Fetch items by key in batches of 100, retrying unprocessed keys"""
+    items = []
+    for start in range(0, len(keys), BATCH_GET_SIZE):
+        pending = {'Keys': keys[start:start + BATCH_GET_SIZE]}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            if attempt:
+                _backoff(attempt)
+            response = dynamodb.batch_get_item(RequestItems={table_name: pending})
+            items.extend(response['Responses'].get(table_name, []))
+            pending = response.get('UnprocessedKeys', {}).get(table_name)
+            if not pending:
+                break
+        else:
+            raise RuntimeError(f"Could not read {len(pending['Keys'])} items from {table_name}")
+    return items
 
 
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking data-access call on the DynamoDB executor without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
 
 
+async def iterate_db(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Advance a blocking iterator, such as a paginated query, on the DynamoDB executor"""
+    done = object()
+    while True:
+        item = await run_db(next, iterator, done)
+        if item is done:
+            return
+        yield item
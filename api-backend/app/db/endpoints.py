@@ -1,14 +1,21 @@
-import boto3
+from app.db.dynamodb import get_table, is_condition_failure, batch_get, batch_write, run_db
 from boto3.dynamodb.conditions import Key
-from app.schemas import EndPointIn, EndPointOut
+from botocore.exceptions import ClientError
+from app.schemas import EndPointIn, EndPointOut, EndPointUpdate, EndPointListResponse, EndPointBulkUpdate, BulkItemResult, BulkResultResponse
+from app.utils.pagination import encode_cursor, decode_cursor, query_fingerprint, CURSOR_ENDPOINTS
 from datetime import datetime
 from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from typing import Optional
+import asyncio
 import os
 import uuid
 
-dynamodb_client = boto3.resource('dynamodb')
 TABLE_NAME = os.getenv('ENDPOINT_TABLE_NAME', 'dev-us-east-1-central-api-endpoints-table-endpoints-dynamodb-table')
-endpoints_table = dynamodb_client.Table(TABLE_NAME)
+endpoints_table = get_table(TABLE_NAME)
+# GSI on user_id created by the endpoints_dynamodb Terraform module (its gsi_name)
+USER_INDEX_NAME = os.getenv('ENDPOINT_USER_INDEX_NAME', 'user_id-index')
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '1000'))
 
 def create_endpoint(endpoint: EndPointIn,user_id: str)->EndPointOut:
     try:
@@ -19,6 +26,8 @@ def create_endpoint(endpoint: EndPointIn,user_id: str)->EndPointOut:
             'endpoint_id': endpoint_id,
             'url': endpoint.url,
             'is_active': endpoint.is_active,
+            'check_interval': endpoint.check_interval,
+            'measurement_mode': endpoint.measurement_mode,
             'created_at': created_at,
         }
         endpoints_table.put_item(Item=item)
@@ -26,22 +35,52 @@ def create_endpoint(endpoint: EndPointIn,user_id: str)->EndPointOut:
             endpoint_id=endpoint_id,
             url=endpoint.url,
             is_active=endpoint.is_active,
+            check_interval=endpoint.check_interval,
+            measurement_mode=endpoint.measurement_mode,
             created_at=datetime.fromisoformat(created_at)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
-def get_endpoints(user_id: str)-> list[EndPointOut]:
+def get_endpoints(user_id: str, limit: Optional[int] = 100, next_token: Optional[str] = None) -> EndPointListResponse:
+    """Fetch one page of the caller's endpoints from the user_id index"""
     try:
-        response = endpoints_table.scan(
-            FilterExpression=Key('user_id').eq(user_id)
+        query_params = {
+            'IndexName': USER_INDEX_NAME,
+            'KeyConditionExpression': Key('user_id').eq(user_id)
+        }
+        if limit:
+            query_params['Limit'] = limit
+        fingerprint = query_fingerprint('endpoints', user_id, limit)
+        if next_token:
+            _, (endpoint_id,) = decode_cursor(next_token, fingerprint, (CURSOR_ENDPOINTS,))
+            query_params['ExclusiveStartKey'] = {'endpoint_id': endpoint_id, 'user_id': user_id}
+        response = endpoints_table.query(**query_params)
+        has_more = 'LastEvaluatedKey' in response
+        return EndPointListResponse(
+            endpoints=[EndPointOut(**item) for item in response['Items']],
+            next_token=encode_cursor(CURSOR_ENDPOINTS, fingerprint, (response['LastEvaluatedKey']['endpoint_id'],)) if has_more else None,
+            has_more=has_more
         )
-        return [EndPointOut(**item) for item in response['Items']]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
+def get_all_endpoints(user_id: str) -> list[EndPointOut]:
+    """Follow every page of the caller's endpoints"""
+    endpoints = []
+    next_token = None
+    while True:
+        page = get_endpoints(user_id, limit=None, next_token=next_token)
+        endpoints.extend(page.endpoints)
+        if not page.has_more:
+            return endpoints
+        next_token = page.next_token
+    
+
 def get_endpoint(endpoint_id: str, user_id: str)->EndPointOut:
     try:
         response = endpoints_table.get_item(
@@ -56,57 +95,194 @@ def get_endpoint(endpoint_id: str, user_id: str)->EndPointOut:
         raise HTTPException(status_code=500, detail=str(e))
     
 
-def update_endpoint(endpoint_id: str, endpoint: EndPointIn, user_id: str )->EndPointOut:
+def _ownership_error(error: ClientError) -> HTTPException:
+    """Map a failed user_id condition to 404 when the endpoint is missing, 403 when it is someone else's"""
+    # ReturnValuesOnConditionCheckFailure puts the current item, if any, on the error
+    if 'Item' in error.response:
+        return HTTPException(status_code=403, detail='Unauthorized')
+    return HTTPException(status_code=404, detail='Endpoint not found')
+
+
+def _apply_update(endpoint_id: str, endpoint: EndPointUpdate, user_id: str) -> EndPointOut:
+    """SET the editable fields the request supplied on one endpoint, conditional on the caller owning it.
+
+    Fields left out of the request keep their stored values, and the Lambda's
+    scheduling attributes and anything else on the item are left alone.
+    """
+    fields = endpoint.dict(exclude_unset=True, exclude_none=True, exclude={'endpoint_id'})
+    response = endpoints_table.update_item(
+        Key={'endpoint_id': endpoint_id},
+        UpdateExpression='set ' + ', '.join(f'#{name} = :{name}' for name in fields),
+        ConditionExpression='user_id = :user_id',
+        ExpressionAttributeNames={f'#{name}': name for name in fields},
+        ExpressionAttributeValues={
+            **{f':{name}': value for name, value in fields.items()},
+            ':user_id': user_id
+        },
+        ReturnValues='ALL_NEW',
+        ReturnValuesOnConditionCheckFailure='ALL_OLD'
+    )
+    return EndPointOut(**response['Attributes'])
+
+
+def update_endpoint(endpoint_id: str, endpoint: EndPointUpdate, user_id: str )->EndPointOut:
     try:
-        item = endpoints_table.get_item(
-            Key={'endpoint_id': endpoint_id}
-        )
-        if 'Item' not in item:
-            raise HTTPException(status_code=404, detail='Endpoint not found')
-        if item['Item']['user_id'] != user_id:
-            raise HTTPException(status_code=403, detail='Unauthorized')
-        response = endpoints_table.update_item(
-            Key={'endpoint_id': endpoint_id},
-            UpdateExpression='set #url = :url, is_active = :is_active',
-            ExpressionAttributeNames={
-                '#url': 'url'
-
-            },
-            ExpressionAttributeValues={
-                ':url': endpoint.url,
-                ':is_active': endpoint.is_active
-                
-            },
-            ReturnValues='ALL_NEW'
-        )
-        return EndPointOut(
-            endpoint_id=endpoint_id,
-            url=response['Attributes']['url'],
-            is_active=response['Attributes']['is_active'],
-            created_at=item['Item']['created_at']
-        )
+        return _apply_update(endpoint_id, endpoint, user_id)
+    except ClientError as e:
+        if is_condition_failure(e):
+            raise _ownership_error(e)
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
 def delete_endpoint(endpoint_id: str,user_id: str )->dict:
     try:
-        item = endpoints_table.get_item(
-            Key={'endpoint_id': endpoint_id}
-
-        )
-        if 'Item' not in item:
-            raise HTTPException(status_code=404, detail='Endpoint not found')
-        if item['Item']['user_id'] != user_id:
-            raise HTTPException(status_code=403, detail='Unauthorized')
         endpoints_table.delete_item(
-            Key={'endpoint_id': endpoint_id}
+            Key={'endpoint_id': endpoint_id},
+            ConditionExpression='user_id = :user_id',
+            ExpressionAttributeValues={':user_id': user_id},
+            ReturnValuesOnConditionCheckFailure='ALL_OLD'
         )
         return {'message': 'Endpoint deleted successfully'}
+    except ClientError as e:
+        if is_condition_failure(e):
+            raise _ownership_error(e)
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
 
 
+def check_bulk_size(count: int) -> None:
+    if count > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f'At most {BULK_MAX_ITEMS} endpoints per bulk request')
+
 
+def parse_bulk_items(items: list[dict], model: type[BaseModel]) -> tuple[list[tuple[int, BaseModel]], list[BulkItemResult]]:
+    """Validate each item of a bulk JSON body on its own, like the rows of a CSV upload.
 
+    Returns (request index, parsed item) pairs for valid items and error results for the rest.
+    """
+    entries = []
+    rejected = []
+    for index, item in enumerate(items):
+        try:
+            entries.append((index, model.parse_obj(item)))
+        except ValidationError as e:
+            rejected.append(BulkItemResult(index=index, endpoint_id=item.get('endpoint_id'), status='error', detail='; '.join(error['msg'] for error in e.errors())))
+    return entries, rejected
+
+
+def _bulk_response(results: list[BulkItemResult]) -> BulkResultResponse:
+    results.sort(key=lambda result: result.index)
+    failed = sum(1 for result in results if result.status == 'error')
+    return BulkResultResponse(results=results, succeeded=len(results) - failed, failed=failed)
+
+
+def _write_bulk(requests: dict[str, tuple[int, dict]], status: str, output) -> list[BulkItemResult]:
+    """Batch-write requests keyed by endpoint_id and report each one as status or error"""
+    unprocessed = batch_write(TABLE_NAME, [request for _, request in requests.values()])
+    failed_ids = {
+        (request.get('PutRequest', {}).get('Item') or request['DeleteRequest']['Key'])['endpoint_id']
+        for request in unprocessed
+    }
+    results = []
+    for endpoint_id, (index, request) in requests.items():
+        if endpoint_id in failed_ids:
+            results.append(BulkItemResult(index=index, endpoint_id=endpoint_id, status='error', detail='Write was throttled, retry this item'))
+        else:
+            results.append(BulkItemResult(index=index, endpoint_id=endpoint_id, status=status, endpoint=output(request)))
+    return results
+
+
+def _load_owned(entries: list[tuple[int, str]], user_id: str) -> tuple[dict[str, tuple[int, dict]], list[BulkItemResult]]:
+    """Fetch the endpoints named in a bulk request, rejecting duplicates and other users' endpoints"""
+    rejected = []
+    wanted = {}
+    for index, endpoint_id in entries:
+        if endpoint_id in wanted:
+            rejected.append(BulkItemResult(index=index, endpoint_id=endpoint_id, status='error', detail='Duplicate endpoint_id in request'))
+        else:
+            wanted[endpoint_id] = index
+    items = {
+        item['endpoint_id']: item
+        for item in batch_get(TABLE_NAME, [{'endpoint_id': endpoint_id} for endpoint_id in wanted])
+    }
+    owned = {}
+    for endpoint_id, index in wanted.items():
+        item = items.get(endpoint_id)
+        if item is None:
+            rejected.append(BulkItemResult(index=index, endpoint_id=endpoint_id, status='error', detail='Endpoint not found'))
+        elif item['user_id'] != user_id:
+            rejected.append(BulkItemResult(index=index, endpoint_id=endpoint_id, status='error', detail='Unauthorized'))
+        else:
+            owned[endpoint_id] = (index, item)
+    return owned, rejected
+
+
+def bulk_create_endpoints(entries: list[tuple[int, EndPointIn]], user_id: str, rejected: list[BulkItemResult] = ()) -> BulkResultResponse:
+    """Create already validated endpoints with BatchWriteItem; entries are (request index, endpoint)"""
+    try:
+        created_at = datetime.now().isoformat()
+        requests = {}
+        for index, endpoint in entries:
+            endpoint_id = str(uuid.uuid4())
+            item = {
+                'user_id': user_id,
+                'endpoint_id': endpoint_id,
+                'url': endpoint.url,
+                'is_active': endpoint.is_active,
+                'check_interval': endpoint.check_interval,
+                'measurement_mode': endpoint.measurement_mode,
+                'created_at': created_at,
+            }
+            requests[endpoint_id] = (index, {'PutRequest': {'Item': item}})
+        results = _write_bulk(requests, 'created', lambda request: EndPointOut(**request['PutRequest']['Item']))
+        return _bulk_response(results + list(rejected))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _bulk_update_one(index: int, update: EndPointBulkUpdate, user_id: str) -> BulkItemResult:
+    try:
+        endpoint = _apply_update(update.endpoint_id, update, user_id)
+        return BulkItemResult(index=index, endpoint_id=update.endpoint_id, status='updated', endpoint=endpoint)
+    except ClientError as e:
+        detail = _ownership_error(e).detail if is_condition_failure(e) else str(e)
+        return BulkItemResult(index=index, endpoint_id=update.endpoint_id, status='error', detail=detail)
+    except Exception as e:
+        return BulkItemResult(index=index, endpoint_id=update.endpoint_id, status='error', detail=str(e))
+
+
+async def bulk_update_endpoints(entries: list[tuple[int, EndPointBulkUpdate]], user_id: str, rejected: list[BulkItemResult] = ()) -> BulkResultResponse:
+    """Set the supplied url, is_active, check_interval and measurement_mode on many endpoints the caller owns.
+
+    Each endpoint gets its own conditional update_item, the same write as a
+    single update, run concurrently on the DynamoDB executor; there is no
+    read before the write for a concurrent change to slip between.
+    """
+    rejected = list(rejected)
+    seen = set()
+    pending = []
+    for index, update in entries:
+        if update.endpoint_id in seen:
+            rejected.append(BulkItemResult(index=index, endpoint_id=update.endpoint_id, status='error', detail='Duplicate endpoint_id in request'))
+            continue
+        seen.add(update.endpoint_id)
+        pending.append(run_db(_bulk_update_one, index, update, user_id))
+    results = await asyncio.gather(*pending)
+    return _bulk_response(list(results) + rejected)
+
+
+def bulk_delete_endpoints(endpoint_ids: list[str], user_id: str) -> BulkResultResponse:
+    """Delete many endpoints the caller owns"""
+    try:
+        owned, rejected = _load_owned(list(enumerate(endpoint_ids)), user_id)
+        requests = {
+            endpoint_id: (index, {'DeleteRequest': {'Key': {'endpoint_id': endpoint_id}}})
+            for endpoint_id, (index, _) in owned.items()
+        }
+        results = _write_bulk(requests, 'deleted', lambda request: None)
+        return _bulk_response(results + rejected)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,74 @@
+"""Copy logs from the legacy log_id keyed table into the keyed logs table.
+
+Run from api-backend/ with DYNAMODB_TABLE set to the keyed table:
+
+    python -m app.db.log_migration --source dev-us-east-1-central-api-logs-dynamodb-table
+
+Items are written with the keys the monitoring Lambda now uses, so running
+it again, or alongside Lambdas already writing the keyed table, never
+duplicates a log. Copied logs older than ARCHIVE_AFTER_DAYS are moved to the
+archive by the next compaction run.
+"""
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.db.dynamodb import get_table, batch_write, BATCH_WRITE_SIZE
+from app.db.logsFetch import TABLE_NAME
+
+
+SCAN_SEGMENTS = 4
+SCAN_PAGE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def keyed_item(item: dict) -> Optional[dict]:
+    """A legacy log item with endpoint_key and timestamp_key added, or None if it lacks their parts"""
+    if not (item.get('user_id') and item.get('endpoint_id') and item.get('timestamp')):
+        return None
+    return {
+        **item,
+        'endpoint_key': f"{item['user_id']}#{item['endpoint_id']}",
+        'timestamp_key': f"{item['timestamp']}#{item.get('region')}"
+    }
+
+
+def _copy_segment(source: str, segment: int, total_segments: int) -> dict:
+    table = get_table(source)
+    stats = {'scanned': 0, 'copied': 0, 'skipped': 0, 'failed': 0}
+    scan_kwargs = {'Segment': segment, 'TotalSegments': total_segments, 'Limit': SCAN_PAGE_SIZE}
+    while True:
+        response = table.scan(**scan_kwargs)
+        stats['scanned'] += len(response['Items'])
+        keyed = [item for item in map(keyed_item, response['Items']) if item is not None]
+        stats['skipped'] += len(response['Items']) - len(keyed)
+        for start in range(0, len(keyed), BATCH_WRITE_SIZE):
+            # A batch may not hold the same key twice; the last item wins
+            unique = {(item['endpoint_key'], item['timestamp_key']): item for item in keyed[start:start + BATCH_WRITE_SIZE]}
+            failed = batch_write(TABLE_NAME, [{'PutRequest': {'Item': item}} for item in unique.values()])
+            stats['copied'] += len(unique) - len(failed)
+            stats['failed'] += len(failed)
+        if 'LastEvaluatedKey' not in response:
+            return stats
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def copy_legacy_logs(source: str, total_segments: int = SCAN_SEGMENTS) -> dict:
+    """Copy every log in the source table into TABLE_NAME with a parallel scan; returns the counts"""
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        results = list(executor.map(lambda segment: _copy_segment(source, segment, total_segments), range(total_segments)))
+    totals = {name: sum(result[name] for result in results) for name in ('scanned', 'copied', 'skipped', 'failed')}
+    logger.info(f"Copied logs from {source} to {TABLE_NAME}: {totals}")
+    return totals
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Copy logs from the legacy log_id keyed table into DYNAMODB_TABLE')
+    parser.add_argument('--source', required=True, help='Name of the legacy logs table')
+    parser.add_argument('--segments', type=int, default=SCAN_SEGMENTS, help='Parallel scan segments')
+    args = parser.parse_args()
+    totals = copy_legacy_logs(args.source, args.segments)
+    if totals['failed']:
+        raise SystemExit(f"{totals['failed']} logs were not copied; run it again")
@@ -1,155 +1,217 @@
-import boto3
 import os
 import json
-from datetime import datetime
+import logging
+from datetime import datetime, timedelta
+from app.db.dynamodb import get_table
+from app.db.archive import archived_through, iter_archived_logs, ARCHIVE_AFTER_DAYS
 from boto3.dynamodb.conditions import Key
-from typing import Optional
+from typing import Iterator, Optional
 from fastapi import HTTPException
-from app.schemas import  LogListResponse, LogResponse
-
-
-dynamodb_client = boto3.resource('dynamodb')
-TABLE_NAME = os.getenv('DYNAMODB_TABLE', 'dev-us-east-1-central-api-logs-dynamodb-table')
-
-def get_logs_by_endpoint(endpoint_id: str, user_id: str, limit: Optional[int] = 10, next_token: Optional[str] = None, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> LogListResponse:
-    try: 
-        print(f"[DEBUG] Starting get_logs_by_endpoint for endpoint_id: {endpoint_id}, user_id: {user_id}")
-        logs_table = dynamodb_client.Table(TABLE_NAME)
-        
-        query_params = {
-            'IndexName': 'endpoint_id-index',
-            'KeyConditionExpression': 'endpoint_id = :endpoint_id',
-            'FilterExpression': 'user_id = :user_id',
-            'ExpressionAttributeValues': {
-                ':endpoint_id': endpoint_id,
-                ':user_id': user_id
-            },
+from app.schemas import LogResponse
+from app.utils.timestamps import to_utc_naive
+from app.utils.pagination import encode_cursor, decode_cursor, query_fingerprint, CURSOR_LOGS, CURSOR_LOGS_ARCHIVE
+
+
+TABLE_NAME = os.getenv('DYNAMODB_TABLE', 'dev-us-east-1-central-api-keyed-logs-dynamodb-table')
+EXPORT_PAGE_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+def _build_log_query(endpoint_id: str, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> dict:
+    # The partition key embeds the owner, so another user's endpoint has no items;
+    # the time range is a sort key condition on "<timestamp>#<region>"
+    key_condition = Key('endpoint_key').eq(f"{user_id}#{endpoint_id}")
+    if start_date and end_date:
+        key_condition &= Key('timestamp_key').between(
+            to_utc_naive(start_date).isoformat(),
+            f"{to_utc_naive(end_date).isoformat()}#~"
+        )
+    elif start_date:
+        key_condition &= Key('timestamp_key').gte(to_utc_naive(start_date).isoformat())
+    elif end_date:
+        key_condition &= Key('timestamp_key').lte(f"{to_utc_naive(end_date).isoformat()}#~")
+    return {'KeyConditionExpression': key_condition}
+
+
+def _split_range(endpoint_id: str, user_id: str, start_date: Optional[datetime], end_date: Optional[datetime]) -> tuple[Optional[datetime], Optional[datetime], bool]:
+    """Split a time range at the endpoint's archive boundary.
+
+    Returns (end of the archived part or None if nothing is archived there,
+    start of the hot DynamoDB part, whether the hot part is empty).
+    Compaction only archives days older than ARCHIVE_AFTER_DAYS, so a range
+    starting after that is all hot and the manifest is not read.
+    """
+    start = to_utc_naive(start_date) if start_date else None
+    if start is not None and start >= datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS):
+        return None, start_date, False
+    through = archived_through(user_id, endpoint_id)
+    if through is None:
+        return None, start_date, False
+    end = to_utc_naive(end_date) if end_date else None
+    archive_end = None
+    if start is None or start < through:
+        last_archived = through - timedelta(microseconds=1)
+        archive_end = last_archived if end is None or end > last_archived else end
+    return archive_end, through if start is None or start < through else start, end is not None and end < through
+
+
+def iter_log_pages(endpoint_id: str, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, page_size: int = EXPORT_PAGE_SIZE, columns: Optional[tuple[str, ...]] = None) -> Iterator[list[dict]]:
+    """Yield raw log items for a time range one page at a time, oldest first.
+
+    Archived logs come first, one day partition per page and reading only
+    columns when given, followed by the hot logs one DynamoDB page at a time.
+    """
+    archive_end, hot_start, hot_empty = _split_range(endpoint_id, user_id, start_date, end_date)
+    if archive_end is not None:
+        yield from iter_archived_logs(endpoint_id, user_id, start_date, archive_end, columns)
+    if hot_empty:
+        return
+    logs_table = get_table(TABLE_NAME)
+    query_params = _build_log_query(endpoint_id, user_id, hot_start, end_date)
+    query_params.update({
+        'Limit': page_size,
+        'ScanIndexForward': True
+    })
+    while True:
+        response = logs_table.query(**query_params)
+        if response['Items']:
+            yield response['Items']
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+# Field conversions from stored DynamoDB values to LogResponse values, built once.
+# Fields without a converter are passed through unchanged.
+_FIELD_CONVERTERS = {
+    'status_code': int,
+    'response_time': float,
+    'dns_latency': float,
+    'connection_latency': float,
+    'tls_handshake_latency': float,
+    'ttfb': float,
+    'total_latency': float,
+    'timestamp': _parse_timestamp,
+    'is_up': bool,
+    'certificate_valid': bool,
+    'is_secure': bool,
+}
+# Values used when a field is missing from the stored item (the monitoring
+# Lambda strips None values before writing)
+_FIELD_DEFAULTS = {
+    'is_up': False,
+    'certificate_valid': False,
+    'is_secure': False,
+    'error_message': 'None',
+}
+_DECODE_PLAN = tuple(
+    (name, _FIELD_CONVERTERS.get(name), _FIELD_DEFAULTS.get(name))
+    for name in LogResponse.model_fields
+    if name != 'secure_protocol'
+)
+
+
+def decode_log_item(item: dict) -> dict:
+    """Convert a raw log item into a LogResponse-shaped dict using the precompiled plan"""
+    row = {}
+    for name, convert, default in _DECODE_PLAN:
+        value = item.get(name)
+        if value is None:
+            row[name] = default
+        else:
+            row[name] = convert(value) if convert is not None else value
+    # secure_protocol mirrors is_secure, as it always has for stored logs
+    row['secure_protocol'] = row['is_secure']
+    return row
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _pack_timestamp_key(timestamp_key: str) -> tuple:
+    """Cursor values for a "<timestamp>#<region>" sort key: epoch microseconds and region"""
+    timestamp, _, region = timestamp_key.partition('#')
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return (timestamp_key,)
+    if parsed.tzinfo is not None or parsed.isoformat() != timestamp:
+        return (timestamp_key,)
+    return ((parsed - _EPOCH) // timedelta(microseconds=1), region)
+
+
+def _unpack_timestamp_key(values: tuple) -> str:
+    if len(values) == 2:
+        return f"{(_EPOCH + timedelta(microseconds=values[0])).isoformat()}#{values[1]}"
+    return values[0]
+
+
+def query_log_page(endpoint_id: str, user_id: str, limit: Optional[int] = 10, next_token: Optional[str] = None, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> dict:
+    """Fetch one page of logs, newest first, as a LogListResponse-shaped dict.
+
+    Pages come from DynamoDB until the hot logs run out and then continue
+    into the archive. next_token is a signed cursor tied to this endpoint,
+    range and limit, holding the last sort key returned.
+    """
+    fingerprint = query_fingerprint('logs', user_id, endpoint_id, start_date, end_date, limit)
+    kind, values = decode_cursor(next_token, fingerprint, (CURSOR_LOGS, CURSOR_LOGS_ARCHIVE)) if next_token else (None, ())
+    archive_end, hot_start, hot_empty = _split_range(endpoint_id, user_id, start_date, end_date)
+    items = []
+    if kind != CURSOR_LOGS_ARCHIVE and not hot_empty:
+        logs_table = get_table(TABLE_NAME)
+        query_params = _build_log_query(endpoint_id, user_id, hot_start, end_date)
+        query_params.update({
             'Limit': limit,
             'ScanIndexForward': False
-        }
-        print(f"[DEBUG] Query parameters: {json.dumps(query_params, default=str)}")
-        if start_date and end_date:
-            query_params['FilterExpression'] += ' AND #ts BETWEEN :start_date AND :end_date'
-            query_params['ExpressionAttributeValues'].update({
-                ':start_date': start_date,
-                ':end_date': end_date
-            })
-            query_params['ExpressionAttributeNames'] = {
-                '#ts': 'timestamp'
+        })
+        if kind == CURSOR_LOGS:
+            query_params['ExclusiveStartKey'] = {
+                'endpoint_key': f"{user_id}#{endpoint_id}",
+                'timestamp_key': _unpack_timestamp_key(values)
             }
-        
-        if next_token:
-            query_params['ExclusiveStartKey'] = json.loads(next_token)
-            print(f"[DEBUG] Using next_token: {next_token}")
-        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Querying logs for endpoint_id: {endpoint_id}, params: {json.dumps(query_params, default=str)}")
+
         try:
             response = logs_table.query(**query_params)
-            print(f"[DEBUG] DynamoDB response received. Count: {response.get('Count')}, ScannedCount: {response.get('ScannedCount')}")
         except Exception as query_error:
-            print(f"[ERROR] DynamoDB query failed: {str(query_error)}")
+            logger.error(f"DynamoDB query failed: {str(query_error)}")
             raise HTTPException(status_code=500, detail=f"DynamoDB query failed: {str(query_error)}")
-        
-        # Convert DynamoDB items to the correct format
-        logs = []
-        for index, item in enumerate(response['Items']):
-            try:
-                print(f"[DEBUG] Processing item {index + 1}/{len(response['Items'])}")
-                print(f"[DEBUG] Raw item: {json.dumps(item, default=str)}")
-                
-                # Convert numeric values from strings
-                if 'response_time' in item and item['response_time'] is not None:
-                    item['response_time'] = float(item['response_time'])
-                    print(f"[DEBUG] Converted response_time: {item['response_time']}")
-                
-                if 'dns_latency' in item and item['dns_latency'] is not None:
-                    item['dns_latency'] = float(item['dns_latency'])
-                    print(f"[DEBUG] Converted dns_latency: {item['dns_latency']}")
-                
-                if 'connection_latency' in item and item['connection_latency'] is not None:
-                    item['connection_latency'] = float(item['connection_latency'])
-                    print(f"[DEBUG] Converted connection_latency: {item['connection_latency']}")
-                
-                if 'total_latency' in item and item['total_latency'] is not None:
-                    item['total_latency'] = float(item['total_latency'])
-                    print(f"[DEBUG] Converted total_latency: {item['total_latency']}")
-                
-                if 'status_code' in item and item['status_code'] is not None:
-                    item['status_code'] = int(item['status_code'])
-                    print(f"[DEBUG] Converted status_code: {item['status_code']}")
-                
-                # Convert timestamp string to datetime
-                if 'timestamp' in item:
-                    item['timestamp'] = datetime.fromisoformat(item['timestamp'].replace('Z', '+00:00'))
-                    print(f"[DEBUG] Converted timestamp: {item['timestamp']}")
-                
-                # Convert boolean values
-                if 'is_up' in item:
-                    item['is_up'] = bool(item['is_up'])
-                    print(f"[DEBUG] Converted is_up: {item['is_up']}")
-                
-                if 'certificate_valid' in item:
-                    item['certificate_valid'] = bool(item['certificate_valid'])
-                    print(f"[DEBUG] Converted certificate_valid: {item['certificate_valid']}")
-                
-                if 'is_secure' in item:
-                    item['is_secure'] = bool(item['is_secure'])
-                    print(f"[DEBUG] Converted is_secure: {item['is_secure']}")
-                
-                # Set secure_protocol based on is_secure
-                if 'is_secure' in item:
-                    item['secure_protocol'] = item['is_secure']
-                    print(f"[DEBUG] Set secure_protocol based on is_secure: {item['secure_protocol']}")
-                else:
-                    item['secure_protocol'] = False
-                
-                # Ensure required fields are present
-                if 'error_message' not in item:
-                    item['error_message'] = 'None'
-                if 'is_secure' not in item:
-                    item['is_secure'] = item.get('secure_protocol', False)
-                
-                try:
-                    log_response = LogResponse(**item)
-                    logs.append(log_response)
-                    print(f"[DEBUG] Successfully created LogResponse for item {index + 1}")
-                except Exception as model_error:
-                    print(f"[ERROR] Failed to create LogResponse for item {index + 1}: {str(model_error)}")
-                    print(f"[ERROR] Item data: {json.dumps(item, default=str)}")
-                    raise HTTPException(
-                        status_code=500, 
-                        detail=f"Failed to create LogResponse: {str(model_error)}"
-                    )
-                
-            except Exception as item_error:
-                print(f"[ERROR] Failed to process item {index + 1}: {str(item_error)}")
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Failed to process log item: {str(item_error)}"
-                )
-
-        total_count = response['Count']
-        has_more = 'LastEvaluatedKey' in response
-        next_token = json.dumps(response['LastEvaluatedKey']) if has_more else None
-        
-        print(f"[DEBUG] Processed {len(logs)} logs successfully")
-        print(f"[DEBUG] Total count: {total_count}, Has more: {has_more}")
-
-        return LogListResponse(
-            logs=logs,
-            total_count=total_count,
-            next_token=next_token,
-            has_more=has_more
-        )
-        
-    except dynamodb_client.meta.client.exceptions.ClientError as e:
-        print(f"[ERROR] DynamoDB Client Error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"DynamoDB Error: {str(e)}")
-    except Exception as e:
-        print(f"[ERROR] Unexpected error in get_logs_by_endpoint: {str(e)}")
-        print(f"[ERROR] Error type: {type(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Error fetching logs from DynamoDB: {str(e)}")
-
-
-    
\ No newline at end of file
+        items = response['Items']
+        if 'LastEvaluatedKey' in response:
+            cursor_values = _pack_timestamp_key(response['LastEvaluatedKey']['timestamp_key'])
+            return _log_page(items, encode_cursor(CURSOR_LOGS, fingerprint, cursor_values))
+
+    next_cursor = None
+    if archive_end is not None and len(items) == limit:
+        # The hot logs filled this page exactly; the archive starts on the next one
+        next_cursor = encode_cursor(CURSOR_LOGS_ARCHIVE, fingerprint)
+    elif archive_end is not None:
+        before_key = _unpack_timestamp_key(values) if values else None
+        for page in iter_archived_logs(endpoint_id, user_id, start_date, archive_end, newest_first=True, before_key=before_key):
+            items.extend(page[:limit - len(items)])
+            if len(items) == limit:
+                next_cursor = encode_cursor(CURSOR_LOGS_ARCHIVE, fingerprint, _pack_timestamp_key(items[-1]['timestamp_key']))
+                break
+    return _log_page(items, next_cursor)
+
+
+def _log_page(items: list[dict], next_token: Optional[str]) -> dict:
+    try:
+        logs = [decode_log_item(item) for item in items]
+    except Exception as item_error:
+        logger.error(f"Failed to process log items: {str(item_error)}")
+        raise HTTPException(status_code=500, detail=f"Failed to process log item: {str(item_error)}")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Decoded {len(logs)} logs, has more: {next_token is not None}")
+    return {
+        'logs': logs,
+        'total_count': len(logs),
+        'next_token': next_token,
+        'has_more': next_token is not None
+    }
@@ -0,0 +1,55 @@
+import json
+import os
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from app.db.archive import store, ARCHIVE_AFTER_DAYS
+from app.db.dynamodb import get_table
+from app.db.users import TABLE_NAME as USERS_TABLE_NAME
+from app.schemas import RetentionResponse
+
+
+DEFAULT_PLAN = 'Free'
+# Days kept per plan: raw check logs (hot table and archive together) and
+# rollup buckets per granularity, so older history is only kept downsampled.
+# Must match the policies used by the monitoring Lambda; RETENTION_POLICIES
+# (JSON of the same shape) overrides both.
+RETENTION_POLICIES = json.loads(os.getenv('RETENTION_POLICIES', '') or 'null') or {
+    'Free': {'logs': 7, 'minute': 2, 'hour': 30, 'day': 365},
+    'Pro': {'logs': 90, 'minute': 7, 'hour': 180, 'day': 730},
+    'Enterprise': {'logs': 395, 'minute': 30, 'hour': 395, 'day': 1825},
+}
+
+
+def policy_for(plan: str) -> dict:
+    """Retention days for a plan; unknown plans get the default plan's policy"""
+    return RETENTION_POLICIES.get(plan) or RETENTION_POLICIES[DEFAULT_PLAN]
+
+
+def get_user_plan(user_id: str) -> str:
+    table = get_table(USERS_TABLE_NAME)
+    response = table.get_item(
+        Key={'user_id': user_id},
+        ProjectionExpression='#plan',
+        ExpressionAttributeNames={'#plan': 'plan'}
+    )
+    return response.get('Item', {}).get('plan') or DEFAULT_PLAN
+
+
+def get_retention(user_id: str) -> RetentionResponse:
+    """The retention windows that apply to a user's data under their current plan"""
+    try:
+        plan = get_user_plan(user_id)
+        policy = policy_for(plan)
+        now = datetime.utcnow()
+        archived = store is not None and policy['logs'] > ARCHIVE_AFTER_DAYS
+        return RetentionResponse(
+            plan=plan,
+            log_retention_days=policy['logs'],
+            logs_available_from=now - timedelta(days=policy['logs']),
+            hot_log_days=ARCHIVE_AFTER_DAYS if archived else policy['logs'],
+            archived_log_days=policy['logs'] - ARCHIVE_AFTER_DAYS if archived else 0,
+            rollup_retention_days={granularity: policy[granularity] for granularity in ('minute', 'hour', 'day')},
+            stats_available_from=now - timedelta(days=policy['day'])
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching retention: {str(e)}")
@@ -0,0 +1,209 @@
+from app.db.dynamodb import get_table
+from app.db.logsFetch import iter_log_pages
+from app.schemas import LogStatsResponse
+from app.utils.timestamps import to_utc_naive
+from app.utils.sketch import Sketch
+from boto3.dynamodb.conditions import Key
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from typing import Optional
+import os
+
+
+TABLE_NAME = os.getenv('ROLLUPS_TABLE_NAME', 'dev-us-east-1-central-api-rollups-dynamodb-table')
+
+# Must match the bucket formats written by the monitoring Lambda
+BUCKET_FORMAT = '%Y-%m-%dT%H:%M'
+GRANULARITY_WIDTHS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+METRICS = ('response_time', 'dns_latency', 'connection_latency', 'total_latency')
+PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99}
+# The only log columns the statistics need
+LOG_STATS_COLUMNS = ('timestamp', 'region', 'is_up', 'status_code') + METRICS
+# Runs of buckets without rollups this close together are read from the logs
+# in one go, reading and dropping the few logs of the buckets in between
+GAP_MERGE_BUCKETS = 6
+
+
+def _floor(value: datetime, granularity: str) -> datetime:
+    value = value.replace(second=0, microsecond=0)
+    if granularity in ('hour', 'day'):
+        value = value.replace(minute=0)
+    if granularity == 'day':
+        value = value.replace(hour=0)
+    return value
+
+
+def _ceil(value: datetime, granularity: str) -> datetime:
+    floored = _floor(value, granularity)
+    return floored if floored == value else floored + GRANULARITY_WIDTHS[granularity]
+
+
+def plan_buckets(start: datetime, end: datetime) -> list[tuple[str, datetime, datetime]]:
+    """Cover [start, end) with the fewest buckets.
+
+    Whole days are read from day buckets, the remainder up to the day
+    boundaries from hour buckets and the ragged edges from minute buckets,
+    so a range costs at most ~24 + 2*60 + days buckets however long it is.
+    Returns (granularity, segment_start, segment_end) triples.
+    """
+    start = _floor(start, 'minute')
+    end = _floor(end, 'minute')
+    if start >= end:
+        return []
+    plan = []
+    first_hour, last_hour = _ceil(start, 'hour'), _floor(end, 'hour')
+    if first_hour >= last_hour:
+        return [('minute', start, end)]
+    plan.append(('minute', start, first_hour))
+    first_day, last_day = _ceil(first_hour, 'day'), _floor(last_hour, 'day')
+    if first_day >= last_day:
+        plan.append(('hour', first_hour, last_hour))
+    else:
+        plan.append(('hour', first_hour, first_day))
+        plan.append(('day', first_day, last_day))
+        plan.append(('hour', last_day, last_hour))
+    plan.append(('minute', last_hour, end))
+    return [segment for segment in plan if segment[1] < segment[2]]
+
+
+def query_rollups(user_id: str, endpoint_id: str, granularity: str, start: datetime, end: datetime) -> list[dict]:
+    """Read every region's buckets of one granularity starting in [start, end)"""
+    table = get_table(TABLE_NAME)
+    last_bucket = (end - GRANULARITY_WIDTHS[granularity]).strftime(BUCKET_FORMAT)
+    query_kwargs = {
+        # Bucket keys are "<bucket>#<region>"; '~' sorts after every region name
+        'KeyConditionExpression': Key('rollup_key').eq(f'{user_id}#{endpoint_id}#{granularity}')
+            & Key('bucket_key').between(start.strftime(BUCKET_FORMAT), f'{last_bucket}#~')
+    }
+    items = []
+    while True:
+        response = table.query(**query_kwargs)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return items
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def missing_bucket_runs(items: list[dict], granularity: str, start: datetime, end: datetime) -> list[list[datetime]]:
+    """Starts of the buckets in [start, end) with no rollup item in any region, grouped into runs to read together"""
+    present = {item['bucket_key'].split('#')[0] for item in items}
+    width = GRANULARITY_WIDTHS[granularity]
+    runs = []
+    bucket = start
+    while bucket < end:
+        if bucket.strftime(BUCKET_FORMAT) not in present:
+            if runs and bucket - runs[-1][-1] <= width * (GAP_MERGE_BUCKETS + 1):
+                runs[-1].append(bucket)
+            else:
+                runs.append([bucket])
+        bucket += width
+    return runs
+
+
+def rollups_from_logs(endpoint_id: str, user_id: str, granularity: str, buckets: list[datetime]) -> list[dict]:
+    """One rollup-shaped item per region built from the raw logs (hot or archived) of the given buckets"""
+    wanted = set(buckets)
+    by_region: dict[str, dict] = {}
+    end = buckets[-1] + GRANULARITY_WIDTHS[granularity] - timedelta(microseconds=1)
+    for page in iter_log_pages(endpoint_id, user_id, buckets[0], end, columns=LOG_STATS_COLUMNS):
+        for row in page:
+            if _floor(datetime.fromisoformat(row['timestamp']), granularity) not in wanted:
+                continue
+            item = by_region.setdefault(row.get('region'), {'region': row.get('region'), 'check_count': 0, 'up_count': 0})
+            item['check_count'] += 1
+            item['up_count'] += 1 if row.get('is_up') else 0
+            if row.get('status_code') is not None:
+                status = f"status_{int(row['status_code'])}"
+                item[status] = item.get(status, 0) + 1
+            for metric in METRICS:
+                if row.get(metric) is not None:
+                    value = float(row[metric])
+                    item[f'{metric}_sum'] = item.get(f'{metric}_sum', 0.0) + value
+                    item[f'{metric}_count'] = item.get(f'{metric}_count', 0) + 1
+                    item.setdefault(f'{metric}_sketch', Sketch()).add(value)
+            response_time = row.get('response_time')
+            if response_time is not None:
+                response_time = float(response_time)
+                item['response_time_min'] = min(item.get('response_time_min', response_time), response_time)
+                item['response_time_max'] = max(item.get('response_time_max', response_time), response_time)
+    return list(by_region.values())
+
+
+def _percentiles(items: list[dict]) -> dict[str, dict[str, float]]:
+    """Merge each metric's bucket sketches and read its percentiles; buckets without sketches are skipped"""
+    percentiles = {}
+    for metric in METRICS:
+        merged = Sketch()
+        for item in items:
+            sketch = item.get(f'{metric}_sketch')
+            if sketch is not None:
+                merged.merge(sketch if isinstance(sketch, Sketch) else Sketch.from_bytes(sketch))
+        if merged.count:
+            percentiles[metric] = {name: round(merged.quantile(q), 2) for name, q in PERCENTILES.items()}
+    return percentiles
+
+
+def aggregate_rollups(items: list[dict]) -> LogStatsResponse:
+    """Merge rollup buckets into one set of statistics"""
+    total = sum(int(item.get('check_count', 0)) for item in items)
+    up = sum(int(item.get('up_count', 0)) for item in items)
+    averages = {}
+    for metric in METRICS:
+        metric_sum = sum(float(item.get(f'{metric}_sum', 0)) for item in items)
+        metric_count = sum(int(item.get(f'{metric}_count', 0)) for item in items)
+        averages[metric] = round(metric_sum / metric_count, 2) if metric_count else 0.0
+    distribution: dict[int, int] = {}
+    for item in items:
+        for attribute, value in item.items():
+            if attribute.startswith('status_'):
+                code = int(attribute[len('status_'):])
+                distribution[code] = distribution.get(code, 0) + int(value)
+    minimums = [float(item['response_time_min']) for item in items if 'response_time_min' in item]
+    maximums = [float(item['response_time_max']) for item in items if 'response_time_max' in item]
+    return LogStatsResponse(
+        total_checks=total,
+        successful_checks=up,
+        failed_checks=total - up,
+        uptime_percentage=round(up * 100 / total, 3) if total else 0.0,
+        average_response_time=averages['response_time'],
+        average_dns_latency=averages['dns_latency'],
+        average_connection_latency=averages['connection_latency'],
+        average_total_latency=averages['total_latency'],
+        min_response_time=min(minimums) if minimums else None,
+        max_response_time=max(maximums) if maximums else None,
+        status_code_distribution=distribution,
+        percentiles=_percentiles(items)
+    )
+
+
+def get_log_stats(endpoint_id: str, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, regions: Optional[list[str]] = None) -> LogStatsResponse:
+    """Answer uptime and latency statistics for a time range from the rollups.
+
+    Partition keys embed the caller's user_id, so another user's endpoint
+    simply has no buckets. Buckets with no rollups, such as history from
+    before rollups were written or minute buckets past their retention, are
+    filled from the raw logs, hot or archived. Percentiles come from merging
+    the buckets' latency sketches.
+    """
+    try:
+        end = to_utc_naive(end_date) if end_date else datetime.utcnow()
+        start = to_utc_naive(start_date) if start_date else end - timedelta(days=1)
+        if start >= end:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        items = []
+        for granularity, segment_start, segment_end in plan_buckets(start, end):
+            segment = query_rollups(user_id, endpoint_id, granularity, segment_start, segment_end)
+            for buckets in missing_bucket_runs(segment, granularity, segment_start, segment_end):
+                segment.extend(rollups_from_logs(endpoint_id, user_id, granularity, buckets))
+            items.extend(segment)
+        if regions:
+            items = [item for item in items if item.get('region') in regions]
+        return aggregate_rollups(items)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching log stats: {str(e)}")
@@ -0,0 +1,228 @@
+from app.db.logsFetch import iter_log_pages
+from app.db.retention import get_user_plan, policy_for
+from app.db.rollups import GAP_MERGE_BUCKETS, GRANULARITY_WIDTHS, METRICS, query_rollups
+from app.schemas import LogSeriesResponse, SeriesStats
+from app.utils.sketch import Sketch
+from app.utils.timestamps import to_utc_naive
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from typing import Optional
+import math
+import os
+import numpy as np
+
+
+DEFAULT_SERIES_RANGE = timedelta(days=1)
+MAX_SERIES_RANGE = timedelta(days=int(os.getenv('MAX_SERIES_RANGE_DAYS', '90')))
+SERIES_QUANTILE = 0.95
+# The only log columns a series needs
+SERIES_COLUMNS = ('timestamp', 'region') + METRICS
+# Rollup granularities from coarsest to finest
+ROLLUP_GRANULARITIES = ('day', 'hour', 'minute')
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _bucket_seconds(start: datetime, end: datetime, points: int) -> int:
+    """Whole seconds per bucket so [start, end) fits in about points buckets"""
+    return max(1, math.ceil((end - start).total_seconds() / points))
+
+
+def _page_arrays(items: list[dict], regions: Optional[set[str]]) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    """Timestamps (datetime64[us]) and a rows x METRICS float matrix for one page, NaN where missing"""
+    if regions:
+        items = [item for item in items if item.get('region') in regions]
+    if not items:
+        return None
+    timestamps = np.array([item['timestamp'] for item in items], dtype='datetime64[us]')
+    values = np.array([
+        [math.nan if item.get(metric) is None else float(item[metric]) for metric in METRICS]
+        for item in items
+    ], dtype=np.float64)
+    return timestamps, values
+
+
+def _column_stats(offsets: np.ndarray, column: np.ndarray, occupied: np.ndarray) -> dict[str, np.ndarray]:
+    """min/avg/max/p95 of one metric per occupied bucket, NaN where the bucket had no values"""
+    stats = {name: np.full(len(occupied), np.nan) for name in ('min', 'avg', 'max', 'p95')}
+    valid = ~np.isnan(column)
+    if not valid.any():
+        return stats
+    buckets, values = offsets[valid], column[valid]
+    # Sorting by bucket then value puts each bucket's values in one ordered run
+    order = np.lexsort((values, buckets))
+    buckets, values = buckets[order], values[order]
+    groups, starts, counts = np.unique(buckets, return_index=True, return_counts=True)
+    position = np.searchsorted(occupied, groups)
+    stats['min'][position] = values[starts]
+    stats['max'][position] = values[starts + counts - 1]
+    stats['avg'][position] = np.add.reduceat(values, starts) / counts
+    # Nearest-rank percentile, as used for the consensus p95
+    stats['p95'][position] = values[starts + np.ceil(SERIES_QUANTILE * counts).astype(np.int64) - 1]
+    return stats
+
+
+def _to_list(values: np.ndarray) -> list[Optional[float]]:
+    return [None if value != value else value for value in np.round(values, 2).tolist()]
+
+
+def downsample(timestamps: np.ndarray, values: np.ndarray, start: datetime, bucket_seconds: int) -> tuple[list[datetime], list[int], dict[str, SeriesStats]]:
+    """Aggregate rows into fixed-width buckets from start.
+
+    Returns the start of each non-empty bucket, its row count and per-metric
+    min/avg/max/p95 lists aligned with those buckets.
+    """
+    offsets = (timestamps - np.datetime64(start, 'us')) // np.timedelta64(bucket_seconds, 's')
+    occupied, counts = np.unique(offsets, return_counts=True)
+    series = {}
+    for index, metric in enumerate(METRICS):
+        stats = _column_stats(offsets, values[:, index], occupied)
+        series[metric] = SeriesStats(**{name: _to_list(stat) for name, stat in stats.items()})
+    bucket = timedelta(seconds=bucket_seconds)
+    return [start + int(offset) * bucket for offset in occupied.tolist()], counts.tolist(), series
+
+
+def _rollup_granularity(start: datetime, bucket_seconds: int, plan: str) -> Optional[str]:
+    """Coarsest rollup granularity that fits in a bucket, made coarser while the plan no longer keeps it at start.
+
+    None when buckets are under a minute, so only raw logs can fill them.
+    """
+    policy = policy_for(plan)
+    fitting = [granularity for granularity in ROLLUP_GRANULARITIES if GRANULARITY_WIDTHS[granularity].total_seconds() <= bucket_seconds]
+    if not fitting:
+        return None
+    now = datetime.utcnow()
+    for granularity in reversed(ROLLUP_GRANULARITIES[:ROLLUP_GRANULARITIES.index(fitting[0]) + 1]):
+        if start >= now - timedelta(days=policy[granularity]):
+            return granularity
+    return 'day'
+
+
+def _series_from_rollups(items: list[dict], start: datetime, bucket_seconds: int) -> tuple[list[datetime], list[int], dict[str, SeriesStats]]:
+    """Merge rollup buckets into series buckets of bucket_seconds from start, like downsample does for raw logs"""
+    bucket = timedelta(seconds=bucket_seconds)
+    grouped: dict[int, list[dict]] = {}
+    for item in items:
+        # Bucket keys are "<bucket start>#<region>"
+        bucket_start = datetime.fromisoformat(item['bucket_key'].split('#')[0])
+        grouped.setdefault((bucket_start - start) // bucket, []).append(item)
+    offsets = sorted(grouped)
+    stats = {metric: {name: [] for name in ('min', 'avg', 'max', 'p95')} for metric in METRICS}
+    counts = []
+    for offset in offsets:
+        group = grouped[offset]
+        counts.append(sum(int(item.get('check_count', 0)) for item in group))
+        for metric in METRICS:
+            metric_count = sum(int(item.get(f'{metric}_count', 0)) for item in group)
+            minimums = [float(item[f'{metric}_min']) for item in group if f'{metric}_min' in item]
+            maximums = [float(item[f'{metric}_max']) for item in group if f'{metric}_max' in item]
+            merged = Sketch()
+            for item in group:
+                if f'{metric}_sketch' in item:
+                    merged.merge(Sketch.from_bytes(item[f'{metric}_sketch']))
+            metric_stats = stats[metric]
+            metric_stats['min'].append(round(min(minimums), 2) if minimums else None)
+            metric_stats['max'].append(round(max(maximums), 2) if maximums else None)
+            metric_stats['avg'].append(round(sum(float(item.get(f'{metric}_sum', 0)) for item in group) / metric_count, 2) if metric_count else None)
+            metric_stats['p95'].append(round(merged.quantile(SERIES_QUANTILE), 2) if merged.count else None)
+    series = {metric: SeriesStats(**metric_stats) for metric, metric_stats in stats.items()}
+    return [start + offset * bucket for offset in offsets], counts, series
+
+
+def _series_from_logs(endpoint_id: str, user_id: str, start: datetime, end: datetime, aligned_start: datetime, bucket_seconds: int, regions: Optional[set[str]]) -> tuple[list[datetime], list[int], dict[str, SeriesStats]]:
+    pages = []
+    for items in iter_log_pages(endpoint_id, user_id, start, end, columns=SERIES_COLUMNS):
+        page = _page_arrays(items, regions)
+        if page is not None:
+            pages.append(page)
+    if not pages:
+        empty = SeriesStats(min=[], avg=[], max=[], p95=[])
+        return [], [], {metric: empty for metric in METRICS}
+    timestamps = np.concatenate([page[0] for page in pages])
+    values = np.concatenate([page[1] for page in pages])
+    return downsample(timestamps, values, aligned_start, bucket_seconds)
+
+
+def _missing_runs(bucket_starts: list[datetime], start: datetime, end: datetime, bucket: timedelta) -> list[tuple[datetime, datetime]]:
+    """Ranges covering the series buckets in [start, end) with no rollups, nearby gaps merged to read together"""
+    present = set(bucket_starts)
+    runs = []
+    current = start
+    while current < end:
+        if current not in present:
+            if runs and current - runs[-1][1] <= bucket * GAP_MERGE_BUCKETS:
+                runs[-1] = (runs[-1][0], current + bucket)
+            else:
+                runs.append((current, current + bucket))
+        current += bucket
+    return runs
+
+
+def _merge_series(parts: list[tuple[list[datetime], list[int], dict[str, SeriesStats]]]) -> tuple[list[datetime], list[int], dict[str, SeriesStats]]:
+    """Combine series built from different sources into one, the earlier part winning a bucket both have"""
+    rows = {}
+    for bucket_starts, counts, series in parts:
+        for index, bucket_start in enumerate(bucket_starts):
+            rows.setdefault(bucket_start, (counts[index], {
+                metric: {name: getattr(stats, name)[index] for name in ('min', 'avg', 'max', 'p95')}
+                for metric, stats in series.items()
+            }))
+    bucket_starts = sorted(rows)
+    series = {
+        metric: SeriesStats(**{name: [rows[bucket_start][1][metric][name] for bucket_start in bucket_starts] for name in ('min', 'avg', 'max', 'p95')})
+        for metric in METRICS
+    }
+    return bucket_starts, [rows[bucket_start][0] for bucket_start in bucket_starts], series
+
+
+def get_log_series(endpoint_id: str, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, points: int = 200, regions: Optional[list[str]] = None) -> LogSeriesResponse:
+    """Downsampled latency series for charts, about points buckets whatever the range.
+
+    Buckets of a minute or more are merged from the coarsest rollups that
+    fit in them and that the owner's plan still keeps, widened to a whole
+    number of rollup buckets. Shorter buckets, and buckets with no rollups
+    in the requested regions such as history from before rollups were
+    written, are built from the raw logs with vectorized aggregation.
+    Buckets are aligned to multiples of their width so a refreshed chart
+    keeps the same buckets. Defaults to the last day.
+    """
+    try:
+        end = to_utc_naive(end_date) if end_date else datetime.utcnow()
+        start = to_utc_naive(start_date) if start_date else end - DEFAULT_SERIES_RANGE
+        if start >= end:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        if end - start > MAX_SERIES_RANGE:
+            raise HTTPException(status_code=400, detail=f"Series are limited to a {MAX_SERIES_RANGE.days} day range")
+        bucket_seconds = _bucket_seconds(start, end, points)
+        granularity = _rollup_granularity(start, bucket_seconds, get_user_plan(user_id)) if bucket_seconds >= 60 else None
+        if granularity is not None:
+            width = GRANULARITY_WIDTHS[granularity]
+            bucket_seconds = math.ceil(bucket_seconds / width.total_seconds()) * int(width.total_seconds())
+        bucket = timedelta(seconds=bucket_seconds)
+        aligned_start = _EPOCH + (start - _EPOCH) // bucket * bucket
+
+        region_set = set(regions) if regions else None
+        if granularity is None:
+            bucket_starts, counts, series = _series_from_logs(endpoint_id, user_id, start, end, aligned_start, bucket_seconds, region_set)
+        else:
+            # Up to the end of the rollup bucket holding end, so the current bucket is included
+            items = query_rollups(user_id, endpoint_id, granularity, aligned_start, aligned_start + math.ceil((end - aligned_start) / width) * width)
+            if region_set:
+                items = [item for item in items if item.get('region') in region_set]
+            parts = [_series_from_rollups(items, aligned_start, bucket_seconds)]
+            for run_start, run_end in _missing_runs(parts[0][0], aligned_start, end, bucket):
+                parts.append(_series_from_logs(endpoint_id, user_id, max(start, run_start), min(end, run_end), aligned_start, bucket_seconds, region_set))
+            bucket_starts, counts, series = _merge_series(parts)
+        return LogSeriesResponse(
+            endpoint_id=endpoint_id,
+            start_date=start,
+            end_date=end,
+            bucket_seconds=bucket_seconds,
+            timestamps=bucket_starts,
+            counts=counts,
+            series=series
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building log series: {str(e)}")
@@ -0,0 +1,54 @@
+from app.db.dynamodb import batch_get
+from app.schemas import RegionStatus, EndpointStatus
+from fastapi import HTTPException
+import os
+
+
+TABLE_NAME = os.getenv('STATUS_TABLE_NAME', 'dev-us-east-1-central-api-status-dynamodb-table')
+# Regions running the monitoring Lambda; each writes one status record per endpoint
+MONITORING_REGIONS = [
+    region.strip()
+    for region in os.getenv('MONITORING_REGIONS', 'us-east-1,eu-west-1,ap-south-1,ap-southeast-1,sa-east-1').split(',')
+    if region.strip()
+]
+
+
+def _region_status(item: dict) -> RegionStatus:
+    return RegionStatus(
+        region=item['region'],
+        is_up=item['is_up'],
+        status_code=int(item['status_code']) if item.get('status_code') is not None else None,
+        response_time=float(item['response_time']) if item.get('response_time') is not None else None,
+        error_message=item.get('error_message'),
+        checked_at=item['checked_at'],
+        consecutive_failures=int(item.get('consecutive_failures', 0)),
+        last_change_at=item.get('last_change_at')
+    )
+
+
+def get_endpoint_statuses(endpoint_ids: list[str], user_id: str) -> list[EndpointStatus]:
+    """Read the per-region status records of many endpoints with BatchGetItem.
+
+    Records belonging to another user are dropped, so unknown or foreign
+    endpoint ids come back without regions.
+    """
+    try:
+        endpoint_ids = list(dict.fromkeys(endpoint_ids))
+        keys = [{'endpoint_id': endpoint_id, 'region': region} for endpoint_id in endpoint_ids for region in MONITORING_REGIONS]
+        by_endpoint = {endpoint_id: [] for endpoint_id in endpoint_ids}
+        for item in batch_get(TABLE_NAME, keys):
+            if item.get('user_id') == user_id:
+                by_endpoint[item['endpoint_id']].append(_region_status(item))
+        statuses = []
+        for endpoint_id, regions in by_endpoint.items():
+            regions.sort(key=lambda status: status.region)
+            latest = max(regions, key=lambda status: status.checked_at, default=None)
+            statuses.append(EndpointStatus(
+                endpoint_id=endpoint_id,
+                is_up=latest.is_up if latest else None,
+                last_checked_at=latest.checked_at if latest else None,
+                regions=regions
+            ))
+        return statuses
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching endpoint status: {str(e)}")
@@ -1,7 +1,10 @@
-from app.db.dynamodb import get_table
-from app.schemas import UserCreate, UserOut
+from app.db.dynamodb import get_table, is_condition_failure
+from botocore.exceptions import ClientError
+from app.schemas import UserCreate, UserOut, UserListResponse
+from app.utils.pagination import encode_cursor, decode_cursor, query_fingerprint, CURSOR_USERS
 from datetime import datetime
 from fastapi import HTTPException
+from typing import Optional
 import os
 
 
@@ -24,11 +27,24 @@ def create_user(user: UserCreate) -> UserOut:
         raise HTTPException(status_code=500, detail=str(e))
     
 
-def get_users() -> list[UserOut]:
+def get_users(limit: int = 100, next_token: Optional[str] = None) -> UserListResponse:
+    """Fetch one page of users"""
     try:
+        fingerprint = query_fingerprint('users', limit)
+        scan_kwargs = {'Limit': limit}
+        if next_token:
+            _, (user_id,) = decode_cursor(next_token, fingerprint, (CURSOR_USERS,))
+            scan_kwargs['ExclusiveStartKey'] = {'user_id': user_id}
         table = get_table(TABLE_NAME)
-        response = table.scan()
-        return [UserOut(**item) for item in response['Items']]
+        response = table.scan(**scan_kwargs)
+        has_more = 'LastEvaluatedKey' in response
+        return UserListResponse(
+            users=[UserOut(**item) for item in response['Items']],
+            next_token=encode_cursor(CURSOR_USERS, fingerprint, (response['LastEvaluatedKey']['user_id'],)) if has_more else None,
+            has_more=has_more
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -46,18 +62,14 @@ def get_user_by_id(user_id: int) -> UserOut:
 def delete_user(user_id: int) -> None:
     table = get_table(TABLE_NAME)
     try:
-        if not get_user_by_id(user_id):
-            raise HTTPException(status_code=404, detail=f"User with id: {user_id} not found")
-        table.delete_item(Key = {"user_id": user_id})
+        table.delete_item(
+            Key = {"user_id": user_id},
+            ConditionExpression="attribute_exists(user_id)"
+        )
         return {"message": f"User with id: {user_id} deleted successfully"}
+    except ClientError as e:
+        if is_condition_failure(e):
+            raise HTTPException(status_code=404, detail=f"User with id: {user_id} not found")
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
-
-
-
-
-
-
-
-
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from app.routers import users, endpoints, logsRoute
+from app.routers import users, endpoints, logsRoute, dashboard
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
@@ -67,4 +67,5 @@ def read_root():
 # Include routers
 app.include_router(users.router)
 app.include_router(endpoints.router)
-app.include_router(logsRoute.router)
\ No newline at end of file
+app.include_router(logsRoute.router)
+app.include_router(dashboard.router)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.schemas import DashboardSummaryResponse
+from app.db.dashboard import get_dashboard_summary
+from app.auth.cognito import get_current_user
+
+
+router = APIRouter(
+    prefix='/dashboard',
+    tags=['dashboard']
+)
+
+
+@router.get("/summary",response_model=DashboardSummaryResponse,status_code=status.HTTP_200_OK)
+async def get_dashboard_summary_route(user_id: str = Depends(get_current_user)):
+    try:
+        return await get_dashboard_summary(user_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,12 @@
-from fastapi import APIRouter,Depends,HTTPException,status
-from app.schemas import EndPointIn, EndPointOut
-from app.db.endpoints import create_endpoint, get_endpoints, get_endpoint, update_endpoint, delete_endpoint
+from fastapi import APIRouter,Depends,HTTPException,Query,UploadFile,File,status
+from app.schemas import EndPointIn, EndPointOut, EndPointUpdate, EndPointListResponse, EndPointBulkUpdate, EndPointBulkDelete, BulkResultResponse, EndpointStatus
+from app.db.endpoints import create_endpoint, get_endpoints, get_all_endpoints, get_endpoint, update_endpoint, delete_endpoint
+from app.db.endpoints import bulk_create_endpoints, bulk_update_endpoints, bulk_delete_endpoints, check_bulk_size, parse_bulk_items
+from app.db.status import get_endpoint_statuses
+from app.utils.endpoint_csv import parse_endpoint_csv
 from app.auth.cognito import get_current_user
+from app.db.dynamodb import run_db
+from typing import Optional, List
 
 
 router = APIRouter(
@@ -11,45 +16,111 @@ router = APIRouter(
 
 
 @router.post("",response_model=EndPointOut,status_code=status.HTTP_201_CREATED)
-def create_endpoint_route(endpoint: EndPointIn,user_id: str = Depends(get_current_user)):
+async def create_endpoint_route(endpoint: EndPointIn,user_id: str = Depends(get_current_user)):
     try:
-        return create_endpoint(endpoint,user_id)
+        return await run_db(create_endpoint,endpoint,user_id)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("",response_model=list[EndPointOut],status_code=status.HTTP_200_OK)
-def get_endpoints_route(user_id: str = Depends(get_current_user)):
+@router.get("",response_model=EndPointListResponse,status_code=status.HTTP_200_OK)
+async def get_endpoints_route(user_id: str = Depends(get_current_user),
+    limit: Optional[int] = Query(100,ge=1,le=500),
+    next_token: Optional[str] = Query(None)
+):
     try:
-        return get_endpoints(user_id)
+        return await run_db(get_endpoints,user_id,limit,next_token)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+# Bulk routes are declared before /{endpoint_id} so "bulk" is not taken as an id
+@router.post("/bulk",response_model=BulkResultResponse,status_code=status.HTTP_200_OK)
+async def bulk_create_endpoints_route(endpoints: list[dict],user_id: str = Depends(get_current_user)):
+    try:
+        check_bulk_size(len(endpoints))
+        entries, rejected = parse_bulk_items(endpoints, EndPointIn)
+        return await run_db(bulk_create_endpoints,entries,user_id,rejected)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/bulk/csv",response_model=BulkResultResponse,status_code=status.HTTP_200_OK)
+async def bulk_import_endpoints_route(file: UploadFile = File(...),user_id: str = Depends(get_current_user)):
+    try:
+        try:
+            entries, rejected = parse_endpoint_csv((await file.read()).decode('utf-8-sig'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {str(e)}")
+        check_bulk_size(len(entries) + len(rejected))
+        return await run_db(bulk_create_endpoints,entries,user_id,rejected)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/bulk",response_model=BulkResultResponse,status_code=status.HTTP_200_OK)
+async def bulk_update_endpoints_route(updates: list[dict],user_id: str = Depends(get_current_user)):
+    try:
+        check_bulk_size(len(updates))
+        entries, rejected = parse_bulk_items(updates, EndPointBulkUpdate)
+        return await bulk_update_endpoints(entries,user_id,rejected)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/bulk",response_model=BulkResultResponse,status_code=status.HTTP_200_OK)
+async def bulk_delete_endpoints_route(request: EndPointBulkDelete,user_id: str = Depends(get_current_user)):
+    try:
+        check_bulk_size(len(request.endpoint_ids))
+        return await run_db(bulk_delete_endpoints,request.endpoint_ids,user_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+@router.get("/status",response_model=list[EndpointStatus],status_code=status.HTTP_200_OK)
+async def get_endpoint_statuses_route(user_id: str = Depends(get_current_user),
+    endpoint_ids: Optional[List[str]] = Query(None)
+):
+    """Current per-region status of the given endpoints, or of all the caller's endpoints"""
+    try:
+        if endpoint_ids:
+            check_bulk_size(len(endpoint_ids))
+        else:
+            endpoint_ids = [endpoint.endpoint_id for endpoint in await run_db(get_all_endpoints,user_id)]
+        return await run_db(get_endpoint_statuses,endpoint_ids,user_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{endpoint_id}",response_model=EndPointOut,status_code=status.HTTP_200_OK)
-def get_one_endpoint_route(endpoint_id: str,user_id: str = Depends(get_current_user)):
+async def get_one_endpoint_route(endpoint_id: str,user_id: str = Depends(get_current_user)):
     try:
-        return get_endpoint(endpoint_id,user_id)
+        return await run_db(get_endpoint,endpoint_id,user_id)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.put("/{endpoint_id}",response_model=EndPointOut,status_code = status.HTTP_200_OK)
-def update_endpoint_route(endpoint_id: str,endpoint: EndPointIn,user_id: str = Depends(get_current_user)):
+async def update_endpoint_route(endpoint_id: str,endpoint: EndPointUpdate,user_id: str = Depends(get_current_user)):
     try:
-        return update_endpoint(endpoint_id,endpoint,user_id)
+        return await run_db(update_endpoint,endpoint_id,endpoint,user_id)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.delete("/{endpoint_id}",status_code=status.HTTP_204_NO_CONTENT)
-def delete_endpoint_route(endpoint_id: str,user_id: str = Depends(get_current_user)):
+async def delete_endpoint_route(endpoint_id: str,user_id: str = Depends(get_current_user)):
     try:
-       delete_endpoint(endpoint_id,user_id)
+       await run_db(delete_endpoint,endpoint_id,user_id)
     except HTTPException as e:
         raise e
     except Exception as e:
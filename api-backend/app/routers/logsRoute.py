@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
-from fastapi.responses import StreamingResponse
-from app.db.logsFetch import get_logs_by_endpoint
-from app.schemas import LogListResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from app.db.logsFetch import query_log_page, iter_log_pages, decode_log_item
+from app.db.rollups import get_log_stats
+from app.db.consensus import get_region_consensus
+from app.db.series import get_log_series
+from app.schemas import LogListResponse, LogStatsResponse, LogSeriesResponse, RegionConsensusResponse
 from app.auth.cognito import get_current_user
-from typing import Optional
+from app.db.dynamodb import run_db, iterate_db
+from typing import Optional, List
 from datetime import datetime
 import csv
 import io
+import orjson
 
 router = APIRouter(
     prefix="/logs",
@@ -16,60 +21,137 @@ router = APIRouter(
 @router.get("/{endpoint_id}", response_model=LogListResponse,status_code=200)
 async def get_logs_by_endpoint_route(endpoint_id: str,user_id: str=Depends(get_current_user),
     limit: Optional[int] = Query(10,ge=1,le=100),
-    next_token: Optional[str] = Query(None)
+    next_token: Optional[str] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None)
 ):
     try:
-        return get_logs_by_endpoint(endpoint_id,user_id,limit,next_token)
+        # The page is decoded into plain dicts and serialised with orjson directly,
+        # skipping a second validation pass through response_model
+        return ORJSONResponse(await run_db(query_log_page,endpoint_id,user_id,limit,next_token,start_date,end_date))
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
+@router.get("/{endpoint_id}/stats", response_model=LogStatsResponse, status_code=200)
+async def get_log_stats_route(endpoint_id: str, user_id: str = Depends(get_current_user),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    regions: Optional[List[str]] = Query(None)
+):
+    try:
+        return await run_db(get_log_stats,endpoint_id, user_id, start_date, end_date, regions)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+@router.get("/{endpoint_id}/series", response_model=LogSeriesResponse, status_code=200)
+async def get_log_series_route(endpoint_id: str, user_id: str = Depends(get_current_user),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    points: int = Query(200, ge=10, le=1000),
+    regions: Optional[List[str]] = Query(None)
+):
+    try:
+        return await run_db(get_log_series, endpoint_id, user_id, start_date, end_date, points, regions)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+@router.get("/{endpoint_id}/regions", response_model=RegionConsensusResponse, status_code=200)
+async def get_region_consensus_route(endpoint_id: str, user_id: str = Depends(get_current_user),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    window_minutes: int = Query(5, ge=1, le=60)
+):
+    try:
+        return await run_db(get_region_consensus, endpoint_id, user_id, start_date, end_date, window_minutes)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+EXPORT_CSV_HEADER = [
+    "Timestamp", "Region", "Status", "Response Time", "DNS Latency", "Connection Latency",
+    "Total Latency", "Status Code", "Result", "Certificate", "Error"
+]
+# Archived partitions only need these columns read for a CSV export
+EXPORT_CSV_COLUMNS = (
+    "timestamp", "region", "is_up", "response_time", "dns_latency", "connection_latency",
+    "total_latency", "status_code", "certificate_valid", "error_message"
+)
+
+
+def _csv_rows(items: list[dict]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for item in items:
+        log = decode_log_item(item)
+        writer.writerow([
+            log['timestamp'],
+            log['region'],
+            'Online' if log['is_up'] else 'offline',
+            log['response_time'],
+            log['dns_latency'],
+            log['connection_latency'],
+            log['total_latency'],
+            log['status_code'],
+            'Success' if log['status_code'] is not None and log['status_code'] < 400 else 'Error',
+            'Valid' if log['certificate_valid'] else 'Invalid',
+            log['error_message'] or 'None'
+        ])
+    return buffer.getvalue()
+
+
+def _csv_rows_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_CSV_HEADER)
+    return buffer.getvalue()
+
+
+def _ndjson_rows(items: list[dict]) -> bytes:
+    return b''.join(orjson.dumps(decode_log_item(item)) + b'\n' for item in items)
+
+
 @router.get("/{endpoint_id}/export")
 async def export_logs(
     endpoint_id: str,
-    start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
     user_id: str = Depends(get_current_user)
 ):
+    """Stream every log in the time range as CSV or NDJSON, one archive partition or DynamoDB page at a time"""
+    columns = EXPORT_CSV_COLUMNS if format == "csv" else None
+    pages = iterate_db(iter_log_pages(endpoint_id, user_id, start_date, end_date, columns=columns))
+    render = _csv_rows if format == "csv" else _ndjson_rows
     try:
-        logs = get_logs_by_endpoint(endpoint_id,user_id)
-        if not logs:
-            raise HTTPException(status_code=404, detail="No logs found")
-        
-        # Create a CSV buffer
-        csv_buffer = io.StringIO()
-        writer = csv.writer(csv_buffer)
-        
-        # Write the header
-        writer.writerow(["Timestamp","Status","Response Time","User Agent"])
-        
-        # Write the data
-        for log in logs.logs:
-            writer.writerow([
-                log.timestamp,
-                log.region,
-                'Online' if log.is_up else 'offline',
-                log.response_time,
-                log.dns_latency,
-                log.connection_latency,
-                log.total_latency,
-                log.status_code,
-                'Success' if log.status_code < 400 else 'Error',
-                'Valid' if log.certificate_valid else 'Invalid',
-                log.error_message or 'None'
-                ])
-        
-        # Move the cursor to the beginning of the stream
-        csv_buffer.seek(0)
-        return StreamingResponse(
-            iter([csv_buffer.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=logs_{endpoint_id}.csv"}
-        )
-        
-        
+        # Fetch the first page up front so query errors still produce an error response
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = None
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
+
+    async def stream():
+        if format == "csv":
+            yield _csv_rows_header()
+        if first_page is None:
+            return
+        yield render(first_page)
+        async for page in pages:
+            yield render(page)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=logs_{endpoint_id}.{format}"}
+    )
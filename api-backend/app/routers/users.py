@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas import UserOut, UserCreate
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from app.schemas import UserOut, UserCreate, UserListResponse, RetentionResponse
 from datetime import datetime
 from app.db.users import get_users as get_users_db , get_user_by_id as get_user_by_id_db
 from app.db.users import create_user as create_user_db
 from app.db.users import delete_user as delete_user_db
-from app.auth.cognito import get_current_user
+from app.db.retention import get_retention
+from app.auth.cognito import get_current_user, get_admin_user
+from app.db.dynamodb import run_db
 
 
 router = APIRouter(
@@ -14,31 +17,39 @@ router = APIRouter(
 
 
 @router.get("/me",response_model=UserOut,status_code=status.HTTP_200_OK)
-def get_current_user_info(current_user_id: str = Depends(get_current_user)):
-    return get_user_by_id_db(current_user_id)
+async def get_current_user_info(current_user_id: str = Depends(get_current_user)):
+    return await run_db(get_user_by_id_db,current_user_id)
 
 
-@router.get("",response_model=list[UserOut],status_code=status.HTTP_200_OK)
-def get_users():
-    return get_users_db()
+@router.get("/me/retention",response_model=RetentionResponse,status_code=status.HTTP_200_OK)
+async def get_current_user_retention(current_user_id: str = Depends(get_current_user)):
+    return await run_db(get_retention,current_user_id)
+
+
+@router.get("",response_model=UserListResponse,status_code=status.HTTP_200_OK)
+async def get_users(limit: int = Query(100, ge=1, le=100),
+    next_token: Optional[str] = Query(None),
+    admin_user_id: str = Depends(get_admin_user)
+):
+    return await run_db(get_users_db,limit,next_token)
 
 
 @router.get("/{user_id}",response_model=UserOut,status_code=status.HTTP_200_OK)
-def get_user_by_id(user_id: str,current_user_id: str = Depends(get_current_user)):
+async def get_user_by_id(user_id: str,current_user_id: str = Depends(get_current_user)):
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this user")
-    return get_user_by_id_db(user_id)
+    return await run_db(get_user_by_id_db,user_id)
 
 
 @router.post("",response_model=UserOut,status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate):
-    return create_user_db(user)
+async def create_user(user: UserCreate):
+    return await run_db(create_user_db,user)
 
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: str,current_user_id: str = Depends(get_current_user)):
+async def delete_user(user_id: str,current_user_id: str = Depends(get_current_user)):
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this user")
-    return delete_user_db(user_id)
+    return await run_db(delete_user_db,user_id)
     
\ No newline at end of file
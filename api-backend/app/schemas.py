@@ -15,16 +15,58 @@ class UserOut(UserCreate):
     class Config:
         orm_mode = True
 
+class UserListResponse(BaseModel):
+    users: list[UserOut]
+    next_token: Optional[str] = None
+    has_more: bool
+
+    class Config:
+        orm_mode = True
+
+
+class RetentionResponse(BaseModel):
+    plan: str
+    # Raw check logs, hot table and archive together
+    log_retention_days: int
+    logs_available_from: datetime
+    hot_log_days: int
+    archived_log_days: int
+    # Downsampled statistics per rollup granularity (minute, hour, day)
+    rollup_retention_days: Dict[str, int]
+    stats_available_from: datetime
+
+
+# The monitoring Lambda runs once a minute, so shorter intervals could not be honoured
+MIN_CHECK_INTERVAL = 60
+MAX_CHECK_INTERVAL = 86400
+# cold: every check resolves, connects and handshakes afresh (first-visitor latency);
+# warm: checks reuse cached DNS and kept-alive connections (steady-state latency)
+MEASUREMENT_MODES = ('cold', 'warm')
 
 class EndPointIn(BaseModel):
     url: str
     is_active: bool = True
+    # Seconds between checks of this endpoint
+    check_interval: int = 300
+    measurement_mode: str = "cold"
     @validator('url')
     def validate_url(cls, v):
         if not v.startswith('http'):
             raise ValueError('URL must start with http or https')
         return v
 
+    @validator('check_interval')
+    def validate_check_interval(cls, v):
+        if v is not None and not MIN_CHECK_INTERVAL <= v <= MAX_CHECK_INTERVAL:
+            raise ValueError(f'check_interval must be between {MIN_CHECK_INTERVAL} and {MAX_CHECK_INTERVAL} seconds')
+        return v
+
+    @validator('measurement_mode')
+    def validate_measurement_mode(cls, v):
+        if v is not None and v not in MEASUREMENT_MODES:
+            raise ValueError(f"measurement_mode must be one of {', '.join(MEASUREMENT_MODES)}")
+        return v
+
 class EndPointOut(EndPointIn):
     endpoint_id: str
     created_at: datetime
@@ -35,6 +77,45 @@ class EndPointOut(EndPointIn):
 
 
 
+class EndPointListResponse(BaseModel):
+    endpoints: list[EndPointOut]
+    next_token: Optional[str] = None
+    has_more: bool
+
+    class Config:
+        orm_mode = True
+
+
+class EndPointUpdate(EndPointIn):
+    # Left out of a request, a setting keeps its stored value
+    is_active: Optional[bool] = None
+    check_interval: Optional[int] = None
+    measurement_mode: Optional[str] = None
+
+
+class EndPointBulkUpdate(EndPointUpdate):
+    endpoint_id: str
+
+
+class EndPointBulkDelete(BaseModel):
+    endpoint_ids: list[str]
+
+
+class BulkItemResult(BaseModel):
+    # Position of the item in the request (the data row number for CSV uploads)
+    index: int
+    endpoint_id: Optional[str] = None
+    status: str
+    detail: Optional[str] = None
+    endpoint: Optional[EndPointOut] = None
+
+
+class BulkResultResponse(BaseModel):
+    results: list[BulkItemResult]
+    succeeded: int
+    failed: int
+
+
 class TimeRangeParams(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
@@ -48,6 +129,8 @@ class LogResponse(BaseModel):
     response_time: Optional[float] 
     dns_latency: Optional[float] 
     connection_latency: Optional[float] 
+    tls_handshake_latency: Optional[float] = None
+    ttfb: Optional[float] = None
     total_latency: Optional[float] 
     is_up: bool
     certificate_valid: bool
@@ -58,6 +141,8 @@ class LogResponse(BaseModel):
     tls_version: Optional[str] 
     secure_protocol: bool
     region: Optional[str] = None
+    measurement_mode: Optional[str] = None
+    connection_reused: Optional[bool] = None
 
     class Config:
         orm_mode = True
@@ -94,12 +179,108 @@ class LogStatsResponse(BaseModel):
     average_dns_latency: float
     average_connection_latency: float
     average_total_latency: float
+    min_response_time: Optional[float] = None
+    max_response_time: Optional[float] = None
     status_code_distribution: Dict[int, int]
+    # Per metric, e.g. {"response_time": {"p50": 120.3, "p90": 210.0, "p99": 480.2}}
+    percentiles: Dict[str, Dict[str, float]] = {}
     class Config:
         orm_mode = True
 
 
-    
+class SeriesStats(BaseModel):
+    # One value per bucket in LogSeriesResponse.timestamps; None where the
+    # bucket had no value for this metric
+    min: list[Optional[float]]
+    avg: list[Optional[float]]
+    max: list[Optional[float]]
+    p95: list[Optional[float]]
+
+
+class LogSeriesResponse(BaseModel):
+    endpoint_id: str
+    start_date: datetime
+    end_date: datetime
+    bucket_seconds: int
+    # Start of each bucket that had at least one check, oldest first
+    timestamps: list[datetime]
+    counts: list[int]
+    series: Dict[str, SeriesStats]
+
+
+class RegionStatus(BaseModel):
+    region: str
+    is_up: bool
+    status_code: Optional[int] = None
+    response_time: Optional[float] = None
+    error_message: Optional[str] = None
+    checked_at: datetime
+    consecutive_failures: int = 0
+    last_change_at: Optional[datetime] = None
+
+
+class EndpointStatus(BaseModel):
+    endpoint_id: str
+    # Taken from the most recently checked region; None until the first check
+    is_up: Optional[bool] = None
+    last_checked_at: Optional[datetime] = None
+    regions: list[RegionStatus] = []
 
 
+class EndpointSummary(BaseModel):
+    endpoint_id: str
+    url: str
+    is_active: bool
+    check_interval: int
+    measurement_mode: str = "cold"
+    # Latest check from any region; None until the endpoint has been checked
+    is_up: Optional[bool] = None
+    last_checked_at: Optional[datetime] = None
+    last_status_code: Optional[int] = None
+    last_response_time: Optional[float] = None
+    last_region: Optional[str] = None
+    consecutive_failures: int = 0
+    last_change_at: Optional[datetime] = None
+    uptime_24h: Optional[float] = None
+    checks_24h: int = 0
+    # Hourly average response time over the last 24 hours, oldest first
+    sparkline: list[Optional[float]] = []
+
+
+class DashboardSummaryResponse(BaseModel):
+    endpoints: list[EndpointSummary]
+    total_endpoints: int
+    up_endpoints: int
+    down_endpoints: int
+    generated_at: datetime
+
+
+class RegionResult(BaseModel):
+    region: str
+    is_up: bool
+    checks: int
+    up_checks: int
+    average_response_time: Optional[float] = None
+
+
+class ConsensusWindow(BaseModel):
+    window_start: datetime
+    # Down when at least the quorum of reporting regions saw the endpoint down
+    is_up: bool
+    regions_reporting: int
+    regions_up: int
+    regions_down: int
+    median_response_time: Optional[float] = None
+    p95_response_time: Optional[float] = None
+    slowest_region: Optional[str] = None
+    regions: list[RegionResult]
+
+
+class RegionConsensusResponse(BaseModel):
+    endpoint_id: str
+    quorum: int
+    window_minutes: int
+    # Verdict over each region's latest status record
+    current: Optional[ConsensusWindow] = None
+    windows: list[ConsensusWindow]
 
@@ -0,0 +1,45 @@
+from app.schemas import EndPointIn, BulkItemResult
+from pydantic import ValidationError
+import csv
+import io
+
+TRUE_VALUES = {'true', '1', 'yes', 'y', 'active'}
+FALSE_VALUES = {'false', '0', 'no', 'n', 'inactive'}
+
+
+def _parse_bool(value: str) -> bool:
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f'is_active must be true or false, got {value!r}')
+
+
+def parse_endpoint_csv(text: str) -> tuple[list[tuple[int, EndPointIn]], list[BulkItemResult]]:
+    """Validate every row of an endpoint CSV (url, is_active, check_interval, measurement_mode columns).
+
+    Returns (row number, endpoint) pairs for valid rows and error results for the rest;
+    only the url column is required.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or 'url' not in [name.strip() for name in reader.fieldnames]:
+        raise ValueError('CSV must have a header row with a url column')
+    entries = []
+    rejected = []
+    for index, row in enumerate(reader, start=1):
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        try:
+            fields = {'url': row['url']}
+            if row.get('is_active'):
+                fields['is_active'] = _parse_bool(row['is_active'])
+            if row.get('check_interval'):
+                fields['check_interval'] = int(row['check_interval'])
+            if row.get('measurement_mode'):
+                fields['measurement_mode'] = row['measurement_mode'].lower()
+            entries.append((index, EndPointIn(**fields)))
+        except ValidationError as e:
+            rejected.append(BulkItemResult(index=index, status='error', detail='; '.join(error['msg'] for error in e.errors())))
+        except ValueError as e:
+            rejected.append(BulkItemResult(index=index, status='error', detail=str(e)))
+    return entries, rejected
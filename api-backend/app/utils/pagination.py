@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from typing import Union
+from fastapi import HTTPException
+
+
+logger = logging.getLogger(__name__)
+
+# Key for signing next_token cursors. Every API instance must share it, or a
+# cursor issued by one instance is rejected by another.
+_signing_key = os.getenv('CURSOR_SIGNING_KEY', '').encode('utf-8')
+if not _signing_key:
+    logger.warning('CURSOR_SIGNING_KEY is not set; cursors are only valid in this process')
+    _signing_key = secrets.token_bytes(32)
+
+# Cursor layout before base64url: version, kind, query fingerprint, values,
+# then a truncated HMAC-SHA256 over everything before it
+CURSOR_VERSION = 1
+FINGERPRINT_BYTES = 8
+SIGNATURE_BYTES = 16
+_STR, _INT = 1, 2
+# Cursor kinds, one per paginated resource and position type
+CURSOR_LOGS = 1
+CURSOR_LOGS_ARCHIVE = 2
+CURSOR_ENDPOINTS = 3
+CURSOR_USERS = 4
+
+Value = Union[str, int]
+
+
+def _write_varint(value: int, out: bytearray) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+        if shift > 63:
+            raise ValueError('varint too long')
+
+
+def query_fingerprint(*parts) -> bytes:
+    """Short digest of the query a cursor belongs to (owner, resource, range, limit, ...)"""
+    digest = hashlib.sha256('\x1f'.join('' if part is None else str(part) for part in parts).encode('utf-8'))
+    return digest.digest()[:FINGERPRINT_BYTES]
+
+
+def encode_cursor(kind: int, fingerprint: bytes, values: tuple[Value, ...] = ()) -> str:
+    """Pack, sign and base64url-encode a cursor of the given kind"""
+    body = bytearray((CURSOR_VERSION, kind))
+    body += fingerprint
+    for value in values:
+        if isinstance(value, int):
+            body.append(_INT)
+            # Zigzag so small negative numbers stay short
+            _write_varint((value << 1) ^ (value >> 63), body)
+        else:
+            encoded = value.encode('utf-8')
+            body.append(_STR)
+            _write_varint(len(encoded), body)
+            body += encoded
+    body += hmac.new(_signing_key, bytes(body), hashlib.sha256).digest()[:SIGNATURE_BYTES]
+    return base64.urlsafe_b64encode(bytes(body)).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token: str, fingerprint: bytes, kinds: tuple[int, ...]) -> tuple[int, tuple[Value, ...]]:
+    """Verify a cursor and return (kind, values).
+
+    Raises a 400 for anything that was not issued by this API for the same
+    query, before any database read is spent on it.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        body, signature = data[:-SIGNATURE_BYTES], data[-SIGNATURE_BYTES:]
+        if len(body) < 2 + FINGERPRINT_BYTES:
+            raise ValueError('cursor too short')
+        expected = hmac.new(_signing_key, body, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+        if not hmac.compare_digest(signature, expected):
+            raise ValueError('bad signature')
+        if body[0] != CURSOR_VERSION or body[1] not in kinds:
+            raise ValueError('unexpected cursor kind')
+        if not hmac.compare_digest(body[2:2 + FINGERPRINT_BYTES], fingerprint):
+            raise ValueError('cursor belongs to another query')
+        values = []
+        offset = 2 + FINGERPRINT_BYTES
+        while offset < len(body):
+            tag = body[offset]
+            number, offset = _read_varint(body, offset + 1)
+            if tag == _INT:
+                values.append((number >> 1) ^ -(number & 1))
+            elif tag == _STR:
+                values.append(body[offset:offset + number].decode('utf-8'))
+                offset += number
+            else:
+                raise ValueError('unknown value tag')
+        return body[1], tuple(values)
+    except Exception:
+        raise HTTPException(status_code=400, detail='Invalid next_token')
@@ -0,0 +1,119 @@
+import math
+
+
+# DDSketch with a fixed relative accuracy: every quantile it returns is
+# within RELATIVE_ACCURACY of the true value. The monitoring Lambda writes
+# these into rollup buckets and the API merges them, so this file is kept
+# identical in lambda-code/monitoring-lambda-code/sketch.py and
+# api-backend/app/utils/sketch.py; the tests fail when the copies differ.
+RELATIVE_ACCURACY = 0.01
+SKETCH_VERSION = 1
+# Beyond this many bins the lowest ones are collapsed, so only the low tail
+# loses accuracy
+MAX_BINS = 2048
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def _write_varint(value: int, out: bytearray) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+class Sketch:
+    """Mergeable quantile sketch of non-negative values (latencies in ms)"""
+
+    def __init__(self):
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + count
+        self._collapse()
+
+    def merge(self, other: 'Sketch') -> None:
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self._collapse()
+
+    def _collapse(self) -> None:
+        if len(self.bins) <= MAX_BINS:
+            return
+        ordered = sorted(self.bins)
+        keep = ordered[len(ordered) - MAX_BINS]
+        for index in ordered[:len(ordered) - MAX_BINS]:
+            self.bins[keep] += self.bins.pop(index)
+
+    def quantile(self, q: float) -> float | None:
+        """Value at quantile q (0..1), or None for an empty sketch"""
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Midpoint of the bin, which keeps the relative error within RELATIVE_ACCURACY
+                return 2 * _GAMMA ** index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.bins) / (_GAMMA + 1)
+
+    def to_bytes(self) -> bytes:
+        """Version, zero count, bin count, then (index delta, count) varints in index order"""
+        out = bytearray((SKETCH_VERSION,))
+        _write_varint(self.zero_count, out)
+        _write_varint(len(self.bins), out)
+        previous = None
+        for index in sorted(self.bins):
+            if previous is None:
+                # Zigzag, as values below 1ms have negative indexes
+                _write_varint((index << 1) ^ (index >> 63), out)
+            else:
+                _write_varint(index - previous, out)
+            _write_varint(self.bins[index], out)
+            previous = index
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Sketch':
+        data = bytes(data)
+        if data[0] != SKETCH_VERSION:
+            raise ValueError(f'Unsupported sketch version {data[0]}')
+        sketch = cls()
+        sketch.zero_count, offset = _read_varint(data, 1)
+        bin_count, offset = _read_varint(data, offset)
+        index = None
+        for _ in range(bin_count):
+            number, offset = _read_varint(data, offset)
+            index = ((number >> 1) ^ -(number & 1)) if index is None else index + number
+            sketch.bins[index], offset = _read_varint(data, offset)
+        return sketch
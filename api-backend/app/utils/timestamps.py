@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalise a datetime to the naive UTC form the monitoring Lambda stores"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,166 @@
+"""Microbenchmark: decoding one page of log items into the /logs response body.
+
+"before" replays the previous per-item path: debug prints, per-field
+conversions, LogResponse(**item), then response_model re-validation and
+JSON encoding. "after" is decode_log_item plus orjson, as the route now
+does. Prints go to /dev/null so the numbers reflect CPU, not terminal I/O.
+
+Run from api-backend/:  python -m benchmarks.bench_log_decoding
+"""
+import contextlib
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+from decimal import Decimal
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import orjson
+from fastapi import HTTPException
+from app.db.logsFetch import decode_log_item
+from app.schemas import LogListResponse, LogResponse
+
+PAGE_SIZE = 100
+ROUNDS = 200
+
+
+def make_item(index: int) -> dict:
+    return {
+        'log_id': f'20260101000000-{index}',
+        'endpoint_id': 'a9d69e39-611d-4cd6-b574-7163c6a62d00',
+        'user_id': 'c4184438-e021-703a-97e9-b9eff58cdff8',
+        'timestamp': f'2026-01-01T00:{index // 60:02d}:{index % 60:02d}.123456',
+        'status_code': Decimal(200),
+        'response_time': Decimal('123.45'),
+        'dns_latency': Decimal('3.21'),
+        'connection_latency': Decimal('12.5'),
+        'tls_handshake_latency': Decimal('25.1'),
+        'ttfb': Decimal('80.2'),
+        'total_latency': Decimal('130.02'),
+        'is_up': True,
+        'certificate_valid': True,
+        'certificate_expiry_date': '2027-01-01T00:00:00',
+        'certificate_issuer': 'R3',
+        'tls_version': 'TLSv1.3',
+        'secure_protocol': True,
+        'error_message': '',
+        'is_secure': True,
+        'region': 'us-east-1',
+    }
+
+
+# Previous implementation, kept verbatim as the baseline
+def legacy_convert_log_item(item: dict, index: int = 0, count: int = 1) -> LogResponse:
+    try:
+        print(f"[DEBUG] Processing item {index + 1}/{count}")
+        print(f"[DEBUG] Raw item: {json.dumps(item, default=str)}")
+        
+        # Convert numeric values from strings
+        if 'response_time' in item and item['response_time'] is not None:
+            item['response_time'] = float(item['response_time'])
+            print(f"[DEBUG] Converted response_time: {item['response_time']}")
+        
+        if 'dns_latency' in item and item['dns_latency'] is not None:
+            item['dns_latency'] = float(item['dns_latency'])
+            print(f"[DEBUG] Converted dns_latency: {item['dns_latency']}")
+        
+        if 'connection_latency' in item and item['connection_latency'] is not None:
+            item['connection_latency'] = float(item['connection_latency'])
+            print(f"[DEBUG] Converted connection_latency: {item['connection_latency']}")
+        
+        if 'tls_handshake_latency' in item and item['tls_handshake_latency'] is not None:
+            item['tls_handshake_latency'] = float(item['tls_handshake_latency'])
+            print(f"[DEBUG] Converted tls_handshake_latency: {item['tls_handshake_latency']}")
+        
+        if 'ttfb' in item and item['ttfb'] is not None:
+            item['ttfb'] = float(item['ttfb'])
+            print(f"[DEBUG] Converted ttfb: {item['ttfb']}")
+        
+        if 'total_latency' in item and item['total_latency'] is not None:
+            item['total_latency'] = float(item['total_latency'])
+            print(f"[DEBUG] Converted total_latency: {item['total_latency']}")
+        
+        if 'status_code' in item and item['status_code'] is not None:
+            item['status_code'] = int(item['status_code'])
+            print(f"[DEBUG] Converted status_code: {item['status_code']}")
+        
+        # Convert timestamp string to datetime
+        if 'timestamp' in item:
+            item['timestamp'] = datetime.fromisoformat(item['timestamp'].replace('Z', '+00:00'))
+            print(f"[DEBUG] Converted timestamp: {item['timestamp']}")
+        
+        # Convert boolean values
+        if 'is_up' in item:
+            item['is_up'] = bool(item['is_up'])
+            print(f"[DEBUG] Converted is_up: {item['is_up']}")
+        
+        if 'certificate_valid' in item:
+            item['certificate_valid'] = bool(item['certificate_valid'])
+            print(f"[DEBUG] Converted certificate_valid: {item['certificate_valid']}")
+        
+        if 'is_secure' in item:
+            item['is_secure'] = bool(item['is_secure'])
+            print(f"[DEBUG] Converted is_secure: {item['is_secure']}")
+        
+        # Set secure_protocol based on is_secure
+        if 'is_secure' in item:
+            item['secure_protocol'] = item['is_secure']
+            print(f"[DEBUG] Set secure_protocol based on is_secure: {item['secure_protocol']}")
+        else:
+            item['secure_protocol'] = False
+        
+        # Ensure required fields are present
+        if 'error_message' not in item:
+            item['error_message'] = 'None'
+        if 'is_secure' not in item:
+            item['is_secure'] = item.get('secure_protocol', False)
+        
+        try:
+            log_response = LogResponse(**item)
+            print(f"[DEBUG] Successfully created LogResponse for item {index + 1}")
+            return log_response
+        except Exception as model_error:
+            print(f"[ERROR] Failed to create LogResponse for item {index + 1}: {str(model_error)}")
+            print(f"[ERROR] Item data: {json.dumps(item, default=str)}")
+            raise HTTPException(
+                status_code=500, 
+                detail=f"Failed to create LogResponse: {str(model_error)}"
+            )
+        
+    except Exception as item_error:
+        print(f"[ERROR] Failed to process item {index + 1}: {str(item_error)}")
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to process log item: {str(item_error)}"
+        )
+
+
+def before(items: list[dict]) -> bytes:
+    logs = [legacy_convert_log_item(dict(item), index, len(items)) for index, item in enumerate(items)]
+    result = LogListResponse(logs=logs, total_count=len(logs), next_token=None, has_more=False)
+    # FastAPI validates the returned model against response_model again before encoding
+    validated = LogListResponse.model_validate(result.model_dump())
+    return validated.model_dump_json().encode()
+
+
+def after(items: list[dict]) -> bytes:
+    logs = [decode_log_item(item) for item in items]
+    return orjson.dumps({'logs': logs, 'total_count': len(logs), 'next_token': None, 'has_more': False})
+
+
+def main():
+    items = [make_item(index) for index in range(PAGE_SIZE)]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        assert json.loads(before(items))['logs'] == json.loads(after(items))['logs']
+        before_seconds = min(timeit.repeat(lambda: before(items), number=ROUNDS, repeat=3)) / ROUNDS
+    after_seconds = min(timeit.repeat(lambda: after(items), number=ROUNDS, repeat=3)) / ROUNDS
+    print(f"page of {PAGE_SIZE} items")
+    print(f"before: {before_seconds * 1000:.3f} ms/page")
+    print(f"after:  {after_seconds * 1000:.3f} ms/page")
+    print(f"speedup: {before_seconds / after_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,16 @@
 from app.main import app
+from app.db.compaction import handle_compaction_event
 from mangum import Mangum
 
 
-handler = Mangum(app)
+asgi_handler = Mangum(app)
+
+
+def handler(event, context):
+    # The scheduled compaction run invokes the API function with {"job": "compact-logs"}
+    if isinstance(event, dict) and event.get('job') == 'compact-logs':
+        return handle_compaction_event(event, context)
+    return asgi_handler(event, context)
 
 
 
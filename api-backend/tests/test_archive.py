@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db import archive
+
+DAY = datetime(2026, 9, 1)
+
+
+def _log(offset_seconds, region='us-east-1', **fields):
+    timestamp = (DAY + timedelta(seconds=offset_seconds)).isoformat()
+    return {
+        'timestamp': timestamp,
+        'timestamp_key': f'{timestamp}#{region}',
+        'region': region,
+        'log_id': f'log-{offset_seconds}-{region}',
+        **fields
+    }
+
+
+LOGS = [
+    _log(60, status_code=200, response_time=120.25, is_up=True, tls_version='TLSv1.3', connection_reused=False),
+    _log(60, region='eu-west-1', status_code=503, response_time=None, is_up=False, error_message='Service Unavailable'),
+    _log(3600, status_code=200, response_time=98.5, dns_latency=0.0, is_up=True, certificate_valid=None),
+]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = archive.LocalStore(str(tmp_path))
+    monkeypatch.setattr(archive, 'store', store)
+    monkeypatch.setattr(archive, '_manifests', {})
+    data, header = archive.encode_partition(LOGS)
+    store.put(archive.partition_key('user-1', 'endpoint-1', '2026-09-01'), data)
+    manifest = archive.empty_manifest()
+    manifest['partitions']['2026-09-01'] = {'rows': header['rows'], 'bytes': len(data), 'min_timestamp': header['min_timestamp'], 'max_timestamp': header['max_timestamp']}
+    manifest['archived_through'] = (DAY + timedelta(days=1)).isoformat()
+    archive.save_manifest('user-1', 'endpoint-1', manifest)
+    return store
+
+
+def _without_none(item):
+    return {name: value for name, value in item.items() if value is not None}
+
+
+def test_partition_round_trip(store):
+    [page] = archive.iter_archived_logs('endpoint-1', 'user-1')
+
+    expected = sorted((_without_none(log) for log in LOGS), key=lambda log: log['timestamp_key'])
+    assert [{name: item[name] for name in log} for item, log in zip(page, expected)] == expected
+    assert all(item['endpoint_id'] == 'endpoint-1' and item['user_id'] == 'user-1' for item in page)
+
+
+def test_reads_only_requested_columns_and_range(store):
+    [page] = archive.iter_archived_logs('endpoint-1', 'user-1', DAY, DAY + timedelta(minutes=30), columns=('response_time',))
+
+    assert [set(item) - {'timestamp_key', 'endpoint_id', 'user_id'} for item in page] == [{'timestamp', 'region'}, {'timestamp', 'region', 'response_time'}]
+    assert archive.archived_through('user-1', 'endpoint-1') == DAY + timedelta(days=1)
+
+
+def test_unknown_format_is_rejected(store):
+    store.put(archive.partition_key('user-1', 'endpoint-1', '2026-09-01'), b'NOTIT' + bytes(8))
+
+    with pytest.raises(RuntimeError):
+        list(archive.iter_archived_logs('endpoint-1', 'user-1'))
@@ -0,0 +1,113 @@
+import asyncio
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+
+from app.auth import cognito
+from app.db import endpoints
+from app.routers import endpoints as endpoints_router
+from app.schemas import EndPointBulkUpdate
+
+
+@pytest.fixture
+def table(monkeypatch):
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        table = dynamodb.create_table(
+            TableName='endpoints',
+            KeySchema=[{'AttributeName': 'endpoint_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'endpoint_id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        monkeypatch.setattr(endpoints, 'endpoints_table', table)
+        for endpoint_id, user_id in (('mine', 'user-1'), ('theirs', 'user-2')):
+            table.put_item(Item={
+                'endpoint_id': endpoint_id,
+                'user_id': user_id,
+                'url': 'https://old.example.com',
+                'is_active': True,
+                'check_interval': 300,
+                'measurement_mode': 'cold',
+                'created_at': '2026-01-01T00:00:00',
+                'next_check_at_us-east-1': '2026-10-18T12:00:00'
+            })
+        yield table
+
+
+def _update(endpoint_id, url='https://new.example.com'):
+    return EndPointBulkUpdate(endpoint_id=endpoint_id, url=url, check_interval=600)
+
+
+def test_bulk_update_sets_only_editable_fields(table):
+    response = asyncio.run(endpoints.bulk_update_endpoints([(0, _update('mine'))], 'user-1'))
+    assert response.succeeded == 1
+    item = table.get_item(Key={'endpoint_id': 'mine'})['Item']
+    assert item['url'] == 'https://new.example.com'
+    assert item['check_interval'] == 600
+    # The scheduler's claim written by the Lambda survives the update
+    assert item['next_check_at_us-east-1'] == '2026-10-18T12:00:00'
+
+
+def test_bulk_update_reports_each_failure(table):
+    updates = [_update('mine'), _update('theirs'), _update('missing'), _update('mine', 'https://again.example.com')]
+    response = asyncio.run(endpoints.bulk_update_endpoints(list(enumerate(updates)), 'user-1'))
+    assert [(result.index, result.status, result.detail) for result in response.results] == [
+        (0, 'updated', None),
+        (1, 'error', 'Unauthorized'),
+        (2, 'error', 'Endpoint not found'),
+        (3, 'error', 'Duplicate endpoint_id in request'),
+    ]
+    assert response.succeeded == 1 and response.failed == 3
+    assert table.get_item(Key={'endpoint_id': 'theirs'})['Item']['url'] == 'https://old.example.com'
+    assert 'missing' not in [item['endpoint_id'] for item in table.scan()['Items']]
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(endpoints_router.router)
+    app.dependency_overrides[cognito.get_current_user] = lambda: 'user-1'
+    return TestClient(app)
+
+
+def test_update_keeps_settings_the_request_leaves_out(table):
+    table.update_item(
+        Key={'endpoint_id': 'mine'},
+        UpdateExpression='set check_interval = :interval, measurement_mode = :mode',
+        ExpressionAttributeValues={':interval': 900, ':mode': 'warm'}
+    )
+
+    response = _client().put('/endpoints/mine', json={'url': 'https://new.example.com', 'is_active': False})
+
+    assert response.status_code == 200
+    assert response.json()['check_interval'] == 900
+    assert response.json()['measurement_mode'] == 'warm'
+    item = table.get_item(Key={'endpoint_id': 'mine'})['Item']
+    assert item['url'] == 'https://new.example.com'
+    assert item['is_active'] is False
+    assert item['check_interval'] == 900
+    assert item['measurement_mode'] == 'warm'
+
+
+def test_bulk_json_reports_invalid_items_by_index(table, monkeypatch):
+    monkeypatch.setattr(endpoints, 'batch_write', lambda table_name, requests: [])
+    response = _client().post('/endpoints/bulk', json=[{'url': 'https://a.example.com'}, {'url': 'ftp://b.example.com'}, {'is_active': True}])
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [(result['index'], result['status']) for result in results] == [(0, 'created'), (1, 'error'), (2, 'error')]
+    assert 'URL must start with http or https' in results[1]['detail']
+
+    response = _client().put('/endpoints/bulk', json=[{'endpoint_id': 'mine', 'check_interval': 5, 'url': 'https://a.example.com'}, {'endpoint_id': 'mine', 'url': 'https://a.example.com'}])
+    assert [(result['index'], result['status'], result['endpoint_id']) for result in response.json()['results']] == [(0, 'error', 'mine'), (1, 'updated', 'mine')]
+
+
+def test_bulk_size_is_checked_before_validating(table, monkeypatch):
+    monkeypatch.setattr(endpoints, 'BULK_MAX_ITEMS', 1)
+    def no_validation(*args):
+        raise AssertionError('oversized request validated')
+    monkeypatch.setattr(endpoints_router, 'parse_bulk_items', no_validation)
+
+    assert _client().post('/endpoints/bulk', json=[{'url': 'https://a.example.com'}] * 2).status_code == 413
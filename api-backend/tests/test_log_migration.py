@@ -0,0 +1,50 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.db import log_migration
+from app.db.logsFetch import TABLE_NAME
+
+LEGACY_TABLE = 'legacy-logs'
+
+
+@pytest.fixture
+def tables():
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        legacy = dynamodb.create_table(
+            TableName=LEGACY_TABLE,
+            KeySchema=[{'AttributeName': 'log_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'log_id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        keyed = dynamodb.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'endpoint_key', 'KeyType': 'HASH'}, {'AttributeName': 'timestamp_key', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'endpoint_key', 'AttributeType': 'S'}, {'AttributeName': 'timestamp_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield legacy, keyed
+
+
+def test_copies_legacy_logs_with_the_new_keys(tables):
+    legacy, keyed = tables
+    for index in range(60):
+        legacy.put_item(Item={
+            'log_id': f'20260901{index:06d}-endpoint-1',
+            'endpoint_id': 'endpoint-1',
+            'user_id': 'user-1',
+            'timestamp': f'2026-09-01T00:{index // 60:02d}:{index % 60:02d}',
+            'region': 'us-east-1',
+            'status_code': 200
+        })
+    legacy.put_item(Item={'log_id': 'broken', 'endpoint_id': 'endpoint-1'})
+
+    first = log_migration.copy_legacy_logs(LEGACY_TABLE, total_segments=2)
+    again = log_migration.copy_legacy_logs(LEGACY_TABLE, total_segments=2)
+
+    assert first == again == {'scanned': 61, 'copied': 60, 'skipped': 1, 'failed': 0}
+    items = keyed.scan()['Items']
+    assert len(items) == 60
+    item = keyed.get_item(Key={'endpoint_key': 'user-1#endpoint-1', 'timestamp_key': '2026-09-01T00:00:05#us-east-1'})['Item']
+    assert item['log_id'] == '20260901000005-endpoint-1'
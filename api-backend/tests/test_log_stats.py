@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.db import logsFetch, rollups
+
+START = datetime(2026, 10, 17, 10, 0)
+
+
+@pytest.fixture
+def tables():
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        rollup_table = dynamodb.create_table(
+            TableName=rollups.TABLE_NAME,
+            KeySchema=[{'AttributeName': 'rollup_key', 'KeyType': 'HASH'}, {'AttributeName': 'bucket_key', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'rollup_key', 'AttributeType': 'S'}, {'AttributeName': 'bucket_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        log_table = dynamodb.create_table(
+            TableName=logsFetch.TABLE_NAME,
+            KeySchema=[{'AttributeName': 'endpoint_key', 'KeyType': 'HASH'}, {'AttributeName': 'timestamp_key', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'endpoint_key', 'AttributeType': 'S'}, {'AttributeName': 'timestamp_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield rollup_table, log_table
+
+
+def _put_log(log_table, timestamp, response_time):
+    log_table.put_item(Item={
+        'endpoint_key': 'user-1#endpoint-1',
+        'timestamp_key': f'{timestamp.isoformat()}#us-east-1',
+        'timestamp': timestamp.isoformat(),
+        'region': 'us-east-1',
+        'is_up': True,
+        'status_code': 200,
+        'response_time': Decimal(str(response_time))
+    })
+
+
+def test_buckets_without_rollups_are_filled_from_logs(tables):
+    rollup_table, log_table = tables
+    # 10:00 has its rollup (and the log it was built from); 11:00 only has a log
+    rollup_table.put_item(Item={
+        'rollup_key': 'user-1#endpoint-1#hour',
+        'bucket_key': f"{START.strftime(rollups.BUCKET_FORMAT)}#us-east-1",
+        'region': 'us-east-1',
+        'check_count': 1,
+        'up_count': 1,
+        'status_200': 1,
+        'response_time_sum': Decimal('100'),
+        'response_time_count': 1,
+        'response_time_min': Decimal('100'),
+        'response_time_max': Decimal('100')
+    })
+    _put_log(log_table, START + timedelta(minutes=5), 100)
+    _put_log(log_table, START + timedelta(hours=1, minutes=5), 300)
+
+    stats = rollups.get_log_stats('endpoint-1', 'user-1', START, START + timedelta(hours=2))
+
+    assert stats.total_checks == 2
+    assert stats.average_response_time == 200.0
+    assert stats.max_response_time == 300.0
+    assert stats.status_code_distribution == {200: 2}
+
+
+def test_missing_bucket_runs_merge_close_gaps():
+    minute = timedelta(minutes=1)
+    present = [{'bucket_key': f"{(START + offset * minute).strftime(rollups.BUCKET_FORMAT)}#us-east-1"} for offset in (0, 5, 30)]
+
+    runs = rollups.missing_bucket_runs(present, 'minute', START, START + 40 * minute)
+
+    # Minutes 1-4, 6-29 and 31-39 are missing, each run one present bucket from the next
+    assert [(run[0], run[-1]) for run in runs] == [(START + minute, START + 39 * minute)]
+    assert START + 5 * minute not in runs[0]
+
+
+def test_hot_window_ranges_skip_the_archive_manifest(monkeypatch):
+    def no_manifest(user_id, endpoint_id):
+        raise AssertionError('manifest read for a range inside the hot window')
+    monkeypatch.setattr(logsFetch, 'archived_through', no_manifest)
+    start = datetime.utcnow() - timedelta(days=1)
+
+    assert logsFetch._split_range('endpoint-1', 'user-1', start, None) == (None, start, False)
@@ -0,0 +1,43 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import CURSOR_ENDPOINTS, CURSOR_LOGS, CURSOR_LOGS_ARCHIVE, decode_cursor, encode_cursor, query_fingerprint
+
+FINGERPRINT = query_fingerprint('user-1', 'logs', 'endpoint-1', 10)
+VALUES = (1_792_324_800_000_000, 'sa-east-1', -3)
+
+
+def _flip_byte(token, index):
+    data = bytearray(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    data[index] ^= 0x01
+    return base64.urlsafe_b64encode(bytes(data)).rstrip(b'=').decode('ascii')
+
+
+def _rejected(token, fingerprint=FINGERPRINT, kinds=(CURSOR_LOGS,)):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token, fingerprint, kinds)
+    return error.value.status_code == 400
+
+
+def test_round_trip():
+    token = encode_cursor(CURSOR_LOGS, FINGERPRINT, VALUES)
+    assert decode_cursor(token, FINGERPRINT, (CURSOR_LOGS, CURSOR_LOGS_ARCHIVE)) == (CURSOR_LOGS, VALUES)
+
+
+def test_every_tampered_byte_is_rejected():
+    token = encode_cursor(CURSOR_LOGS, FINGERPRINT, VALUES)
+    length = len(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    assert all(_rejected(_flip_byte(token, index)) for index in range(length))
+
+
+def test_cursor_for_another_query_or_kind_is_rejected():
+    token = encode_cursor(CURSOR_LOGS, FINGERPRINT, VALUES)
+    assert _rejected(token, fingerprint=query_fingerprint('user-2', 'logs', 'endpoint-1', 10))
+    assert _rejected(token, kinds=(CURSOR_ENDPOINTS,))
+
+
+@pytest.mark.parametrize('token', ['', 'not-a-cursor', 'A' * 40, encode_cursor(CURSOR_LOGS, FINGERPRINT, VALUES)[:-2]])
+def test_garbage_is_rejected(token):
+    assert _rejected(token)
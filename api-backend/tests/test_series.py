@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.db import rollups, series
+from app.utils.sketch import Sketch
+
+HOUR = timedelta(hours=1)
+
+
+@pytest.fixture
+def table(monkeypatch):
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        table = dynamodb.create_table(
+            TableName=rollups.TABLE_NAME,
+            KeySchema=[{'AttributeName': 'rollup_key', 'KeyType': 'HASH'}, {'AttributeName': 'bucket_key', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'rollup_key', 'AttributeType': 'S'}, {'AttributeName': 'bucket_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        monkeypatch.setattr(series, 'get_user_plan', lambda user_id: 'Free')
+        yield table
+
+
+def _put_hour(table, bucket, region, values):
+    sketch = Sketch()
+    for value in values:
+        sketch.add(value)
+    table.put_item(Item={
+        'rollup_key': 'user-1#endpoint-1#hour',
+        'bucket_key': f"{bucket.strftime(rollups.BUCKET_FORMAT)}#{region}",
+        'region': region,
+        'check_count': len(values),
+        'up_count': len(values),
+        'response_time_sum': Decimal(str(sum(values))),
+        'response_time_count': len(values),
+        'response_time_min': Decimal(str(min(values))),
+        'response_time_max': Decimal(str(max(values))),
+        'response_time_sketch': sketch.to_bytes()
+    })
+
+
+def _two_days():
+    now = datetime.utcnow()
+    # On a two-hour boundary, as series buckets are aligned to their width
+    end = now.replace(hour=now.hour // 2 * 2, minute=0, second=0, microsecond=0)
+    return end - timedelta(days=2), end
+
+
+def _raw_logs(monkeypatch, logs):
+    """Serve logs from iter_log_pages for the range asked for"""
+    def iter_log_pages(endpoint_id, user_id, start, end, columns=None):
+        yield [log for log in logs if start <= datetime.fromisoformat(log['timestamp']) <= end]
+    monkeypatch.setattr(series, 'iter_log_pages', iter_log_pages)
+
+
+def test_coarse_buckets_come_from_rollups(table, monkeypatch):
+    _raw_logs(monkeypatch, [])
+    start, end = _two_days()
+    # Two-hour series buckets: these three hours land in two of them
+    first = start + 10 * HOUR
+    _put_hour(table, first, 'us-east-1', [100.0, 200.0])
+    _put_hour(table, first, 'eu-west-1', [300.0])
+    _put_hour(table, first + HOUR, 'us-east-1', [400.0])
+    _put_hour(table, first + 2 * HOUR, 'us-east-1', [50.0])
+
+    response = series.get_log_series('endpoint-1', 'user-1', start, end, points=24)
+
+    assert response.bucket_seconds == 7200
+    assert response.timestamps == [first, first + 2 * HOUR]
+    assert response.counts == [4, 1]
+    stats = response.series['response_time']
+    assert stats.min == [100.0, 50.0]
+    assert stats.max == [400.0, 50.0]
+    assert stats.avg == [250.0, 50.0]
+    # The sketch's rank q * (n - 1), as for the stats percentiles
+    assert stats.p95[0] == pytest.approx(300.0, rel=0.01)
+    assert response.series['dns_latency'].avg == [None, None]
+
+    only_eu = series.get_log_series('endpoint-1', 'user-1', start, end, points=24, regions=['eu-west-1'])
+    assert only_eu.counts == [1]
+
+
+def test_buckets_without_rollups_come_from_raw_logs(table, monkeypatch):
+    start, end = _two_days()
+    rolled = start + 20 * HOUR
+    _put_hour(table, rolled, 'us-east-1', [100.0])
+    _raw_logs(monkeypatch, [
+        # History from before the rollups were written
+        {'timestamp': (start + HOUR).isoformat(), 'region': 'us-east-1', 'response_time': Decimal('10')},
+        # Already counted in the rollup
+        {'timestamp': (rolled + timedelta(minutes=30)).isoformat(), 'region': 'us-east-1', 'response_time': Decimal('999')},
+        {'timestamp': (rolled + timedelta(minutes=45)).isoformat(), 'region': 'eu-west-1', 'response_time': Decimal('40')},
+    ])
+
+    response = series.get_log_series('endpoint-1', 'user-1', start, end, points=24)
+    assert response.timestamps == [start, rolled]
+    assert response.counts == [1, 1]
+    assert response.series['response_time'].max == [10.0, 100.0]
+
+    # A region with no rollup rows falls back to its raw logs
+    only_eu = series.get_log_series('endpoint-1', 'user-1', start, end, points=24, regions=['eu-west-1'])
+    assert only_eu.timestamps == [rolled]
+    assert only_eu.series['response_time'].max == [40.0]
+
+
+def test_sub_minute_buckets_come_from_raw_logs(table, monkeypatch):
+    end = datetime(2026, 10, 18, 12, 10)
+    start = end - timedelta(minutes=10)
+    logs = [
+        {'timestamp': (start + timedelta(seconds=offset)).isoformat(), 'region': 'us-east-1', 'response_time': Decimal(str(offset))}
+        for offset in (1, 2, 65)
+    ]
+    monkeypatch.setattr(series, 'iter_log_pages', lambda *args, **kwargs: iter([logs]))
+
+    response = series.get_log_series('endpoint-1', 'user-1', start, end, points=20)
+
+    assert response.bucket_seconds == 30
+    assert response.counts == [2, 1]
+    assert response.series['response_time'].max == [2.0, 65.0]
@@ -0,0 +1,22 @@
+import random
+
+from app.utils.sketch import Sketch, RELATIVE_ACCURACY
+
+
+def test_round_trip():
+    sketch = Sketch()
+    for value in (0.0, 0.5, 12.0, 12.0, 900.0):
+        sketch.add(value)
+    assert Sketch.from_bytes(sketch.to_bytes()).to_bytes() == sketch.to_bytes()
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(5, 0.7) for _ in range(10000)]
+    sketch = Sketch()
+    for value in values:
+        sketch.add(value)
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= RELATIVE_ACCURACY * exact
@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth import cognito
+from app.routers import users
+from app.schemas import UserListResponse
+
+
+def _client(monkeypatch, current_user_id):
+    app = FastAPI()
+    app.include_router(users.router)
+    app.dependency_overrides[cognito.get_current_user] = lambda: current_user_id
+    monkeypatch.setattr(cognito, 'ADMIN_USER_IDS', frozenset({'admin-1'}))
+    monkeypatch.setattr(users, 'get_users_db', lambda limit, next_token: UserListResponse(users=[], next_token=None, has_more=False))
+    return TestClient(app)
+
+
+def test_listing_users_needs_a_token():
+    app = FastAPI()
+    app.include_router(users.router)
+    assert TestClient(app).get('/users').status_code in (401, 403)
+
+
+def test_listing_users_is_admin_only(monkeypatch):
+    assert _client(monkeypatch, 'user-1').get('/users').status_code == 403
+    response = _client(monkeypatch, 'admin-1').get('/users')
+    assert response.status_code == 200
+    assert response.json() == {'users': [], 'next_token': None, 'has_more': False}
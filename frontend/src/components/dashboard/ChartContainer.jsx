@@ -32,11 +32,12 @@ export const ChartContainer = ({
   metric = 'average_response_time',
   title = 'Response Time',
   color = 'rgb(14, 165, 233)',
+  labelFormat = 'MMM dd',
 }) => {
   const sortedData = [...data].sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime());
   
   const labels = sortedData.map(item => 
-    format(new Date(item.date), 'MMM dd')
+    format(new Date(item.date), labelFormat)
   );
   
   const values = sortedData.map(item => item[metric] || 0);
@@ -5,7 +5,7 @@ import Card from '../common/Card';
 import StatusBadge from '../common/StatusBadge';
 import Button from '../common/Button';
 
-const EndpointStatusCard = ({ endpoint }) => {
+const EndpointStatusCard = ({ endpoint, summary }) => {
   const formatUrl = (url) => {
     return url.length > 40 ? url.substring(0, 40) + '...' : url;
   };
@@ -35,6 +35,18 @@ const EndpointStatusCard = ({ endpoint }) => {
               <ExternalLink size={14} className="ml-1" />
             </a>
           </div>
+
+          {summary && summary.last_checked_at && (
+            <div className="flex flex-wrap items-center gap-4 text-sm text-gray-400">
+              <StatusBadge status={summary.is_up ? 'online' : 'offline'} text={summary.is_up ? 'Up' : 'Down'} />
+              {summary.last_response_time != null && (
+                <span>{summary.last_response_time.toFixed(0)} ms</span>
+              )}
+              {summary.uptime_24h != null && (
+                <span>{summary.uptime_24h.toFixed(2)}% uptime (24h)</span>
+              )}
+            </div>
+          )}
         </div>
         
         <div className="flex space-x-2 mt-4 sm:mt-0">
@@ -6,6 +6,8 @@ import { useForm, FormProvider } from 'react-hook-form';
 import { ArrowLeft, Save, Trash, ExternalLink } from 'lucide-react';
 import { toast } from 'sonner';
 import endpointService from '../../services/endpointService';
+import logService from '../../services/logService';
+import ChartContainer from '../../components/dashboard/ChartContainer';
 import Button from '../../components/common/Button';
 import Card from '../../components/common/Card';
 import FormInput from '../../components/common/FormInput';
@@ -23,6 +25,8 @@ const EndpointDetail = () => {
     defaultValues: {
       url: '',
       is_active: true,
+      check_interval: 300,
+      measurement_mode: 'cold',
     },
   });
   
@@ -39,11 +43,25 @@ const EndpointDetail = () => {
         methods.reset({
           url: data.url,
           is_active: data.is_active,
+          check_interval: data.check_interval,
+          measurement_mode: data.measurement_mode,
         });
       },
     }
   );
   
+  // Response times over the last day, downsampled by the API
+  const { data: series } = useQuery(
+    ['logSeries', id],
+    () => logService.getLogSeries(id, new Date(Date.now() - 24 * 60 * 60 * 1000).toISOString(), new Date().toISOString(), 96),
+    { enabled: !isNewEndpoint }
+  );
+  // Bucket starts are UTC without an offset
+  const responseTimes = (series?.timestamps || []).map((timestamp, index) => ({
+    date: `${timestamp}Z`,
+    average_response_time: series.series.response_time.avg[index],
+  }));
+  
   // Create endpoint mutation
   const createMutation = useMutation(
     (data) => endpointService.createEndpoint(data),
@@ -94,13 +112,17 @@ const EndpointDetail = () => {
     if (isNewEndpoint) {
       createMutation.mutate({
         url: data.url,
-        is_active: data.is_active
+        is_active: data.is_active,
+        check_interval: Number(data.check_interval),
+        measurement_mode: data.measurement_mode
       });
     } else {
       const updateData = {
         endpoint_id: id,
         url: data.url,
-        is_active: data.is_active
+        is_active: data.is_active,
+        check_interval: Number(data.check_interval),
+        measurement_mode: data.measurement_mode
       };
       updateMutation.mutate(updateData);
     }
@@ -181,6 +203,30 @@ const EndpointDetail = () => {
                   helperText="The URL to monitor (including http:// or https://)"
                 />
                 
+                <FormInput
+                  label="Check interval (seconds)"
+                  name="check_interval"
+                  type="number"
+                  min={60}
+                  max={86400}
+                  required
+                  helperText="How often the endpoint is checked, from 60 seconds to one day"
+                />
+                
+                <div className="mb-4">
+                  <label htmlFor="measurement_mode" className="block text-sm font-medium text-gray-300 mb-1">
+                    Measurement mode
+                  </label>
+                  <select
+                    id="measurement_mode"
+                    {...methods.register('measurement_mode')}
+                    className="w-full rounded-md bg-dark-700 border border-dark-400 px-4 py-2 text-white focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-transparent"
+                  >
+                    <option value="cold">Cold (fresh DNS, connection and handshake on every check)</option>
+                    <option value="warm">Warm (reuse cached DNS and open connections)</option>
+                  </select>
+                </div>
+                
                 <div className="flex items-center space-x-2">
                   <input
                     type="checkbox"
@@ -245,11 +291,39 @@ const EndpointDetail = () => {
                     />
                   </div>
                 </div>
+                
+                <div>
+                  <label className="block text-sm font-medium text-gray-400">Check Interval</label>
+                  <div className="mt-1 text-white">Every {endpoint?.check_interval} seconds</div>
+                </div>
+                
+                <div>
+                  <label className="block text-sm font-medium text-gray-400">Measurement Mode</label>
+                  <div className="mt-1 text-white capitalize">{endpoint?.measurement_mode}</div>
+                </div>
               </div>
             )}
           </Card>
         </form>
       </FormProvider>
+      
+      {!isNewEndpoint && (
+        <Card title="Response Time (last 24 hours)" className="bg-dark-700">
+          {responseTimes.length ? (
+            <div className="h-64">
+              <ChartContainer
+                data={responseTimes}
+                type="area"
+                metric="average_response_time"
+                title="Response Time"
+                labelFormat="HH:mm"
+              />
+            </div>
+          ) : (
+            <p className="text-sm text-gray-400">No checks in the last 24 hours.</p>
+          )}
+        </Card>
+      )}
     </div>
   );
 };
@@ -4,6 +4,7 @@ import { useQuery } from 'react-query';
 import { Link } from 'react-router-dom';
 import { Plus, Search, Filter, X } from 'lucide-react';
 import endpointService from '../../services/endpointService';
+import dashboardService from '../../services/dashboardService';
 import Button from '../../components/common/Button';
 import Card from '../../components/common/Card';
 import LoadingSpinner from '../../components/common/LoadingSpinner';
@@ -38,6 +39,20 @@ const EndpointsList = () => {
     }
   );
 
+  // One request carries the status of every card instead of a request per endpoint
+  const { data: summary } = useQuery(
+    ['dashboard-summary'],
+    () => dashboardService.getSummary(),
+    { staleTime: 60000, retry: 1 }
+  );
+  const summaryById = React.useMemo(() => {
+    const byId = {};
+    (summary?.endpoints || []).forEach((item) => {
+      byId[item.endpoint_id] = item;
+    });
+    return byId;
+  }, [summary]);
+
   const handleSearchChange = (e) => {
     setSearchQuery(e.target.value);
     setCurrentPage(1); // Reset to first page on new search
@@ -213,7 +228,7 @@ const EndpointsList = () => {
         ) : (
           <>
             {endpoints.map((endpoint) => (
-              <EndpointStatusCard key={endpoint.endpoint_id} endpoint={endpoint} />
+              <EndpointStatusCard key={endpoint.endpoint_id} endpoint={endpoint} summary={summaryById[endpoint.endpoint_id]} />
             ))}
 
             {/* Pagination */}
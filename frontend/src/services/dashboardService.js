@@ -0,0 +1,11 @@
+import api from './api.js';
+
+const dashboardService = {
+  // Latest status, 24h uptime and sparkline for every endpoint in one request
+  getSummary: async () => {
+    const response = await api.get('/dashboard/summary');
+    return response.data;
+  },
+};
+
+export default dashboardService;
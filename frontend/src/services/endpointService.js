@@ -4,17 +4,24 @@ const ENDPOINTS_BASE_URL = 'endpoints';
 
 // Endpoints service
 export const endpointService = {
-  // Get all endpoints
+  // Get all endpoints, following the API's next_token pages
   getEndpoints: async () => {
     try {
       console.log('Attempting to fetch endpoints...');
-      const response = await api.get(ENDPOINTS_BASE_URL, {
-        headers: {
-          'Accept': 'application/json',
-        }
-      });
-      console.log('Endpoints fetched successfully:', response.data);
-      return response.data;
+      const endpoints = [];
+      let nextToken = null;
+      do {
+        const response = await api.get(ENDPOINTS_BASE_URL, {
+          params: nextToken ? { next_token: nextToken } : {},
+          headers: {
+            'Accept': 'application/json',
+          }
+        });
+        endpoints.push(...response.data.endpoints);
+        nextToken = response.data.has_more ? response.data.next_token : null;
+      } while (nextToken);
+      console.log('Endpoints fetched successfully:', endpoints);
+      return endpoints;
     } catch (error) {
       console.error('Error in getEndpoints:', error);
       if (error.response) {
@@ -41,7 +48,9 @@ export const endpointService = {
     try {
       const response = await api.post(ENDPOINTS_BASE_URL, {
         url: endpointData.url,
-        is_active: endpointData.is_active
+        is_active: endpointData.is_active,
+        check_interval: endpointData.check_interval,
+        measurement_mode: endpointData.measurement_mode
       });
       return response.data;
     } catch (error) {
@@ -56,7 +65,9 @@ export const endpointService = {
       const { endpoint_id, ...data } = endpointData;
       const response = await api.put(`${ENDPOINTS_BASE_URL}/${endpoint_id}`, {
         url: data.url,
-        is_active: data.is_active
+        is_active: data.is_active,
+        check_interval: data.check_interval,
+        measurement_mode: data.measurement_mode
       });
       return response.data;
     } catch (error) {
@@ -65,6 +76,35 @@ export const endpointService = {
     }
   },
 
+  // Create many endpoints in one request; returns per-item results
+  bulkCreateEndpoints: async (endpoints) => {
+    try {
+      const response = await api.post(`${ENDPOINTS_BASE_URL}/bulk`, endpoints.map((endpoint) => ({
+        url: endpoint.url,
+        is_active: endpoint.is_active,
+        check_interval: endpoint.check_interval,
+        measurement_mode: endpoint.measurement_mode
+      })));
+      return response.data;
+    } catch (error) {
+      console.error('Error creating endpoints in bulk:', error);
+      throw error;
+    }
+  },
+
+  // Import endpoints from a CSV file with url, is_active, check_interval and measurement_mode columns
+  importEndpointsCsv: async (file) => {
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+      const response = await api.post(`${ENDPOINTS_BASE_URL}/bulk/csv`, formData);
+      return response.data;
+    } catch (error) {
+      console.error('Error importing endpoints:', error);
+      throw error;
+    }
+  },
+
   // Delete an endpoint
   deleteEndpoint: async (endpointId) => {
     try {
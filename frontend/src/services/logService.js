@@ -13,10 +13,31 @@ const logService = {
   },
 
  
+  // Downsampled min/avg/max/p95 latency series for charts
+  getLogSeries: async (endpointId, startDate, endDate, points = 200) => {
+    const params = new URLSearchParams();
+    params.append('points', points.toString());
+    if (startDate) {
+      params.append('start_date', startDate);
+    }
+    if (endDate) {
+      params.append('end_date', endDate);
+    }
+    const response = await api.get(`/logs/${endpointId}/series?${params.toString()}`);
+    return response.data;
+  },
+
   // Export logs to CSV
   exportLogs: async (endpointId, startDate, endDate) => {
+    const params = new URLSearchParams();
+    if (startDate) {
+      params.append('start_date', startDate);
+    }
+    if (endDate) {
+      params.append('end_date', endDate);
+    }
     const response = await api.get(
-      `/logs/${endpointId}/export?startDate=${startDate}&endDate=${endDate}`,
+      `/logs/${endpointId}/export?${params.toString()}`,
       { responseType: 'blob' }
     );
     return response.data;
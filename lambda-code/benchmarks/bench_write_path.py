@@ -0,0 +1,296 @@
+"""Benchmark: latency of the Lambda's log, status and rollup writes by WRITE_MODE.
+
+Runs the real BatchLogWriter, write_status and write_rollups through boto3
+against a local DynamoDB (moto server). Every DynamoDB connection goes
+through a TCP proxy that holds each chunk for half the round-trip time in
+each direction, so the latency is added at the transport layer and the
+botocore connection pool, retries, batching and thread pools behave as they
+would over a WAN. Call latencies are measured with botocore events around
+each API call, retries included.
+
+moto spends real CPU time on every call, so each mode is also run with no
+added latency and the totals are reported against that baseline as well:
+the difference is what the round trips cost.
+
+Round-trip times are measured from this host with TCP connects to the real
+regional DynamoDB endpoints, so run it from the region being evaluated (for
+example an EC2 instance in sa-east-1). Pass --central-rtt-ms/--local-rtt-ms
+to use known values instead, such as on a machine without AWS access.
+
+"central" sends log and rollup writes from --region to us-east-1. "local"
+sends them to the replica in --region. Status writes always go to us-east-1.
+
+Run from lambda-code/:  python benchmarks/bench_write_path.py --region sa-east-1
+Needs moto[server] (see requirements-dev.txt).
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'monitoring-lambda-code'))
+
+import rollups
+from dynamodb_regions import _CONFIG, CENTRAL_REGION
+from log_writer import BatchLogWriter
+from rollups import write_rollups
+from status import write_status
+
+REGIONS = ('us-east-1', 'eu-west-1', 'ap-south-1', 'ap-southeast-1', 'sa-east-1')
+RTT_SAMPLES = 10
+
+
+def measure_rtt_ms(region, samples=RTT_SAMPLES):
+    """Median TCP connect time to the region's DynamoDB endpoint"""
+    host = f'dynamodb.{region}.amazonaws.com'
+    address = socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)[0][4]
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        with socket.create_connection(address[:2], timeout=5):
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+class LatencyProxy:
+    """TCP proxy delivering every chunk half the RTT after it was received, in both directions.
+
+    It runs in its own process so its threads do not compete with the
+    code under test for the GIL.
+    """
+
+    def __init__(self, upstream_port, rtt_ms):
+        self.upstream_port = upstream_port
+        self.one_way = rtt_ms / 2000
+        self.port = _free_port()
+        self.process = multiprocessing.Process(target=self._serve, daemon=True)
+        self.process.start()
+        _wait_for_port(self.port)
+
+    def stop(self):
+        self.process.terminate()
+
+    def _serve(self):
+        self.listener = socket.create_server(('127.0.0.1', self.port))
+        while True:
+            client, _ = self.listener.accept()
+            upstream = socket.create_connection(('127.0.0.1', self.upstream_port))
+            for source, target in ((client, upstream), (upstream, client)):
+                self._pipe(source, target)
+
+    def _pipe(self, source, target):
+        queue = deque()
+        ready = threading.Condition()
+
+        def receive():
+            while True:
+                try:
+                    chunk = source.recv(65536)
+                except OSError:
+                    chunk = b''
+                with ready:
+                    queue.append((time.perf_counter() + self.one_way, chunk))
+                    ready.notify()
+                if not chunk:
+                    return
+
+        def deliver():
+            while True:
+                with ready:
+                    while not queue:
+                        ready.wait()
+                    due, chunk = queue[0]
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        ready.wait(delay)
+                        continue
+                    queue.popleft()
+                try:
+                    if not chunk:
+                        target.shutdown(socket.SHUT_WR)
+                        return
+                    target.sendall(chunk)
+                except OSError:
+                    return
+
+        threading.Thread(target=receive, daemon=True).start()
+        threading.Thread(target=deliver, daemon=True).start()
+
+
+class CallTimer:
+    """Records the wall time of every DynamoDB API call made through a resource"""
+
+    def __init__(self):
+        self.latencies = {}
+        self._lock = threading.Lock()
+
+    def attach(self, resource):
+        events = resource.meta.client.meta.events
+        events.register('before-call.dynamodb.*', self._before)
+        events.register('after-call.dynamodb.*', self._after)
+        return resource
+
+    def _before(self, context, **kwargs):
+        context['bench_started'] = time.perf_counter()
+
+    def _after(self, context, model, **kwargs):
+        elapsed = (time.perf_counter() - context['bench_started']) * 1000
+        with self._lock:
+            self.latencies.setdefault(model.name, []).append(elapsed)
+
+
+def _resource(port, timer):
+    resource = boto3.resource(
+        'dynamodb',
+        region_name=CENTRAL_REGION,
+        endpoint_url=f'http://127.0.0.1:{port}',
+        aws_access_key_id='bench',
+        aws_secret_access_key='bench',
+        config=_CONFIG
+    )
+    return timer.attach(resource)
+
+
+def create_tables(port):
+    admin = boto3.resource('dynamodb', region_name=CENTRAL_REGION, endpoint_url=f'http://127.0.0.1:{port}',
+                           aws_access_key_id='bench', aws_secret_access_key='bench')
+    for name, hash_key, range_key in (
+        ('logs', 'endpoint_key', 'timestamp_key'),
+        ('rollups', 'rollup_key', 'bucket_key'),
+        ('status', 'endpoint_id', 'region'),
+    ):
+        admin.create_table(
+            TableName=name,
+            KeySchema=[{'AttributeName': hash_key, 'KeyType': 'HASH'}, {'AttributeName': range_key, 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': hash_key, 'AttributeType': 'S'}, {'AttributeName': range_key, 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+
+def make_results(count, checked_at):
+    return [
+        (
+            {'endpoint_id': f'endpoint-{index}', 'user_id': 'user-1', 'url': f'https://example.com/{index}', 'plan': 'Free'},
+            {'checked_at': checked_at, 'is_up': True, 'status_code': 200, 'response_time': 120.5 + index % 7, 'dns_latency': 3.1,
+             'connection_latency': 20.2, 'tls_handshake_latency': 25.0, 'ttfb': 80.0, 'total_latency': 130.4}
+        )
+        for index in range(count)
+    ]
+
+
+def run(mode, region, endpoints, central_proxy, local_proxy, checked_at):
+    write_proxy = central_proxy if mode == 'central' or region == CENTRAL_REGION else local_proxy
+    central_timer, write_timer = CallTimer(), CallTimer()
+    central = _resource(central_proxy.port, central_timer)
+    write = _resource(write_proxy.port, write_timer)
+    results = make_results(endpoints, checked_at)
+    # Each mode starts with a cold container
+    rollups._buckets.clear()
+
+    phases = {}
+    start = time.perf_counter()
+    with BatchLogWriter(write, 'logs', key_attributes=('endpoint_key', 'timestamp_key')) as writer:
+        for endpoint, result in results:
+            writer.add({
+                'endpoint_key': f"{endpoint['user_id']}#{endpoint['endpoint_id']}",
+                'timestamp_key': f"{checked_at.isoformat()}#{region}",
+                'region': region
+            })
+    phases['log writes'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_status(central, 'status', results, region)
+    phases['status'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    failed = write_rollups(write.Table('rollups'), results, region)
+    phases['rollups'] = time.perf_counter() - start
+    return phases, central_timer, write_timer, writer, failed
+
+
+def _summary(values):
+    ordered = sorted(values)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return f'p50 {statistics.median(ordered):7.1f} ms  p95 {p95:7.1f} ms  n={len(ordered)}'
+
+
+def _phase(phases, baseline, name):
+    total, local = phases[name] * 1000, baseline[name] * 1000
+    return f'{total:8.1f} ms total, {total - local:8.1f} ms over the 0 ms RTT baseline'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--region', default='sa-east-1', choices=REGIONS)
+    parser.add_argument('--endpoints', type=int, default=100)
+    parser.add_argument('--central-rtt-ms', type=float, help='RTT to us-east-1 DynamoDB; measured when omitted')
+    parser.add_argument('--local-rtt-ms', type=float, help="RTT to the region's own DynamoDB; measured when omitted")
+    args = parser.parse_args()
+
+    central_rtt = args.central_rtt_ms if args.central_rtt_ms is not None else measure_rtt_ms(CENTRAL_REGION)
+    local_rtt = args.local_rtt_ms if args.local_rtt_ms is not None else measure_rtt_ms(args.region)
+    print(f'{args.endpoints} endpoints checked from {args.region}; RTT to {CENTRAL_REGION} {central_rtt:.1f} ms, '
+          f'to {args.region} {local_rtt:.1f} ms ({"given" if args.central_rtt_ms is not None else "measured"})')
+
+    port = _free_port()
+    # The server runs in its own process, like a real DynamoDB would
+    server = subprocess.Popen([sys.executable, '-m', 'moto.server', '-H', '127.0.0.1', '-p', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    proxies = []
+    try:
+        _wait_for_port(port)
+        create_tables(port)
+        baseline_proxy = LatencyProxy(port, 0)
+        central_proxy, local_proxy = LatencyProxy(port, central_rtt), LatencyProxy(port, local_rtt)
+        proxies = [baseline_proxy, central_proxy, local_proxy]
+        day = 0
+        for mode in ('central', 'local'):
+            measured = {}
+            for label, proxy_pair in (('baseline', (baseline_proxy, baseline_proxy)), ('measured', (central_proxy, local_proxy))):
+                # A separate day per run so none writes into another's buckets
+                day += 1
+                measured[label] = run(mode, args.region, args.endpoints, *proxy_pair, datetime(2026, 1, day, 12, 0, 0))
+            phases, central_timer, write_timer, writer, failed = measured['measured']
+            baseline = measured['baseline'][0]
+            print(f'\n{mode}:')
+            for timer_name, timer in (('write region', write_timer), ('central', central_timer)):
+                for operation, latencies in sorted(timer.latencies.items()):
+                    print(f'  {timer_name:12} {operation:16} {_summary(latencies)}')
+            print(f'  log writes   {_phase(phases, baseline, "log writes")}, {writer.written} written, {writer.failed} failed')
+            print(f'  status       {_phase(phases, baseline, "status")}')
+            print(f'  rollups      {_phase(phases, baseline, "rollups")}, {failed} failed')
+    finally:
+        for proxy in proxies:
+            proxy.stop()
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import os
+from datetime import datetime, timedelta
+from botocore.exceptions import ClientError
+from status import load_status_records
+
+# A region counts an endpoint as down after this many consecutive failed checks
+ALERT_FAILURE_THRESHOLD = int(os.environ.get('ALERT_FAILURE_THRESHOLD', '3'))
+# Number of regions that must see the endpoint down before it is reported down;
+# capped at the number of regions with a recent status record
+ALERT_REGION_QUORUM = int(os.environ.get('ALERT_REGION_QUORUM', '2'))
+# Other regions' records older than this are left out of the quorum
+ALERT_STALE_SECONDS = int(os.environ.get('ALERT_STALE_SECONDS', '900'))
+# Response time in milliseconds above which a latency breach is reported; 0 disables
+ALERT_LATENCY_THRESHOLD_MS = float(os.environ.get('ALERT_LATENCY_THRESHOLD_MS', '0'))
+CERT_EXPIRY_WARNING_DAYS = int(os.environ.get('CERT_EXPIRY_WARNING_DAYS', '14'))
+MONITORING_REGIONS = [
+    region.strip()
+    for region in os.environ.get('MONITORING_REGIONS', 'us-east-1,eu-west-1,ap-south-1,ap-southeast-1,sa-east-1').split(',')
+    if region.strip()
+]
+# Row of the status table holding the alert state every region agrees on
+ALERT_STATE_REGION = 'alert'
+
+
+def _is_down(record):
+    return record is not None and int(record.get('consecutive_failures', 0)) >= ALERT_FAILURE_THRESHOLD
+
+
+def _cert_expiring(record, now):
+    expiry = (record or {}).get('certificate_expiry_date')
+    return bool(expiry) and datetime.fromisoformat(expiry) - now <= timedelta(days=CERT_EXPIRY_WARNING_DAYS)
+
+
+def _slow(record):
+    response_time = (record or {}).get('response_time')
+    return ALERT_LATENCY_THRESHOLD_MS > 0 and response_time is not None and float(response_time) > ALERT_LATENCY_THRESHOLD_MS
+
+
+def _event(kind, endpoint, record, **details):
+    return {
+        'type': kind,
+        'endpoint_id': endpoint['endpoint_id'],
+        'user_id': endpoint['user_id'],
+        'url': endpoint['url'],
+        'region': record['region'],
+        'occurred_at': record['checked_at'],
+        **details
+    }
+
+
+def _claim_alert(table, endpoint_id, attribute, value, expected=None):
+    """Record an alert state change once across all regions.
+
+    The write only succeeds if the stored value differs (and equals expected
+    when given), so when several regions see the same change only one of them
+    emits the event.
+    """
+    update_kwargs = {
+        'Key': {'endpoint_id': endpoint_id, 'region': ALERT_STATE_REGION},
+        'UpdateExpression': 'SET #attr = :value',
+        'ExpressionAttributeNames': {'#attr': attribute},
+        'ExpressionAttributeValues': {':value': value}
+    }
+    if expected is None:
+        update_kwargs['ConditionExpression'] = 'attribute_not_exists(#attr) OR #attr <> :value'
+    else:
+        update_kwargs['ConditionExpression'] = '#attr = :expected'
+        update_kwargs['ExpressionAttributeValues'][':expected'] = expected
+    try:
+        table.update_item(**update_kwargs)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def _down_regions(record, peers):
+    """(regions currently down, effective quorum) counting this region and fresh peers"""
+    checked_at = datetime.fromisoformat(record['checked_at'])
+    fresh = [
+        peer for peer in peers
+        if peer is not None and abs((checked_at - datetime.fromisoformat(peer['checked_at'])).total_seconds()) <= ALERT_STALE_SECONDS
+    ]
+    down = sum(1 for candidate in [record, *fresh] if _is_down(candidate))
+    return down, max(1, min(ALERT_REGION_QUORUM, 1 + len(fresh)))
+
+
+def detect_transitions(dynamodb, table_name, records, region, now=None):
+    """Turn (endpoint, previous, record) status updates into alert events.
+
+    down/up: an endpoint is down once ALERT_REGION_QUORUM regions have each
+    seen ALERT_FAILURE_THRESHOLD consecutive failures, and up again once
+    fewer do. Only endpoints down or recovering in this region are checked
+    against the other regions' records.
+    cert_expiring: the certificate is within CERT_EXPIRY_WARNING_DAYS of
+    expiry, reported once per certificate.
+    latency_breach: this region's response time rose above
+    ALERT_LATENCY_THRESHOLD_MS.
+    """
+    now = now or datetime.now()
+    table = dynamodb.Table(table_name)
+    events = []
+    quorum_candidates = []
+    cert_candidates = []
+    for endpoint, previous, record in records:
+        if _is_down(record) or _is_down(previous):
+            quorum_candidates.append((endpoint, record))
+        if _cert_expiring(record, now) and not _cert_expiring(previous, now):
+            cert_candidates.append((endpoint, record))
+        if _slow(record) and not _slow(previous):
+            events.append(_event('latency_breach', endpoint, record,
+                                 response_time=float(record['response_time']),
+                                 threshold_ms=ALERT_LATENCY_THRESHOLD_MS))
+
+    peer_regions = [other for other in MONITORING_REGIONS if other != region]
+    peers = load_status_records(
+        dynamodb,
+        table_name,
+        [(endpoint['endpoint_id'], other) for endpoint, _ in quorum_candidates for other in peer_regions]
+    ) if quorum_candidates and peer_regions else {}
+
+    for endpoint, record in quorum_candidates:
+        endpoint_id = endpoint['endpoint_id']
+        down, quorum = _down_regions(record, [peers.get((endpoint_id, other)) for other in peer_regions])
+        if down >= quorum:
+            if _claim_alert(table, endpoint_id, 'alert_state', 'down'):
+                events.append(_event('down', endpoint, record, regions_down=down,
+                                     consecutive_failures=int(record['consecutive_failures'])))
+        elif not _is_down(record):
+            if _claim_alert(table, endpoint_id, 'alert_state', 'up', expected='down'):
+                events.append(_event('up', endpoint, record, regions_down=down))
+
+    for endpoint, record in cert_candidates:
+        expiry = record['certificate_expiry_date']
+        if _claim_alert(table, endpoint['endpoint_id'], 'cert_alert_expiry', expiry):
+            days_left = (datetime.fromisoformat(expiry) - now).days
+            events.append(_event('cert_expiring', endpoint, record, certificate_expiry_date=expiry, days_left=days_left))
+    return events
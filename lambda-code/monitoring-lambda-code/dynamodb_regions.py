@@ -0,0 +1,37 @@
+import os
+import boto3
+from botocore.config import Config
+
+# Region holding the tables every region shares: endpoints (the schedule claims)
+# and status (the cross-region alert state). These always go to the central region.
+CENTRAL_REGION = os.environ.get('CENTRAL_REGION', 'us-east-1')
+# 'central' writes logs and rollups to CENTRAL_REGION; 'local' writes them to the
+# Global Table replica in this function's own region (AWS_REGION), which
+# replicates them to the central region asynchronously
+WRITE_MODE = os.environ.get('WRITE_MODE', 'central')
+# Enough connections for the rollup and schedule thread pools to run without waiting
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.environ.get('DYNAMODB_MAX_POOL_CONNECTIONS', '50'))
+
+_CONFIG = Config(
+    max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS,
+    connect_timeout=3,
+    read_timeout=10,
+    retries={'mode': 'standard', 'max_attempts': 5}
+)
+_resources = {}
+
+
+def resource_for(region):
+    """DynamoDB resource for a region, created once per container"""
+    if region not in _resources:
+        _resources[region] = boto3.resource('dynamodb', region_name=region, config=_CONFIG)
+    return _resources[region]
+
+
+def write_region():
+    """Region that receives log and rollup writes under WRITE_MODE"""
+    if WRITE_MODE == 'local':
+        return os.environ.get('AWS_REGION') or CENTRAL_REGION
+    if WRITE_MODE == 'central':
+        return CENTRAL_REGION
+    raise ValueError(f"Unknown WRITE_MODE: {WRITE_MODE}")
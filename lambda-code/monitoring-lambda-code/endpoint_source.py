@@ -0,0 +1,120 @@
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from boto3.dynamodb.conditions import Attr
+
+# Number of parallel scan segments used to read the endpoints table
+SCAN_SEGMENTS = int(os.environ.get('ENDPOINT_SCAN_SEGMENTS', '4'))
+# Target number of endpoints handled by one worker invocation
+ENDPOINTS_PER_WORKER = int(os.environ.get('ENDPOINTS_PER_WORKER', '500'))
+MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '50'))
+ENDPOINT_ATTRIBUTES = ('endpoint_id', 'user_id', 'url', 'check_interval', 'measurement_mode')
+# Asynchronous invocations reject payloads over 256 KB; shards are split to
+# stay below this
+MAX_INVOKE_PAYLOAD_BYTES = int(os.environ.get('MAX_INVOKE_PAYLOAD_BYTES', str(250 * 1024)))
+
+
+def _scan_segment(table, segment, total_segments, attributes):
+    """Read every active endpoint in one scan segment, following pagination"""
+    names = {f'#a{i}': name for i, name in enumerate(attributes)}
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'FilterExpression': Attr('is_active').eq(True),
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+    items = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def load_active_endpoints(table, extra_attributes=(), total_segments=SCAN_SEGMENTS):
+    """Load all active endpoints with a parallel scan of total_segments segments"""
+    attributes = ENDPOINT_ATTRIBUTES + tuple(extra_attributes)
+    total_segments = max(1, total_segments)
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        segments = executor.map(
+            lambda segment: _scan_segment(table, segment, total_segments, attributes),
+            range(total_segments)
+        )
+        return [item for items in segments for item in items]
+
+
+def shard_of(endpoint_id, total_shards):
+    """Stable shard index for an endpoint, independent of process hash seeds"""
+    digest = hashlib.md5(endpoint_id.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % total_shards
+
+
+def shard_count(endpoint_count):
+    """Number of workers needed for endpoint_count endpoints"""
+    return min(MAX_WORKERS, max(1, math.ceil(endpoint_count / ENDPOINTS_PER_WORKER)))
+
+
+def split_into_shards(endpoints, total_shards):
+    shards = [[] for _ in range(total_shards)]
+    for endpoint in endpoints:
+        shards[shard_of(endpoint['endpoint_id'], total_shards)].append(endpoint)
+    return shards
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode(payload):
+    return json.dumps(payload, default=_json_default).encode('utf-8')
+
+
+def _split_payloads(shard, index, total_shards):
+    """Worker payloads for one shard, as many as it takes to keep each under MAX_INVOKE_PAYLOAD_BYTES"""
+    header = {'mode': 'worker', 'shard': index, 'total_shards': total_shards}
+    base_size = len(_encode({**header, 'part': 0, 'endpoints': []}))
+    parts, current, size = [], [], base_size
+    for endpoint in shard:
+        # Each endpoint adds its JSON and a separating comma
+        endpoint_size = len(_encode(endpoint)) + 1
+        if current and size + endpoint_size > MAX_INVOKE_PAYLOAD_BYTES:
+            parts.append(current)
+            current, size = [], base_size
+        current.append(endpoint)
+        size += endpoint_size
+    if current:
+        parts.append(current)
+    return [({**header, 'part': part, 'endpoints': endpoints}) for part, endpoints in enumerate(parts)]
+
+
+def dispatch_shards(lambda_client, function_name, shards):
+    """Invoke asynchronous workers for the non-empty shards.
+
+    A shard too large for one invocation payload goes to several workers.
+    Returns the number of workers invoked and the endpoints whose invocation
+    failed after botocore's retries, for the caller to check itself.
+    """
+    dispatched = 0
+    undelivered = []
+    for index, shard in enumerate(shards):
+        if not shard:
+            continue
+        for payload in _split_payloads(shard, index, len(shards)):
+            try:
+                lambda_client.invoke(
+                    FunctionName=function_name,
+                    InvocationType='Event',
+                    Payload=_encode(payload)
+                )
+                dispatched += 1
+            except Exception as e:
+                print(f"Error invoking worker for shard {index} part {payload['part']}: {str(e)}")
+                undelivered.extend(payload['endpoints'])
+    return dispatched, undelivered
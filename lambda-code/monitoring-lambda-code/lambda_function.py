@@ -1,180 +1,77 @@
 import boto3
-import requests
 import os
 from datetime import datetime
-import socket
-import ssl
-from urllib.parse import urlparse
-import time
 from decimal import Decimal
+from probe import probe_endpoint, DEFAULT_MEASUREMENT_MODE
+from probe_engine import run_checks, deadline_from_context, PROBE_CONCURRENCY
+from log_writer import BatchLogWriter
+from endpoint_source import load_active_endpoints, shard_count, split_into_shards, dispatch_shards
+from scheduler import select_due_endpoints, complete_checks, next_due_attribute
+from rollups import write_rollups
+from status import write_status
+from alerts import detect_transitions
+from notifiers import get_notifier
+from dynamodb_regions import resource_for, write_region, CENTRAL_REGION
+from retention import load_plans, expires_at, DEFAULT_PLAN
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb',region_name='us-east-1')
-# endpoints_table = dynamodb.Table(os.environ['ENDPOINTS_TABLE_NAME'])  # Commented out for testing
+# Endpoints and status live in the central region; logs and rollups go to the
+# region selected by WRITE_MODE
+dynamodb = resource_for(CENTRAL_REGION)
+write_dynamodb = resource_for(write_region())
+lambda_client = boto3.client('lambda')
+endpoints_table_name = os.environ.get('ENDPOINTS_TABLE_NAME')
 logs_table_name = os.environ.get('LOGS_TABLE_NAME')
+# Rollups are skipped when no rollups table is configured
+rollups_table_name = os.environ.get('ROLLUPS_TABLE_NAME')
+# Latest-status records are skipped when no status table is configured
+status_table_name = os.environ.get('STATUS_TABLE_NAME')
+# Plans set retention; every endpoint gets the default plan's when no users table is configured
+users_table_name = os.environ.get('USERS_TABLE_NAME')
 print(logs_table_name)
 
 if not logs_table_name:
     raise ValueError("LOGS_TABLE_NAME environment variable is not set")
+if not endpoints_table_name:
+    raise ValueError("ENDPOINTS_TABLE_NAME environment variable is not set")
 try:
-    logs_table = dynamodb.Table(logs_table_name)
+    endpoints_table = dynamodb.Table(endpoints_table_name)
+    logs_table = write_dynamodb.Table(logs_table_name)
+    rollups_table = write_dynamodb.Table(rollups_table_name) if rollups_table_name else None
 except Exception as e:
     print(f"Error initializing DynamoDB table: {str(e)}")
     raise
+# Alert events are derived from status transitions, so they need the status table
+notifier = get_notifier()
 
-# Hardcoded test endpoints
-TEST_ENDPOINTS = [
-    {
-        'endpoint_id': '7c6005ce-268c-4ae2-9744-ed77af1e9bd5',
-        'user_id': 'c4184438-e021-703a-97e9-b9eff58cdff8',
-        'url': 'https://www.google.com'
-    },
-    {
-        'endpoint_id': '43afccc4-1eba-42b8-98e8-a8e113cbc0a5',
-        'user_id': 'c4184438-e021-703a-97e9-b9eff58cdff8',
-        'url': 'https://www.github.com'
-    },
-    {
-        'endpoint_id': 'a9d69e39-611d-4cd6-b574-7163c6a62d00',
-        'user_id': 'c4184438-e021-703a-97e9-b9eff58cdff8',
-        'url': 'https://www.amazon.com'
-    }
-]
+async def check_endpoint(endpoint):
+    """Check if an endpoint is responding and get all metrics from a single connection"""
+    checked_at = datetime.now()
+    result = await probe_endpoint(endpoint['url'], mode=endpoint.get('measurement_mode') or DEFAULT_MEASUREMENT_MODE)
+    result['checked_at'] = checked_at
+    return result
 
-def measure_latency(url):
-    """Measure DNS resolution, connection, and total latency"""
+def log_monitoring_result(writer, endpoint, check_result):
+    """Queue the monitoring result for a batched write to DynamoDB; False if it could not be queued"""
     try:
-        parsed_url = urlparse(url)
-        hostname = parsed_url.netloc
-        
-        # DNS Resolution time
-        dns_start = time.time()
-        socket.gethostbyname(hostname)
-        dns_time = (time.time() - dns_start) * 1000  # Convert to milliseconds
-        
-        # Connection time
-        conn_start = time.time()
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        sock.connect((hostname, 443 if url.startswith('https://') else 80))
-        conn_time = (time.time() - conn_start) * 1000  # Convert to milliseconds
-        sock.close()
-        
-        return {
-            'dns_latency': round(dns_time, 2),
-            'connection_latency': round(conn_time, 2),
-            'total_latency': round(dns_time + conn_time, 2)
-        }
-    except Exception as e:
-        print(f"Latency measurement error: {str(e)}")
-        return {
-            'dns_latency': None,
-            'connection_latency': None,
-            'total_latency': None
-        }
-
-def check_ssl_certificate(url):
-    """Check SSL certificate validity and details using built-in ssl module"""
-    try:
-        parsed_url = urlparse(url)
-        hostname = parsed_url.netloc
-        port = 443
-        
-        # Create SSL context with default settings
-        context = ssl.create_default_context()
-        
-        # Create connection and wrap with SSL
-        with socket.create_connection((hostname, port), timeout=5) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
-                
-                # Convert certificate dates to datetime
-                not_before = datetime.strptime(cert['notBefore'], '%b %d %H:%M:%S %Y %Z')
-                not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                
-                return {
-                    'certificate_valid': True,
-                    'certificate_expiry_date': not_after.isoformat(),
-                    'certificate_issuer': dict(x[0] for x in cert['issuer']).get('CN', ''),
-                    'tls_version': ssock.version(),
-                    'secure_protocol': True,
-                    'cipher': ssock.cipher()[0]  # Get cipher name
-                }
-    except Exception as e:
-        return {
-            'certificate_valid': False,
-            'certificate_expiry_date': None,
-            'certificate_issuer': None,
-            'tls_version': None,
-            'secure_protocol': False,
-            'error': str(e)
-        }
-
-def check_endpoint(endpoint):
-    """Check if an endpoint is responding and get all metrics"""
-    try:
-        # Measure latency first
-        latency_metrics = measure_latency(endpoint['url'])
-        
-        # Check HTTP response
-        start_time = time.time()
-        response = requests.get(endpoint['url'], timeout=5)
-        response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-        
-        http_result = {
-            'status_code': response.status_code,
-            'response_time': round(response_time, 2),
-            'is_up': 200 <= response.status_code < 300,
-            'dns_latency': latency_metrics['dns_latency'],
-            'connection_latency': latency_metrics['connection_latency'],
-            'total_latency': latency_metrics['total_latency']
-        }
-        
-        # Check SSL if URL is HTTPS
-        if endpoint['url'].startswith('https://'):
-            ssl_result = check_ssl_certificate(endpoint['url'])
-            return {**http_result, **ssl_result}
-        
-        return {
-            **http_result,
-            'certificate_valid': None,
-            'certificate_expiry_date': None,
-            'certificate_issuer': None,
-            'tls_version': None,
-            'secure_protocol': False
-        }
-        
-    except Exception as e:
-        return {
-            'status_code': None,
-            'response_time': None,
-            'is_up': False,
-            'dns_latency': None,
-            'connection_latency': None,
-            'total_latency': None,
-            'certificate_valid': None,
-            'certificate_expiry_date': None,
-            'certificate_issuer': None,
-            'tls_version': None,
-            'secure_protocol': False,
-            'error': str(e)
-        }
-
-def log_monitoring_result(endpoint, check_result):
-    """Log the monitoring result to DynamoDB"""
-    try:
-        log_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{endpoint['endpoint_id']}"
+        checked_at = check_result.get('checked_at') or datetime.now()
+        log_id = f"{checked_at.strftime('%Y%m%d%H%M%S')}-{endpoint['endpoint_id']}"
         current_region = os.environ.get('AWS_REGION')
+        timestamp = checked_at.isoformat()
         # Convert float values to Decimal
         log_item = {
+            # Key: owner and endpoint, sorted by time; the region keeps regional checks apart
+            'endpoint_key': f"{endpoint['user_id']}#{endpoint['endpoint_id']}",
+            'timestamp_key': f"{timestamp}#{current_region}",
             'log_id': log_id,
             'endpoint_id': endpoint['endpoint_id'],
             'user_id': endpoint['user_id'],
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'status_code': check_result.get('status_code'),
             'response_time': Decimal(str(check_result.get('response_time'))) if check_result.get('response_time') is not None else None,
             'dns_latency': Decimal(str(check_result.get('dns_latency'))) if check_result.get('dns_latency') is not None else None,
             'connection_latency': Decimal(str(check_result.get('connection_latency'))) if check_result.get('connection_latency') is not None else None,
+            'tls_handshake_latency': Decimal(str(check_result.get('tls_handshake_latency'))) if check_result.get('tls_handshake_latency') is not None else None,
+            'ttfb': Decimal(str(check_result.get('ttfb'))) if check_result.get('ttfb') is not None else None,
             'total_latency': Decimal(str(check_result.get('total_latency'))) if check_result.get('total_latency') is not None else None,
             'is_up': check_result.get('is_up'),
             'certificate_valid': check_result.get('certificate_valid',False),
@@ -184,33 +81,98 @@ def log_monitoring_result(endpoint, check_result):
             'secure_protocol': check_result.get('secure_protocol',False),
             'error_message': check_result.get('error',''),
             'is_secure': check_result.get('secure_protocol',False),
-            'region': current_region
+            'measurement_mode': check_result.get('measurement_mode'),
+            'connection_reused': check_result.get('connection_reused'),
+            'region': current_region,
+            # DynamoDB TTL: the item is removed once the owner's plan stops retaining it
+            'expires_at': expires_at(checked_at, endpoint.get('plan', DEFAULT_PLAN), 'logs')
         }
         
         # Remove None values to avoid DynamoDB errors
         log_item = {k: v for k, v in log_item.items() if v is not None}
-        print(f"Attempting to write logs to {logs_table_name}")
-        print(log_item)
-        logs_table.put_item(Item=log_item)
-        print(f"Successfully logged result for {endpoint['url']}")
+        writer.add(log_item)
+        return True
     except Exception as e:
         print(f"Error logging result: {str(e)}")
+        return False
 
 def get_endpoints():
-    """Return hardcoded test endpoints instead of fetching from DynamoDB"""
-    return TEST_ENDPOINTS
+    """Load the active endpoints that are due for a check in this region"""
+    region = os.environ.get('AWS_REGION')
+    endpoints = load_active_endpoints(endpoints_table, extra_attributes=(next_due_attribute(region),))
+    due = select_due_endpoints(endpoints_table, endpoints, region)
+    print(f"{len(due)} of {len(endpoints)} active endpoints are due")
+    return due
 
 def lambda_handler(event, context):
-    """Main Lambda handler function"""
+    """Main Lambda handler function.
+
+    Scheduled invocations act as the coordinator: they load the active
+    endpoints that are due and, when there are more than one worker can handle, fan them
+    out by a stable hash of endpoint_id to asynchronous worker invocations of
+    this same function. Worker invocations check the endpoints in their event.
+    The coordinator checks any endpoints it failed to hand to a worker.
+    """
     try:
-        endpoints = get_endpoints()
-        for endpoint in endpoints:
-            print(f"Checking endpoint: {endpoint['url']}")  # Added logging
-            result = check_endpoint(endpoint)
-            log_monitoring_result(endpoint, result)
+        event = event or {}
+        if event.get('mode') == 'worker':
+            endpoints = event['endpoints']
+            print(f"Worker for shard {event.get('shard')}/{event.get('total_shards')} part {event.get('part', 0)}")
+        else:
+            endpoints = get_endpoints()
+            total_shards = shard_count(len(endpoints))
+            if total_shards > 1:
+                shards = split_into_shards(endpoints, total_shards)
+                dispatched, undelivered = dispatch_shards(lambda_client, context.function_name, shards)
+                if not undelivered:
+                    return {
+                        'statusCode': 200,
+                        'body': f'Dispatched {len(endpoints)} endpoints to {dispatched} workers'
+                    }
+                # Endpoints are already claimed for this tick, so check what no worker took here
+                print(f"Dispatched to {dispatched} workers, checking {len(undelivered)} undelivered endpoints here")
+                endpoints = undelivered
+
+        deadline = deadline_from_context(context)
+        print(f"Checking {len(endpoints)} endpoints with concurrency {PROBE_CONCURRENCY}")
+        results, skipped = run_checks(endpoints, check_endpoint, PROBE_CONCURRENCY, deadline)
+        if users_table_name:
+            try:
+                plans = load_plans(dynamodb, users_table_name, [endpoint['user_id'] for endpoint, _ in results])
+                for endpoint, _ in results:
+                    endpoint['plan'] = plans[endpoint['user_id']]
+            except Exception as e:
+                print(f"Error loading user plans, using the {DEFAULT_PLAN} retention: {str(e)}")
+        logged = []
+        with BatchLogWriter(write_dynamodb, logs_table_name, key_attributes=('endpoint_key', 'timestamp_key')) as writer:
+            for endpoint, result in results:
+                if log_monitoring_result(writer, endpoint, result):
+                    logged.append(endpoint)
+        print(f"Wrote {writer.written} log items to {logs_table_name}, {writer.failed} failed")
+        # Only endpoints whose results landed move on; the rest keep their lease and are retried once it runs out
+        failed_ids = {item['endpoint_id'] for item in writer.failed_items}
+        try:
+            completed = complete_checks(endpoints_table, [endpoint for endpoint in logged if endpoint['endpoint_id'] not in failed_ids], os.environ.get('AWS_REGION'))
+            print(f"Scheduled the next check of {completed} endpoints")
+        except Exception as e:
+            print(f"Error scheduling next checks: {str(e)}")
+        if status_table_name:
+            try:
+                records = write_status(dynamodb, status_table_name, results, os.environ.get('AWS_REGION'))
+                events = detect_transitions(dynamodb, status_table_name, records, os.environ.get('AWS_REGION'))
+                if events:
+                    notifier.notify(events)
+                print(f"Emitted {len(events)} alert events")
+            except Exception as e:
+                print(f"Error updating status and alerts: {str(e)}")
+        if rollups_table is not None:
+            failed = write_rollups(rollups_table, results, os.environ.get('AWS_REGION'))
+            print(f"Updated rollups for {len(results) - failed} endpoints, {failed} failed")
+        if skipped:
+            print(f"Deadline reached, skipped {len(skipped)} endpoints")
         return {
             'statusCode': 200,
-            'body': f'Successfully monitored {len(endpoints)} endpoints'
+            'body': f'Successfully monitored {len(results)} endpoints, skipped {len(skipped)}'
         }
     except Exception as e:
         print(f"Error in lambda_handler: {str(e)}")
@@ -0,0 +1,88 @@
+import os
+import random
+import time
+from botocore.exceptions import ClientError
+
+# BatchWriteItem accepts at most 25 put/delete requests per call
+BATCH_SIZE = 25
+MAX_RETRIES = int(os.environ.get('LOG_WRITE_MAX_RETRIES', '8'))
+BASE_BACKOFF_SECONDS = 0.05
+MAX_BACKOFF_SECONDS = 2.0
+RETRYABLE_ERRORS = (
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError'
+)
+
+
+def _backoff(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt)))
+
+
+class BatchLogWriter:
+    """Buffer DynamoDB items and write them with BatchWriteItem.
+
+    Items are flushed every BATCH_SIZE adds and on flush()/exit. Unprocessed
+    items returned by DynamoDB are retried with exponential backoff; the ones
+    that still fail are kept in failed_items.
+    """
+
+    def __init__(self, dynamodb, table_name, key_attributes=('log_id',)):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.key_attributes = key_attributes
+        self.written = 0
+        self.failed = 0
+        self.failed_items = []
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def add(self, item):
+        self._buffer.append(item)
+        if len(self._buffer) >= BATCH_SIZE:
+            self._write_batch(self._buffer[:BATCH_SIZE])
+            self._buffer = self._buffer[BATCH_SIZE:]
+
+    def flush(self):
+        while self._buffer:
+            self._write_batch(self._buffer[:BATCH_SIZE])
+            self._buffer = self._buffer[BATCH_SIZE:]
+
+    def _write_batch(self, items):
+        # A batch may not contain the same key twice; the latest item wins
+        unique = {tuple(item.get(k) for k in self.key_attributes): item for item in items}
+        request_items = {self.table_name: [{'PutRequest': {'Item': item}} for item in unique.values()]}
+        pending = len(unique)
+        attempt = 0
+        while True:
+            try:
+                response = self.dynamodb.batch_write_item(RequestItems=request_items)
+                unprocessed = response.get('UnprocessedItems') or {}
+            except ClientError as e:
+                if e.response['Error']['Code'] not in RETRYABLE_ERRORS:
+                    print(f"Error writing batch to {self.table_name}: {str(e)}")
+                    self.failed += pending
+                    self.failed_items.extend(request['PutRequest']['Item'] for request in request_items[self.table_name])
+                    return
+                unprocessed = request_items
+
+            remaining = len(unprocessed.get(self.table_name, []))
+            self.written += pending - remaining
+            if not remaining:
+                return
+            if attempt >= MAX_RETRIES:
+                print(f"Giving up on {remaining} unprocessed items for {self.table_name}")
+                self.failed += remaining
+                self.failed_items.extend(request['PutRequest']['Item'] for request in unprocessed[self.table_name])
+                return
+            time.sleep(_backoff(attempt))
+            attempt += 1
+            request_items = unprocessed
+            pending = remaining
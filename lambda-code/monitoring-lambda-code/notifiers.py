@@ -0,0 +1,68 @@
+import json
+import os
+import boto3
+
+# SNS PublishBatch accepts at most 10 messages per call
+SNS_BATCH_SIZE = 10
+
+
+class LogNotifier:
+    """Print events to the function's log; the default when no sink is configured"""
+
+    def notify(self, events):
+        for event in events:
+            print(f"ALERT {json.dumps(event, default=str)}")
+
+
+class InMemoryNotifier:
+    """Keep events in a list, for local runs and for inspecting what would be sent"""
+
+    def __init__(self):
+        self.events = []
+
+    def notify(self, events):
+        self.events.extend(events)
+
+
+class SnsNotifier:
+    """Publish each event as a JSON message to an SNS topic"""
+
+    def __init__(self, topic_arn, sns_client=None):
+        self.topic_arn = topic_arn
+        self.sns = sns_client or boto3.client('sns')
+
+    def notify(self, events):
+        for start in range(0, len(events), SNS_BATCH_SIZE):
+            batch = events[start:start + SNS_BATCH_SIZE]
+            response = self.sns.publish_batch(
+                TopicArn=self.topic_arn,
+                PublishBatchRequestEntries=[
+                    {
+                        'Id': str(index),
+                        'Message': json.dumps(event, default=str),
+                        'Subject': f"{event['type']}: {event['url']}"[:100],
+                        'MessageAttributes': {
+                            'type': {'DataType': 'String', 'StringValue': event['type']},
+                            'user_id': {'DataType': 'String', 'StringValue': event['user_id']}
+                        }
+                    }
+                    for index, event in enumerate(batch)
+                ]
+            )
+            for failure in response.get('Failed', []):
+                print(f"Error publishing alert {batch[int(failure['Id'])]['type']} for {batch[int(failure['Id'])]['endpoint_id']}: {failure.get('Message')}")
+
+
+def get_notifier():
+    """Build the notifier named by ALERT_NOTIFIER (log, memory or sns)"""
+    kind = os.environ.get('ALERT_NOTIFIER', 'log')
+    if kind == 'sns':
+        topic_arn = os.environ.get('ALERT_SNS_TOPIC_ARN')
+        if not topic_arn:
+            raise ValueError("ALERT_SNS_TOPIC_ARN environment variable is not set")
+        return SnsNotifier(topic_arn)
+    if kind == 'memory':
+        return InMemoryNotifier()
+    if kind == 'log':
+        return LogNotifier()
+    raise ValueError(f"Unknown ALERT_NOTIFIER: {kind}")
@@ -0,0 +1,308 @@
+import asyncio
+import os
+import socket
+import ssl
+import time
+from datetime import datetime
+from urllib.parse import urlsplit, urljoin
+
+# Timeout in seconds for one request/response exchange (one redirect hop)
+PROBE_TIMEOUT = float(os.environ.get('PROBE_TIMEOUT', '5'))
+MAX_REDIRECTS = int(os.environ.get('PROBE_MAX_REDIRECTS', '5'))
+# Bodies larger than this are not downloaded in full
+MAX_BODY_BYTES = int(os.environ.get('PROBE_MAX_BODY_BYTES', str(1024 * 1024)))
+USER_AGENT = 'betterstack-monitor/1.0'
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Resolved addresses are reused for this long by warm checks
+DNS_CACHE_TTL = float(os.environ.get('PROBE_DNS_CACHE_TTL', '60'))
+# Idle keep-alive connections older than this are not reused
+KEEPALIVE_IDLE_SECONDS = float(os.environ.get('PROBE_KEEPALIVE_IDLE_SECONDS', '30'))
+KEEPALIVE_MAX_PER_HOST = int(os.environ.get('PROBE_KEEPALIVE_MAX_PER_HOST', '4'))
+# 'cold' measures a fresh resolution, connection and handshake on every check;
+# 'warm' reuses cached DNS answers and kept-alive connections
+MEASUREMENT_MODES = ('cold', 'warm')
+DEFAULT_MEASUREMENT_MODE = os.environ.get('PROBE_MEASUREMENT_MODE', 'cold')
+
+
+class ProbeContext:
+    """Probe state built once per container and shared by every check.
+
+    Holds the TLS context (so the CA bundle is loaded once), a DNS cache and
+    a pool of idle keep-alive connections. Pooled connections belong to the
+    event loop that opened them, so the probe engine keeps one loop for the
+    life of the container.
+    """
+
+    def __init__(self):
+        self.ssl_context = ssl.create_default_context()
+        self._dns = {}
+        self._idle = {}
+
+    async def resolve(self, host, port, use_cache):
+        key = (host, port)
+        now = time.monotonic()
+        cached = self._dns.get(key)
+        if use_cache and cached is not None and cached[0] > now:
+            return cached[1]
+        loop = asyncio.get_running_loop()
+        addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        self._dns[key] = (now + DNS_CACHE_TTL, addresses)
+        return addresses
+
+    def checkout(self, key):
+        """Take an idle connection for key that still looks usable, or None"""
+        idle = self._idle.get(key, [])
+        while idle:
+            reader, writer, certificate, idle_since = idle.pop()
+            if time.monotonic() - idle_since <= KEEPALIVE_IDLE_SECONDS and not writer.is_closing() and not reader.at_eof():
+                return reader, writer, certificate
+            writer.close()
+        return None
+
+    def checkin(self, key, reader, writer, certificate):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) >= KEEPALIVE_MAX_PER_HOST:
+            writer.close()
+            return
+        idle.append((reader, writer, certificate, time.monotonic()))
+
+
+probe_context = ProbeContext()
+
+
+def _elapsed_ms(start, end):
+    return round((end - start) * 1000, 2)
+
+
+def _certificate_details(ssl_object):
+    """Extract certificate details from an established TLS connection"""
+    cert = ssl_object.getpeercert()
+    not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+    return {
+        'certificate_valid': True,
+        'certificate_expiry_date': not_after.isoformat(),
+        'certificate_issuer': dict(x[0] for x in cert['issuer']).get('CN', ''),
+        'tls_version': ssl_object.version(),
+        'secure_protocol': True,
+        'cipher': ssl_object.cipher()[0]
+    }
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_exactly(reader, length):
+    """Read and discard length bytes; return False if the connection ended early"""
+    while length > 0:
+        chunk = await reader.read(min(length, 65536))
+        if not chunk:
+            return False
+        length -= len(chunk)
+    return True
+
+
+async def _read_chunked(reader):
+    """Read a chunked body; return (bytes read, whether the terminating chunk was reached)"""
+    received = 0
+    while received <= MAX_BODY_BYTES:
+        size_line = await reader.readline()
+        if not size_line:
+            return received, False
+        size = int(size_line.split(b';')[0].strip() or b'0', 16)
+        if size == 0:
+            await _read_headers(reader)
+            return received, True
+        if not await _read_exactly(reader, size + 2):
+            return received, False
+        received += size
+    return received, False
+
+
+async def _read_body(reader, status_code, headers):
+    """Read the response body up to MAX_BODY_BYTES.
+
+    Returns (bytes read, complete) where complete means the body was framed
+    and fully consumed, so the connection can carry another request.
+    """
+    if status_code in (204, 304) or 100 <= status_code < 200:
+        return 0, True
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        return await _read_chunked(reader)
+    content_length = headers.get('content-length')
+    if content_length is not None:
+        length = int(content_length)
+        if length > MAX_BODY_BYTES:
+            await _read_exactly(reader, MAX_BODY_BYTES)
+            return MAX_BODY_BYTES, False
+        return length, await _read_exactly(reader, length)
+    # No framing: the body runs until the server closes the connection
+    received = 0
+    while received < MAX_BODY_BYTES:
+        chunk = await reader.read(min(MAX_BODY_BYTES - received, 65536))
+        if not chunk:
+            break
+        received += len(chunk)
+    return received, False
+
+
+async def _open(context, host, port, secure, timings, warm):
+    """Resolve, connect and handshake a new connection, recording phase timings"""
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    addresses = await context.resolve(host, port, use_cache=warm)
+    resolved = time.perf_counter()
+    timings['dns_latency'] = _elapsed_ms(start, resolved)
+
+    family, sock_type, proto, _, address = addresses[0]
+    sock = socket.socket(family, sock_type, proto)
+    sock.setblocking(False)
+    try:
+        await loop.sock_connect(sock, address)
+    except Exception:
+        sock.close()
+        raise
+    connected = time.perf_counter()
+    timings['connection_latency'] = _elapsed_ms(resolved, connected)
+
+    reader, writer = await asyncio.open_connection(
+        sock=sock,
+        ssl=context.ssl_context if secure else None,
+        server_hostname=host if secure else None
+    )
+    certificate = None
+    if secure:
+        timings['tls_handshake_latency'] = _elapsed_ms(connected, time.perf_counter())
+        certificate = _certificate_details(writer.get_extra_info('ssl_object'))
+    return reader, writer, certificate
+
+
+async def _send_request(reader, writer, host_header, path, keep_alive):
+    writer.write((
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: {host_header}\r\n'
+        f'User-Agent: {USER_AGENT}\r\n'
+        'Accept: */*\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+    ).encode('ascii'))
+    await writer.drain()
+    sent = time.perf_counter()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('Connection closed before a response was received')
+    return sent, status_line
+
+
+async def _exchange(url, timings, context=probe_context, warm=False):
+    """Fetch url over one connection, new (cold) or reused from the pool (warm).
+
+    Phase timings are written into timings as they complete so that a
+    failure part-way through still reports the phases that succeeded. A
+    reused connection has no DNS, TCP or TLS phase, so those stay unset.
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    host = parts.hostname
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    host_header = host if parts.port is None else f'{host}:{parts.port}'
+    key = (parts.scheme, host, port)
+
+    start = time.perf_counter()
+    pooled = context.checkout(key) if warm else None
+    response = None
+    if pooled is not None:
+        reader, writer, certificate = pooled
+        try:
+            response = await _send_request(reader, writer, host_header, path, keep_alive=True)
+            timings['connection_reused'] = True
+        except (ConnectionError, OSError):
+            # The server dropped the idle connection; fall back to a new one
+            writer.close()
+    if response is None:
+        reader, writer, certificate = await _open(context, host, port, secure, timings, warm)
+        timings['connection_reused'] = False
+    reusable = False
+    try:
+        if certificate is not None:
+            timings['certificate'] = certificate
+        if response is None:
+            response = await _send_request(reader, writer, host_header, path, keep_alive=warm)
+        sent, status_line = response
+        first_byte = time.perf_counter()
+        # Time-to-first-byte is measured from the moment the request is sent
+        timings['ttfb'] = _elapsed_ms(sent, first_byte)
+        status_code = int(status_line.split()[1])
+        headers = await _read_headers(reader)
+        _, complete = await _read_body(reader, status_code, headers)
+        timings['total_latency'] = _elapsed_ms(start, time.perf_counter())
+        reusable = (
+            warm and complete
+            and status_line.startswith(b'HTTP/1.1')
+            and headers.get('connection', '').lower() != 'close'
+        )
+        return status_code, headers
+    finally:
+        if reusable:
+            context.checkin(key, reader, writer, certificate)
+        else:
+            writer.close()
+
+
+async def probe_endpoint(url, timeout=PROBE_TIMEOUT, mode=DEFAULT_MEASUREMENT_MODE, context=probe_context):
+    """Check an endpoint over one connection and collect every metric in one pass.
+
+    DNS, TCP, TLS, TTFB and certificate details describe the connection to
+    the configured URL. When it redirects, status_code and is_up come from
+    the final response and response_time covers every hop. mode is 'cold'
+    or 'warm' (see MEASUREMENT_MODES).
+    """
+    warm = mode == 'warm'
+    timings = {}
+    start = time.perf_counter()
+    try:
+        current_url = url
+        status_code, headers = await asyncio.wait_for(_exchange(current_url, timings, context, warm), timeout)
+        for _ in range(MAX_REDIRECTS):
+            if status_code not in REDIRECT_STATUSES or 'location' not in headers:
+                break
+            current_url = urljoin(current_url, headers['location'])
+            status_code, headers = await asyncio.wait_for(_exchange(current_url, {}, context, warm), timeout)
+        error = None
+    except Exception as e:
+        status_code = None
+        error = str(e) or type(e).__name__
+
+    result = {
+        'status_code': status_code,
+        'response_time': _elapsed_ms(start, time.perf_counter()) if status_code is not None else None,
+        'is_up': status_code is not None and 200 <= status_code < 300,
+        'dns_latency': timings.get('dns_latency'),
+        'connection_latency': timings.get('connection_latency'),
+        'tls_handshake_latency': timings.get('tls_handshake_latency'),
+        'ttfb': timings.get('ttfb'),
+        'total_latency': timings.get('total_latency'),
+        'measurement_mode': 'warm' if warm else 'cold',
+        'connection_reused': timings.get('connection_reused', False)
+    }
+    if 'certificate' in timings:
+        result.update(timings['certificate'])
+    else:
+        result.update({
+            'certificate_valid': False if url.startswith('https://') else None,
+            'certificate_expiry_date': None,
+            'certificate_issuer': None,
+            'tls_version': None,
+            'secure_protocol': False
+        })
+    if error is not None:
+        result['error'] = error
+    return result
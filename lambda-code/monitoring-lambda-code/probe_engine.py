@@ -0,0 +1,75 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum number of checks in flight at once
+PROBE_CONCURRENCY = int(os.environ.get('PROBE_CONCURRENCY', '50'))
+# Time kept back from the Lambda deadline so results can still be written
+DEADLINE_MARGIN_MS = int(os.environ.get('DEADLINE_MARGIN_MS', '15000'))
+
+# One event loop per container: kept-alive probe connections are bound to the
+# loop that opened them, so it must outlive a single invocation
+_loop = None
+
+
+def _event_loop():
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def deadline_from_context(context, margin_ms=DEADLINE_MARGIN_MS):
+    """Return a time.monotonic() deadline derived from the Lambda context, or None"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    remaining_ms = context.get_remaining_time_in_millis() - margin_ms
+    return time.monotonic() + max(remaining_ms, 0) / 1000
+
+
+async def _run_checks(endpoints, check, concurrency, deadline):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    # Coroutine checks run on the event loop; blocking ones are offloaded to threads
+    is_async = asyncio.iscoroutinefunction(check)
+    executor = None if is_async else ThreadPoolExecutor(max_workers=concurrency)
+    results = []
+    skipped = []
+
+    async def run_one(endpoint):
+        async with semaphore:
+            if deadline is not None and time.monotonic() >= deadline:
+                skipped.append(endpoint)
+                return
+            future = check(endpoint) if is_async else loop.run_in_executor(executor, check, endpoint)
+            try:
+                if deadline is None:
+                    result = await future
+                else:
+                    result = await asyncio.wait_for(future, timeout=deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                skipped.append(endpoint)
+                return
+            results.append((endpoint, result))
+
+    try:
+        await asyncio.gather(*(run_one(endpoint) for endpoint in endpoints))
+    finally:
+        if executor is not None:
+            # Checks that overran the deadline are abandoned rather than awaited
+            executor.shutdown(wait=False)
+    return results, skipped
+
+
+def run_checks(endpoints, check, concurrency=PROBE_CONCURRENCY, deadline=None):
+    """Run check(endpoint) concurrently for every endpoint.
+
+    Returns (results, skipped) where results is a list of (endpoint, result)
+    pairs and skipped lists the endpoints that could not be checked before
+    the deadline.
+    """
+    if not endpoints:
+        return [], []
+    return _event_loop().run_until_complete(_run_checks(endpoints, check, max(1, concurrency), deadline))
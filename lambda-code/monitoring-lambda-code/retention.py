@@ -0,0 +1,71 @@
+import calendar
+import json
+import os
+import time
+from datetime import timedelta
+from log_writer import MAX_RETRIES, _backoff
+
+DEFAULT_PLAN = 'Free'
+# Days kept per plan: raw check logs and rollup buckets per granularity, so
+# older history survives only in coarser buckets. Must match the API's
+# policies; RETENTION_POLICIES (JSON of the same shape) overrides both.
+RETENTION_POLICIES = json.loads(os.environ.get('RETENTION_POLICIES', '') or 'null') or {
+    'Free': {'logs': 7, 'minute': 2, 'hour': 30, 'day': 365},
+    'Pro': {'logs': 90, 'minute': 7, 'hour': 180, 'day': 730},
+    'Enterprise': {'logs': 395, 'minute': 30, 'hour': 395, 'day': 1825},
+}
+# Plans are re-read after this many seconds, so plan changes apply to new writes
+PLAN_CACHE_TTL = int(os.environ.get('PLAN_CACHE_TTL', '300'))
+# BatchGetItem accepts at most 100 keys per call
+READ_BATCH_SIZE = 100
+
+_plans = {}
+
+
+def policy_for(plan):
+    """Retention days for a plan; unknown plans get the default plan's policy"""
+    return RETENTION_POLICIES.get(plan) or RETENTION_POLICIES[DEFAULT_PLAN]
+
+
+def expires_at(start, plan, kind):
+    """DynamoDB TTL (epoch seconds) for data of kind ('logs', 'minute', 'hour' or 'day') starting at start"""
+    return calendar.timegm((start + timedelta(days=policy_for(plan)[kind])).timetuple())
+
+
+def load_plans(dynamodb, table_name, user_ids):
+    """Plan of each user, keyed by user_id; cached per container for PLAN_CACHE_TTL seconds"""
+    now = time.monotonic()
+    plans = {}
+    missing = []
+    unread = set()
+    for user_id in set(user_ids):
+        cached = _plans.get(user_id)
+        if cached is not None and cached[0] > now:
+            plans[user_id] = cached[1]
+        else:
+            missing.append(user_id)
+    for start in range(0, len(missing), READ_BATCH_SIZE):
+        request = {
+            table_name: {
+                'Keys': [{'user_id': user_id} for user_id in missing[start:start + READ_BATCH_SIZE]],
+                'ProjectionExpression': 'user_id, #plan',
+                'ExpressionAttributeNames': {'#plan': 'plan'}
+            }
+        }
+        for attempt in range(MAX_RETRIES + 1):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response['Responses'].get(table_name, []):
+                plans[item['user_id']] = item.get('plan') or DEFAULT_PLAN
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(_backoff(attempt))
+        else:
+            # Unread users fall back to the default plan for this invocation only
+            unread.update(key['user_id'] for key in request[table_name]['Keys'])
+            print(f"Could not read {len(request[table_name]['Keys'])} user plans")
+    for user_id in missing:
+        plans.setdefault(user_id, DEFAULT_PLAN)
+        if user_id not in unread:
+            _plans[user_id] = (now + PLAN_CACHE_TTL, plans[user_id])
+    return plans
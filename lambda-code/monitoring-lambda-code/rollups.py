@@ -0,0 +1,198 @@
+import os
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from retention import expires_at, DEFAULT_PLAN
+from sketch import Sketch
+
+# Bucket widths kept for every endpoint; the API answers a time range from
+# whole day buckets in the middle and hour/minute buckets at the edges
+GRANULARITIES = {
+    'minute': '%Y-%m-%dT%H:%M',
+    'hour': '%Y-%m-%dT%H:00',
+    'day': '%Y-%m-%dT00:00'
+}
+METRICS = (
+    'response_time',
+    'dns_latency',
+    'connection_latency',
+    'tls_handshake_latency',
+    'ttfb',
+    'total_latency'
+)
+# Latencies that also get a quantile sketch per bucket, for the API's percentiles
+SKETCH_METRICS = ('response_time', 'dns_latency', 'connection_latency', 'total_latency')
+ROLLUP_WRITE_CONCURRENCY = int(os.environ.get('ROLLUP_WRITE_CONCURRENCY', '16'))
+# Conflicting writers to the same bucket retry the merge this many times
+SKETCH_MAX_ATTEMPTS = int(os.environ.get('SKETCH_MAX_ATTEMPTS', '5'))
+# Hour and day buckets last written by this container, kept so the next write
+# to them can merge without reading the bucket first
+BUCKET_CACHE_SIZE = int(os.environ.get('ROLLUP_BUCKET_CACHE_SIZE', '20000'))
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_deserializer = TypeDeserializer()
+
+
+def rollup_key(user_id, endpoint_id, granularity):
+    return f'{user_id}#{endpoint_id}#{granularity}'
+
+
+def bucket_key(bucket, region):
+    return f'{bucket}#{region}'
+
+
+def _increment_expression(check_result):
+    """Build the ADD/SET update adding one check to a bucket"""
+    adds = ['check_count :one', 'up_count :up']
+    values = {
+        ':one': 1,
+        ':up': 1 if check_result.get('is_up') else 0
+    }
+    names = {}
+    status_code = check_result.get('status_code')
+    if status_code is not None:
+        names['#status'] = f'status_{int(status_code)}'
+        adds.append('#status :one')
+    for metric in METRICS:
+        value = check_result.get(metric)
+        if value is None:
+            continue
+        values[f':{metric}'] = Decimal(str(value))
+        adds.append(f'{metric}_sum :{metric}')
+        adds.append(f'{metric}_count :one')
+    return adds, names, values
+
+
+def _distribution_update(item, check_result):
+    """SET statements and values folding the check into the item's min/max bounds and sketches"""
+    sets = []
+    values = {}
+    for metric in METRICS:
+        value = check_result.get(metric)
+        if value is None:
+            continue
+        value = Decimal(str(value))
+        for bound in ('min', 'max'):
+            attribute = f'{metric}_{bound}'
+            current = item.get(attribute)
+            if current is not None and not (value < current if bound == 'min' else value > current):
+                continue
+            values[f':{attribute}'] = value
+            sets.append(f'{attribute} = :{attribute}')
+        if metric not in SKETCH_METRICS:
+            continue
+        current = item.get(f'{metric}_sketch')
+        sketch = Sketch.from_bytes(current) if current is not None else Sketch()
+        sketch.add(float(value))
+        values[f':{metric}_sketch'] = sketch.to_bytes()
+        sets.append(f'{metric}_sketch = :{metric}_sketch')
+    return sets, values
+
+
+def _cached_bucket(key):
+    with _buckets_lock:
+        return _buckets.get((key['rollup_key'], key['bucket_key']), {})
+
+
+def _cache_bucket(key, item):
+    with _buckets_lock:
+        cache_key = (key['rollup_key'], key['bucket_key'])
+        _buckets.pop(cache_key, None)
+        _buckets[cache_key] = item
+        while len(_buckets) > BUCKET_CACHE_SIZE:
+            _buckets.pop(next(iter(_buckets)))
+
+
+def _conflicting_item(error, table, key):
+    """The bucket as it was when a conditional write failed"""
+    item = error.response.get('Item')
+    if item is None:
+        return table.get_item(Key=key, ConsistentRead=True).get('Item', {})
+    # The item in an error response is not deserialized by the resource layer
+    return {name: _deserializer.deserialize(value) for name, value in item.items()}
+
+
+def _update_bucket(table, key, static_sets, static_values, adds, names, check_result, cache=True):
+    """Apply one check to a bucket in a single conditional write.
+
+    Counters are added and bounds and latency sketches are replaced in the
+    same update_item, conditional on the bucket's sketch_version being the
+    one the merge was computed from. The merge starts from the bucket as this
+    container last wrote it (or an empty bucket), so the common case is one
+    write; on a conflict the failed write returns the current bucket and the
+    merge is retried from it. A failed condition applies nothing, so counters
+    are never added twice. Minute buckets are not cached as no later check
+    writes to them.
+    """
+    item = _cached_bucket(key)
+    for attempt in range(SKETCH_MAX_ATTEMPTS):
+        sets, values = _distribution_update(item, check_result)
+        version = item.get('sketch_version')
+        if version is not None:
+            condition = 'sketch_version = :version'
+            values[':version'] = version
+        elif item:
+            # A bucket written before sketches were kept
+            condition = 'attribute_not_exists(sketch_version)'
+        else:
+            condition = 'attribute_not_exists(rollup_key)'
+        values[':next_version'] = (version or 0) + 1
+        try:
+            response = table.update_item(
+                Key=key,
+                UpdateExpression='SET ' + ', '.join(static_sets + sets + ['sketch_version = :next_version']) + ' ADD ' + ', '.join(adds),
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues={**static_values, **values},
+                ReturnValues='ALL_NEW' if cache else 'NONE',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+            if cache:
+                _cache_bucket(key, response.get('Attributes', {}))
+            return
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            item = _conflicting_item(e, table, key)
+    raise RuntimeError(f"Bucket {key['rollup_key']} {key['bucket_key']} kept changing after {SKETCH_MAX_ATTEMPTS} attempts")
+
+
+def record_rollups(table, endpoint, check_result, region):
+    """Add one check result to the endpoint's minute, hour and day buckets, one write each.
+
+    Each bucket expires once the owner's plan stops retaining its granularity,
+    so older history is kept only in the coarser buckets.
+    """
+    checked_at = check_result['checked_at']
+    plan = endpoint.get('plan', DEFAULT_PLAN)
+    adds, names, values = _increment_expression(check_result)
+    names = {**names, '#bucket': 'bucket', '#region': 'region'}
+    for granularity, bucket_format in GRANULARITIES.items():
+        bucket = checked_at.strftime(bucket_format)
+        bucket_start = datetime.strptime(bucket, bucket_format)
+        key = {
+            'rollup_key': rollup_key(endpoint['user_id'], endpoint['endpoint_id'], granularity),
+            'bucket_key': bucket_key(bucket, region)
+        }
+        static_values = {**values, ':bucket': bucket, ':region': region, ':expires_at': expires_at(bucket_start, plan, granularity)}
+        _update_bucket(table, key, ['#bucket = :bucket', '#region = :region', 'expires_at = :expires_at'], static_values, adds, names, check_result,
+                       cache=granularity != 'minute')
+
+
+def write_rollups(table, results, region):
+    """Record rollups for every (endpoint, result) pair and return the failure count"""
+    def record(pair):
+        endpoint, check_result = pair
+        try:
+            record_rollups(table, endpoint, check_result, region)
+            return True
+        except Exception as e:
+            print(f"Error recording rollups for {endpoint['endpoint_id']}: {str(e)}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=ROLLUP_WRITE_CONCURRENCY) as executor:
+        return sum(1 for ok in executor.map(record, results) if not ok)
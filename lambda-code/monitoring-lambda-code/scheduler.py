@@ -0,0 +1,110 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from botocore.exceptions import ClientError
+
+DEFAULT_CHECK_INTERVAL = int(os.environ.get('DEFAULT_CHECK_INTERVAL', '300'))
+# Endpoints due within this many seconds of the current tick are checked now;
+# about half the one minute schedule period keeps checks from drifting a full tick late
+SCHEDULE_TOLERANCE_SECONDS = int(os.environ.get('SCHEDULE_TOLERANCE_SECONDS', '30'))
+# A claimed endpoint's due time is first set this far ahead and only moved to
+# its next due time once its result is written. If the invocation dies first
+# the lease runs out and a later tick checks the endpoint again. Must be at
+# least the Lambda timeout, so a running invocation never has its endpoints
+# claimed twice; Terraform sets it to the function's timeout.
+SCHEDULE_LEASE_SECONDS = int(os.environ.get('SCHEDULE_LEASE_SECONDS', '300'))
+SCHEDULE_WRITE_CONCURRENCY = int(os.environ.get('SCHEDULE_WRITE_CONCURRENCY', '16'))
+
+
+def next_due_attribute(region):
+    """Name of the endpoint attribute holding the next due time for a region.
+
+    Every region runs its own schedule against the shared endpoints table, so
+    the due time is kept per region.
+    """
+    return f'next_check_at_{region}'
+
+
+def next_due_time(previous_due, interval, now):
+    """Advance previous_due by whole intervals past now so the cadence does not drift"""
+    if previous_due is None:
+        return now + interval
+    missed = int((now - previous_due) // interval) + 1
+    return previous_due + max(missed, 1) * interval
+
+
+def _advance(table, attribute, endpoint_id, previous_due, next_due):
+    """Move an endpoint's due time from previous_due to next_due unless another tick already did"""
+    update_kwargs = {
+        'Key': {'endpoint_id': endpoint_id},
+        'UpdateExpression': 'SET #next = :next',
+        'ExpressionAttributeNames': {'#next': attribute},
+        'ExpressionAttributeValues': {':next': Decimal(next_due)}
+    }
+    if previous_due is None:
+        update_kwargs['ConditionExpression'] = 'attribute_not_exists(#next)'
+    else:
+        update_kwargs['ConditionExpression'] = '#next = :previous'
+        update_kwargs['ExpressionAttributeValues'][':previous'] = Decimal(previous_due)
+    try:
+        table.update_item(**update_kwargs)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def select_due_endpoints(table, endpoints, region, now=None):
+    """Return the endpoints due on this tick and lease them to this invocation.
+
+    An endpoint is due when its next due time for this region is missing or
+    falls within SCHEDULE_TOLERANCE_SECONDS of now. Its due time is set to a
+    lease of SCHEDULE_LEASE_SECONDS with a condition on the old one, so an
+    overlapping or duplicate tick cannot claim the same endpoint twice. Each
+    returned endpoint carries lease_until and next_due for complete_checks.
+    """
+    now = int(now if now is not None else time.time())
+    attribute = next_due_attribute(region)
+    lease_until = now + SCHEDULE_LEASE_SECONDS
+    due = []
+    for endpoint in endpoints:
+        previous_due = endpoint.get(attribute)
+        previous_due = int(previous_due) if previous_due is not None else None
+        if previous_due is None or previous_due - now <= SCHEDULE_TOLERANCE_SECONDS:
+            interval = int(endpoint.get('check_interval') or DEFAULT_CHECK_INTERVAL)
+            due.append((endpoint, previous_due, next_due_time(previous_due, interval, now)))
+    if not due:
+        return []
+
+    with ThreadPoolExecutor(max_workers=SCHEDULE_WRITE_CONCURRENCY) as executor:
+        claimed = list(executor.map(
+            lambda entry: _advance(table, attribute, entry[0]['endpoint_id'], entry[1], lease_until),
+            due
+        ))
+    selected = []
+    for (endpoint, _, next_due), ok in zip(due, claimed):
+        if ok:
+            endpoint['lease_until'] = lease_until
+            endpoint['next_due'] = next_due
+            selected.append(endpoint)
+    return selected
+
+
+def complete_checks(table, endpoints, region):
+    """Move leased endpoints whose results are written to their next due time.
+
+    Returns how many were moved; an endpoint whose lease ran out and was
+    claimed again by a later tick is left to that tick.
+    """
+    attribute = next_due_attribute(region)
+    leased = [endpoint for endpoint in endpoints if endpoint.get('lease_until') is not None]
+    if not leased:
+        return 0
+    with ThreadPoolExecutor(max_workers=SCHEDULE_WRITE_CONCURRENCY) as executor:
+        completed = executor.map(
+            lambda endpoint: _advance(table, attribute, endpoint['endpoint_id'], int(endpoint['lease_until']), int(endpoint['next_due'])),
+            leased
+        )
+        return sum(completed)
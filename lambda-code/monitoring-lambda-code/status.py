@@ -0,0 +1,93 @@
+import time
+from decimal import Decimal
+from log_writer import BatchLogWriter, MAX_RETRIES, _backoff
+
+# BatchGetItem accepts at most 100 keys per call
+READ_BATCH_SIZE = 100
+STATUS_ATTRIBUTES = (
+    'endpoint_id',
+    'region',
+    'is_up',
+    'response_time',
+    'checked_at',
+    'consecutive_failures',
+    'last_change_at',
+    'certificate_expiry_date'
+)
+
+
+def load_status_records(dynamodb, table_name, keys):
+    """Batch-read status records for (endpoint_id, region) keys, keyed the same way"""
+    names = {f'#a{i}': name for i, name in enumerate(STATUS_ATTRIBUTES)}
+    records = {}
+    keys = list(dict.fromkeys(keys))
+    for start in range(0, len(keys), READ_BATCH_SIZE):
+        request = {
+            table_name: {
+                'Keys': [{'endpoint_id': endpoint_id, 'region': region} for endpoint_id, region in keys[start:start + READ_BATCH_SIZE]],
+                'ProjectionExpression': ', '.join(names),
+                'ExpressionAttributeNames': names
+            }
+        }
+        for attempt in range(MAX_RETRIES + 1):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response['Responses'].get(table_name, []):
+                records[(item['endpoint_id'], item['region'])] = item
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(_backoff(attempt))
+        else:
+            # Missing records only reset the failure streak, so carry on
+            print(f"Could not read {len(request[table_name]['Keys'])} status records")
+    return records
+
+
+def load_previous_status(dynamodb, table_name, endpoint_ids, region):
+    """Read this region's current status record for each endpoint, keyed by endpoint_id"""
+    records = load_status_records(dynamodb, table_name, [(endpoint_id, region) for endpoint_id in endpoint_ids])
+    return {endpoint_id: record for (endpoint_id, _), record in records.items()}
+
+
+def build_status_record(endpoint, check_result, region, previous):
+    """New status record for one check, carrying the failure streak and last change time forward"""
+    checked_at = check_result['checked_at'].isoformat()
+    is_up = bool(check_result.get('is_up'))
+    failures = 0 if is_up else int((previous or {}).get('consecutive_failures', 0)) + 1
+    if previous is None or previous.get('is_up') != is_up:
+        last_change_at = checked_at
+    else:
+        last_change_at = previous.get('last_change_at', checked_at)
+    record = {
+        'endpoint_id': endpoint['endpoint_id'],
+        'region': region,
+        'user_id': endpoint['user_id'],
+        'url': endpoint['url'],
+        'is_up': is_up,
+        'status_code': check_result.get('status_code'),
+        'response_time': Decimal(str(check_result['response_time'])) if check_result.get('response_time') is not None else None,
+        'error_message': check_result.get('error'),
+        'certificate_expiry_date': check_result.get('certificate_expiry_date'),
+        'checked_at': checked_at,
+        'consecutive_failures': failures,
+        'last_change_at': last_change_at
+    }
+    return {k: v for k, v in record.items() if v is not None}
+
+
+def write_status(dynamodb, table_name, results, region):
+    """Overwrite each checked endpoint's status record for this region.
+
+    Returns (endpoint, previous record or None, new record) triples so callers
+    can react to state changes.
+    """
+    previous = load_previous_status(dynamodb, table_name, [endpoint['endpoint_id'] for endpoint, _ in results], region)
+    records = []
+    with BatchLogWriter(dynamodb, table_name, key_attributes=('endpoint_id', 'region')) as writer:
+        for endpoint, check_result in results:
+            before = previous.get(endpoint['endpoint_id'])
+            record = build_status_record(endpoint, check_result, region, before)
+            writer.add(record)
+            records.append((endpoint, before, record))
+    print(f"Wrote {writer.written} status records to {table_name}, {writer.failed} failed")
+    return records
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import alerts
+from alerts import detect_transitions
+from status import write_status
+
+TABLE_NAME = 'status'
+ENDPOINT = {'endpoint_id': 'endpoint-1', 'user_id': 'user-1', 'url': 'https://example.com'}
+START = datetime(2026, 10, 18, 12, 0)
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    monkeypatch.setattr(alerts, 'ALERT_FAILURE_THRESHOLD', 3)
+    monkeypatch.setattr(alerts, 'ALERT_REGION_QUORUM', 2)
+    monkeypatch.setattr(alerts, 'MONITORING_REGIONS', ['us-east-1', 'eu-west-1', 'sa-east-1'])
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        dynamodb.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'endpoint_id', 'KeyType': 'HASH'}, {'AttributeName': 'region', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'endpoint_id', 'AttributeType': 'S'}, {'AttributeName': 'region', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield dynamodb
+
+
+def _tick(dynamodb, region, is_up, minute):
+    """One check of the endpoint in a region, as the Lambda records it, and the events it raises"""
+    checked_at = START + timedelta(minutes=minute)
+    result = {'checked_at': checked_at, 'is_up': is_up, 'status_code': 200 if is_up else 503, 'response_time': 120.0}
+    records = write_status(dynamodb, TABLE_NAME, [(ENDPOINT, result)], region)
+    return [event['type'] for event in detect_transitions(dynamodb, TABLE_NAME, records, region, now=checked_at)]
+
+
+def _fail(dynamodb, region, ticks, first_minute=0):
+    return [_tick(dynamodb, region, False, first_minute + minute) for minute in range(ticks)]
+
+
+def _all_up(dynamodb, minute=-1):
+    """Give every region a fresh record so the full quorum applies"""
+    for region in alerts.MONITORING_REGIONS:
+        _tick(dynamodb, region, True, minute)
+
+
+def test_no_alert_below_the_failure_threshold(dynamodb):
+    _all_up(dynamodb)
+    _fail(dynamodb, 'eu-west-1', 3)
+
+    assert _fail(dynamodb, 'us-east-1', 2) == [[], []]
+
+
+def test_down_then_up_once_quorum_is_reached(dynamodb):
+    _all_up(dynamodb)
+
+    assert _fail(dynamodb, 'eu-west-1', 3) == [[], [], []]
+    assert _fail(dynamodb, 'us-east-1', 3) == [[], [], ['down']]
+    assert _tick(dynamodb, 'us-east-1', True, 3) == ['up']
+
+
+def test_one_region_down_is_not_a_quorum(dynamodb):
+    _all_up(dynamodb)
+
+    assert _fail(dynamodb, 'us-east-1', 4) == [[], [], [], []]
+
+
+def test_stale_peers_are_left_out_of_the_quorum(dynamodb):
+    # The other regions last reported well before ALERT_STALE_SECONDS, so us-east-1 alone makes the quorum
+    _all_up(dynamodb, minute=-60)
+
+    assert _fail(dynamodb, 'us-east-1', 3)[-1] == ['down']
+
+
+def test_repeated_down_ticks_alert_once(dynamodb):
+    _all_up(dynamodb)
+    _fail(dynamodb, 'eu-west-1', 3)
+    assert _fail(dynamodb, 'us-east-1', 3)[-1] == ['down']
+
+    # Further failures in either region, and eu-west-1 seeing the quorum itself, raise nothing new
+    assert _fail(dynamodb, 'us-east-1', 2, first_minute=3) == [[], []]
+    assert _fail(dynamodb, 'eu-west-1', 2, first_minute=3) == [[], []]
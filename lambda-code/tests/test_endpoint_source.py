@@ -0,0 +1,46 @@
+import json
+
+import endpoint_source
+from endpoint_source import dispatch_shards
+
+
+class FakeLambda:
+    """Records async invocations, failing the ones for the given shards"""
+
+    def __init__(self, failing_shards=()):
+        self.failing_shards = set(failing_shards)
+        self.payloads = []
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        payload = json.loads(Payload)
+        if payload['shard'] in self.failing_shards:
+            raise RuntimeError('TooManyRequestsException')
+        assert len(Payload) <= endpoint_source.MAX_INVOKE_PAYLOAD_BYTES
+        self.payloads.append(payload)
+
+
+def _endpoints(count, shard):
+    return [{'endpoint_id': f'{shard}-{index}', 'user_id': 'user-1', 'url': f'https://example.com/{"x" * 200}/{index}'} for index in range(count)]
+
+
+def test_large_shard_is_split_under_the_payload_limit(monkeypatch):
+    monkeypatch.setattr(endpoint_source, 'MAX_INVOKE_PAYLOAD_BYTES', 4096)
+    shards = [_endpoints(100, 0), [], _endpoints(3, 2)]
+    client = FakeLambda()
+
+    dispatched, undelivered = dispatch_shards(client, 'monitor', shards)
+
+    assert undelivered == []
+    assert dispatched == len(client.payloads) > 2
+    delivered = [endpoint['endpoint_id'] for payload in client.payloads for endpoint in payload['endpoints']]
+    assert sorted(delivered) == sorted(endpoint['endpoint_id'] for shard in shards for endpoint in shard)
+
+
+def test_failed_invocations_return_their_endpoints():
+    shards = [_endpoints(5, 0), _endpoints(5, 1)]
+    client = FakeLambda(failing_shards={1})
+
+    dispatched, undelivered = dispatch_shards(client, 'monitor', shards)
+
+    assert dispatched == 1
+    assert undelivered == shards[1]
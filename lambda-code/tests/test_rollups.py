@@ -0,0 +1,147 @@
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import rollups
+from sketch import Sketch
+
+CHECKED_AT = datetime(2026, 10, 18, 12, 30, 5)
+ENDPOINT = {'user_id': 'user-1', 'endpoint_id': 'endpoint-1', 'plan': 'Free'}
+
+
+@pytest.fixture
+def table():
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        table = dynamodb.create_table(
+            TableName='rollups',
+            KeySchema=[{'AttributeName': 'rollup_key', 'KeyType': 'HASH'}, {'AttributeName': 'bucket_key', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'rollup_key', 'AttributeType': 'S'}, {'AttributeName': 'bucket_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        rollups._buckets.clear()
+        yield table
+        rollups._buckets.clear()
+
+
+class CountingTable:
+    """Counts the writes record_rollups sends to a real (mocked) table"""
+
+    def __init__(self, table):
+        self.table = table
+        self.updates = 0
+        self.reads = 0
+
+    def update_item(self, **kwargs):
+        self.updates += 1
+        return self.table.update_item(**kwargs)
+
+    def get_item(self, **kwargs):
+        self.reads += 1
+        return self.table.get_item(**kwargs)
+
+
+class AtomicTable:
+    """Serializes calls, as moto's conditional writes are not atomic across threads.
+
+    Real DynamoDB applies each conditional write atomically; merges still
+    interleave between calls, so writers do conflict.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.lock = threading.Lock()
+
+    def update_item(self, **kwargs):
+        with self.lock:
+            return self.table.update_item(**kwargs)
+
+    def get_item(self, **kwargs):
+        with self.lock:
+            return self.table.get_item(**kwargs)
+
+
+def _result(response_time, dns_latency=2.0, checked_at=CHECKED_AT):
+    return {'checked_at': checked_at, 'is_up': True, 'status_code': 200, 'response_time': response_time, 'dns_latency': dns_latency, 'ttfb': 9.0}
+
+
+def _bucket(table, granularity):
+    bucket = CHECKED_AT.strftime(rollups.GRANULARITIES[granularity])
+    return table.get_item(Key={
+        'rollup_key': rollups.rollup_key('user-1', 'endpoint-1', granularity),
+        'bucket_key': rollups.bucket_key(bucket, 'us-east-1')
+    })['Item']
+
+
+def test_one_write_per_granularity(table):
+    counting = CountingTable(table)
+    rollups.record_rollups(counting, ENDPOINT, _result(120.0), 'us-east-1')
+    rollups.record_rollups(counting, ENDPOINT, _result(80.0, checked_at=CHECKED_AT + timedelta(minutes=1)), 'us-east-1')
+    # The second check's minute bucket is new and its hour/day buckets are cached
+    assert counting.updates == 2 * len(rollups.GRANULARITIES)
+    assert counting.reads == 0
+    for granularity in ('hour', 'day'):
+        item = _bucket(table, granularity)
+        assert item['check_count'] == 2
+        assert item['response_time_min'] == Decimal('80.0')
+        assert item['response_time_max'] == Decimal('120.0')
+        assert Sketch.from_bytes(item['response_time_sketch'].value).count == 2
+        assert 'ttfb_sketch' not in item
+
+
+def test_stale_cache_is_corrected_without_double_counting(table):
+    rollups.record_rollups(table, ENDPOINT, _result(100.0), 'us-east-1')
+    # Another container writes the same hour and day buckets
+    cached = dict(rollups._buckets)
+    rollups._buckets.clear()
+    rollups.record_rollups(table, ENDPOINT, _result(300.0), 'us-east-1')
+    rollups._buckets.update(cached)
+    rollups.record_rollups(table, ENDPOINT, _result(50.0), 'us-east-1')
+    for granularity in ('hour', 'day'):
+        item = _bucket(table, granularity)
+        assert item['check_count'] == 3
+        assert item['response_time_min'] == Decimal('50.0')
+        assert item['response_time_max'] == Decimal('300.0')
+        assert Sketch.from_bytes(item['response_time_sketch'].value).count == 3
+
+
+def test_bucket_written_before_sketches_keeps_its_bounds(table):
+    bucket = CHECKED_AT.strftime(rollups.GRANULARITIES['hour'])
+    table.put_item(Item={
+        'rollup_key': rollups.rollup_key('user-1', 'endpoint-1', 'hour'),
+        'bucket_key': rollups.bucket_key(bucket, 'us-east-1'),
+        'check_count': 5,
+        'response_time_min': Decimal('10'),
+        'response_time_max': Decimal('900')
+    })
+    rollups.record_rollups(table, ENDPOINT, _result(200.0), 'us-east-1')
+    item = _bucket(table, 'hour')
+    assert item['check_count'] == 6
+    assert item['response_time_min'] == Decimal('10')
+    assert item['response_time_max'] == Decimal('900')
+    assert item['sketch_version'] == 1
+
+
+def test_concurrent_writers_merge_every_check(table):
+    values = [float(value) for value in range(1, 81)]
+    atomic = AtomicTable(table)
+
+    def work(chunk):
+        for value in chunk:
+            rollups.record_rollups(atomic, ENDPOINT, _result(value), 'us-east-1')
+
+    threads = [threading.Thread(target=work, args=(values[index::4],)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for granularity in rollups.GRANULARITIES:
+        item = _bucket(table, granularity)
+        assert item['check_count'] == len(values)
+        assert Sketch.from_bytes(item['response_time_sketch'].value).count == len(values)
+        assert item['response_time_min'] == Decimal('1.0')
+        assert item['response_time_max'] == Decimal('80.0')
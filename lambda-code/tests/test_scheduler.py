@@ -0,0 +1,94 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+import scheduler
+from scheduler import complete_checks, next_due_attribute, select_due_endpoints
+
+REGION = 'sa-east-1'
+ATTRIBUTE = next_due_attribute(REGION)
+NOW = 1_800_000_000
+
+
+@pytest.fixture
+def table():
+    with mock_aws():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        yield dynamodb.create_table(
+            TableName='endpoints',
+            KeySchema=[{'AttributeName': 'endpoint_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'endpoint_id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+
+def _put(table, endpoint_id, check_interval=60, next_due=None):
+    item = {'endpoint_id': endpoint_id, 'user_id': 'user-1', 'url': 'https://example.com', 'check_interval': check_interval}
+    if next_due is not None:
+        item[ATTRIBUTE] = next_due
+    table.put_item(Item=item)
+
+
+def _load(table):
+    """The endpoints as the Lambda reads them on a tick"""
+    return table.scan()['Items']
+
+
+def _due_time(table, endpoint_id):
+    return int(table.get_item(Key={'endpoint_id': endpoint_id})['Item'][ATTRIBUTE])
+
+
+def test_selects_new_and_due_endpoints_only(table):
+    _put(table, 'new')
+    _put(table, 'due', next_due=NOW - 5)
+    _put(table, 'within-tolerance', next_due=NOW + scheduler.SCHEDULE_TOLERANCE_SECONDS)
+    _put(table, 'later', next_due=NOW + scheduler.SCHEDULE_TOLERANCE_SECONDS + 1)
+
+    selected = select_due_endpoints(table, _load(table), REGION, now=NOW)
+
+    assert sorted(endpoint['endpoint_id'] for endpoint in selected) == ['due', 'new', 'within-tolerance']
+    assert _due_time(table, 'later') == NOW + scheduler.SCHEDULE_TOLERANCE_SECONDS + 1
+
+
+def test_claim_is_a_lease_until_the_result_is_written(table):
+    _put(table, 'endpoint-1', check_interval=300, next_due=NOW - 5)
+
+    [endpoint] = select_due_endpoints(table, _load(table), REGION, now=NOW)
+
+    assert _due_time(table, 'endpoint-1') == NOW + scheduler.SCHEDULE_LEASE_SECONDS
+    assert endpoint['next_due'] == NOW - 5 + 300
+    assert complete_checks(table, [endpoint], REGION) == 1
+    assert _due_time(table, 'endpoint-1') == NOW - 5 + 300
+
+
+def test_duplicate_tick_does_not_claim_twice(table):
+    _put(table, 'endpoint-1', next_due=NOW - 5)
+    endpoints = _load(table)
+
+    first = select_due_endpoints(table, endpoints, REGION, now=NOW)
+    # An overlapping tick that read the endpoints before the first claim landed
+    second = select_due_endpoints(table, [dict(endpoint) for endpoint in endpoints], REGION, now=NOW)
+
+    assert len(first) == 1
+    assert second == []
+
+
+def test_unfinished_check_is_retried_once_the_lease_runs_out(table):
+    _put(table, 'endpoint-1', next_due=NOW - 5)
+    select_due_endpoints(table, _load(table), REGION, now=NOW)
+
+    # The invocation died before writing its result: the next tick leaves it alone ...
+    assert select_due_endpoints(table, _load(table), REGION, now=NOW + 60) == []
+    # ... and the first tick after the lease checks it again
+    later = NOW + scheduler.SCHEDULE_LEASE_SECONDS
+    assert [endpoint['endpoint_id'] for endpoint in select_due_endpoints(table, _load(table), REGION, now=later)] == ['endpoint-1']
+
+
+def test_late_completion_does_not_undo_a_new_claim(table):
+    _put(table, 'endpoint-1', next_due=NOW - 5)
+    [stale] = select_due_endpoints(table, _load(table), REGION, now=NOW)
+    later = NOW + scheduler.SCHEDULE_LEASE_SECONDS
+    select_due_endpoints(table, _load(table), REGION, now=later)
+
+    assert complete_checks(table, [stale], REGION) == 0
+    assert _due_time(table, 'endpoint-1') == later + scheduler.SCHEDULE_LEASE_SECONDS
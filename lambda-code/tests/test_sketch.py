@@ -0,0 +1,76 @@
+import math
+import os
+import random
+
+import pytest
+
+from sketch import Sketch, RELATIVE_ACCURACY
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+LAMBDA_SKETCH = os.path.join(ROOT, 'lambda-code', 'monitoring-lambda-code', 'sketch.py')
+API_SKETCH = os.path.join(ROOT, 'api-backend', 'app', 'utils', 'sketch.py')
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_lambda_and_api_copies_are_identical():
+    # The Lambda writes sketches the API decodes; the two copies must not drift
+    with open(LAMBDA_SKETCH, 'rb') as lambda_file, open(API_SKETCH, 'rb') as api_file:
+        assert lambda_file.read() == api_file.read()
+
+
+def test_round_trip():
+    sketch = Sketch()
+    for value in (0.0, 0.2, 1.0, 3.5, 120.0, 120.0, 60000.0):
+        sketch.add(value)
+    decoded = Sketch.from_bytes(sketch.to_bytes())
+    assert decoded.bins == sketch.bins
+    assert decoded.zero_count == sketch.zero_count
+    assert decoded.to_bytes() == sketch.to_bytes()
+
+
+def test_empty_sketch():
+    sketch = Sketch.from_bytes(Sketch().to_bytes())
+    assert sketch.count == 0
+    assert sketch.quantile(0.5) is None
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1.2) for _ in range(20000)]
+    sketch = Sketch()
+    for value in values:
+        sketch.add(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= RELATIVE_ACCURACY * exact
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(11)
+    values = [rng.uniform(1, 1000) for _ in range(5000)]
+    whole, left, right = Sketch(), Sketch(), Sketch()
+    for index, value in enumerate(values):
+        whole.add(value)
+        (left if index % 2 else right).add(value)
+    left.merge(right)
+    assert left.to_bytes() == whole.to_bytes()
+
+
+def test_zero_values_count_as_zero():
+    sketch = Sketch()
+    for _ in range(10):
+        sketch.add(0.0)
+    sketch.add(50.0)
+    assert sketch.quantile(0.5) == 0.0
+    assert math.isclose(sketch.quantile(1.0), 50.0, rel_tol=RELATIVE_ACCURACY)
+
+
+def test_unknown_version_is_rejected():
+    data = bytearray(Sketch().to_bytes())
+    data[0] = 99
+    with pytest.raises(ValueError):
+        Sketch.from_bytes(bytes(data))
@@ -33,7 +33,7 @@ variable "lambda_runtime" {
 variable "schedule_expression" {
   description = "The schedule expression for the Lambda function"
   type        = string
-  default     = "rate(5 minutes)"
+  default     = "rate(1 minute)"
 }
 variable "lambda_role_name" {
   description = "The name of the IAM role for the Lambda function"
@@ -66,4 +66,29 @@ variable "lambda_basic_execution_policy" {
 variable "lambda_function_tags" {
     description = "Resource tags"
     type        = map(string)
-}
\ No newline at end of file
+}
+variable "rollups_table_name" {
+  description = "The name of the DynamoDB table for endpoint rollups"
+  type        = string
+  default     = "dev-us-east-1-central-api-rollups-dynamodb-table"
+}
+variable "status_table_name" {
+  description = "The name of the DynamoDB table for the latest endpoint status"
+  type        = string
+  default     = "dev-us-east-1-central-api-status-dynamodb-table"
+}
+variable "alert_sns_topic_arn" {
+  description = "SNS topic receiving alert events; alerts are only logged when empty"
+  type        = string
+  default     = ""
+}
+variable "write_mode" {
+  description = "central writes logs and rollups to the central region; local writes them to this region's Global Table replica"
+  type        = string
+  default     = "central"
+}
+variable "users_table_name" {
+  description = "Users table in the central region, read for each owner's plan retention."
+  type        = string
+  default     = "dev-us-east-1-cognito-users-table-dynamodb-table"
+}
@@ -7,6 +7,11 @@ module "lambda_function" {
     lambda_runtime = var.lambda_runtime
     endpoints_table_name = var.endpoints_table_name
     logs_table_name = var.logs_table_name
+    users_table_name = var.users_table_name
+    write_mode = var.write_mode
+    alert_sns_topic_arn = var.alert_sns_topic_arn
+    status_table_name = var.status_table_name
+    rollups_table_name = var.rollups_table_name
     schedule_expression = var.schedule_expression
     tags = var.lambda_function_tags
    
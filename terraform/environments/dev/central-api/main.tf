@@ -22,6 +22,12 @@ module "endpoints_dynamodb" {
   tags              = var.endpoints_table_dynamodb_tags
 }
 
+# Shared by every API instance so a next_token issued by one is accepted by all
+resource "random_password" "cursor_signing_key" {
+  length  = 48
+  special = false
+}
+
 module "fastapi_lambda" {
   source               = "../../../modules/fastapi_lambda"
   environment          = var.environment
@@ -31,26 +37,97 @@ module "fastapi_lambda" {
   lambda_runtime       = var.lambda_runtime
   user_table_name      = var.user_table_name
   endpoint_table_name  = var.endpoint_table_name
+  endpoint_user_index_name = var.gsi_name
   dynamodb_table_name = var.logs_table_name
+  rollups_table_name   = module.rollups_dynamodb.table_name
+  status_table_name    = module.status_dynamodb.table_name
+  archive_bucket_name  = module.log_archive.bucket_name
+  archive_bucket_arn   = module.log_archive.bucket_arn
+  archive_after_days   = var.archive_after_days
+  cursor_signing_key   = random_password.cursor_signing_key.result
   cognito_region       = var.cognito_region
   cognito_user_pool_id = var.cognito_user_pool_id
   cognito_client_id    = var.cognito_client_id
   depends_on = [
     module.dynamodb,
     module.endpoints_dynamodb,
-    module.logs_dynamodb
+    module.logs_dynamodb,
+    module.rollups_dynamodb,
+    module.status_dynamodb,
+    module.log_archive
   ]
 }
 
+# Logs keyed by "<user_id>#<endpoint_id>" and "<timestamp>#<region>". DynamoDB
+# cannot change a table's keys, so this is a new table next to the log_id
+# keyed one, which keeps its state address below instead of being replaced.
+# Cutover:
+#   1. Apply this stack: the keyed table is created, the legacy one is untouched.
+#   2. Point logs_table_name here and in every monitoring region at
+#      module.logs_dynamodb's table and deploy the API and the Lambdas. New
+#      checks now land in the keyed table only.
+#   3. Copy the history: python -m app.db.log_migration --source <legacy table>
+#      from api-backend/ with DYNAMODB_TABLE set to the keyed table. Re-running
+#      it is safe, so run it again once every Lambda has the new table name.
+#   4. Once the copy is verified, set legacy_logs_deletion_protection to false,
+#      apply, then remove legacy_logs_dynamodb and the moved block.
 module "logs_dynamodb" {
   source                   = "../../../modules/logs_dynamodb"
   environment              = var.environment
   table_name_prefix        = var.logs_table_name_prefix
+  table_name_suffix        = "keyed-logs"
   region                   = var.region
   billing_mode             = var.billing_mode
   hash_key                 = var.logs_table_hash_key
+  range_key                = var.logs_table_range_key
   attributes               = var.attributes
   global_secondary_indexes = var.global_secondary_indexes
+  replica_regions          = var.replica_regions
+  tags                     = var.logs_table_dynamodb_tags
+}
+
+# The log_id keyed table created before the key change, kept as it is
+moved {
+  from = module.logs_dynamodb.aws_dynamodb_table.logs_table
+  to   = module.legacy_logs_dynamodb.aws_dynamodb_table.logs_table
+}
+
+module "legacy_logs_dynamodb" {
+  source                   = "../../../modules/logs_dynamodb"
+  environment              = var.environment
+  table_name_prefix        = var.logs_table_name_prefix
+  region                   = var.region
+  billing_mode             = var.billing_mode
+  hash_key                 = "log_id"
+  attributes               = var.legacy_logs_attributes
+  global_secondary_indexes = var.legacy_logs_global_secondary_indexes
+  deletion_protection      = var.legacy_logs_deletion_protection
   tags                     = var.logs_table_dynamodb_tags
 }
 
+module "rollups_dynamodb" {
+  source            = "../../../modules/rollups_dynamodb"
+  environment       = var.environment
+  region            = var.region
+  table_name_prefix = var.rollups_table_name_prefix
+  billing_mode      = var.billing_mode
+  replica_regions   = var.replica_regions
+  tags              = var.rollups_table_dynamodb_tags
+}
+
+module "status_dynamodb" {
+  source            = "../../../modules/status_dynamodb"
+  environment       = var.environment
+  region            = var.region
+  table_name_prefix = var.status_table_name_prefix
+  billing_mode      = var.billing_mode
+  tags              = var.status_table_dynamodb_tags
+}
+
+module "log_archive" {
+  source             = "../../../modules/log_archive"
+  environment        = var.environment
+  region             = var.region
+  bucket_name_prefix = var.function_name_prefix
+  tags               = var.logs_table_dynamodb_tags
+}
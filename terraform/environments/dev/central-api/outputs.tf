@@ -22,4 +22,17 @@ output "endpoints_dynamodb_name" {
   value       = module.endpoints_dynamodb.table_name
 }
 
+output "rollups_dynamodb_name" {
+  description = "The name of the rollups DynamoDB table"
+  value       = module.rollups_dynamodb.table_name
+}
+
+output "status_dynamodb_name" {
+  description = "The name of the endpoint status DynamoDB table"
+  value       = module.status_dynamodb.table_name
+}
 
+output "logs_dynamodb_name" {
+  description = "The name of the keyed logs DynamoDB table, for logs_table_name in every stack"
+  value       = module.logs_dynamodb.logs_table_name
+}
@@ -151,10 +151,18 @@ variable "logs_table_name_prefix" {
   default     = "central-api"
 }
 
+# Logs are keyed by "<user_id>#<endpoint_id>" and sorted by "<timestamp>#<region>",
+# so a time range for one endpoint is a key condition and ownership is part of the key
 variable "logs_table_hash_key" {
   description = "The hash key for the DynamoDB table."
   type        = string
-  default     = "log_id"
+  default     = "endpoint_key"
+}
+
+variable "logs_table_range_key" {
+  description = "The range key for the DynamoDB table."
+  type        = string
+  default     = "timestamp_key"
 }
 
 variable "attributes" {
@@ -163,6 +171,10 @@ variable "attributes" {
     name = string
     type = string
   }))
+  default = [
+    { name = "endpoint_key", type = "S" },
+    { name = "timestamp_key", type = "S" }
+  ]
 }
 
 variable "global_secondary_indexes" {
@@ -173,6 +185,41 @@ variable "global_secondary_indexes" {
     range_key       = optional(string)
     projection_type = string
   }))
+  default = []
+}
+
+# The log_id keyed table from before the key change; these must describe it
+# as deployed (move any attributes/global_secondary_indexes tfvars overrides
+# for it here), or Terraform will try to change it
+variable "legacy_logs_attributes" {
+  description = "The attributes of the legacy log_id keyed logs table."
+  type = list(object({
+    name = string
+    type = string
+  }))
+  default = [
+    { name = "log_id", type = "S" },
+    { name = "endpoint_id", type = "S" }
+  ]
+}
+
+variable "legacy_logs_global_secondary_indexes" {
+  description = "The global secondary indexes of the legacy log_id keyed logs table."
+  type = list(object({
+    name            = string
+    hash_key        = string
+    range_key       = optional(string)
+    projection_type = string
+  }))
+  default = [
+    { name = "endpoint_id-index", hash_key = "endpoint_id", projection_type = "ALL" }
+  ]
+}
+
+variable "legacy_logs_deletion_protection" {
+  description = "Keep the legacy logs table from being deleted until its logs are copied to the keyed table."
+  type        = bool
+  default     = true
 }
 
 variable "logs_table_dynamodb_tags" {
@@ -180,6 +227,40 @@ variable "logs_table_dynamodb_tags" {
   type        = map(string)
 }
 
+########  Rollups DynamoDB Table Configuration Variables #########
+
+variable "rollups_table_name_prefix" {
+  description = "The prefix for the DynamoDB table name."
+  type        = string
+  default     = "central-api"
+}
+
+variable "rollups_table_dynamodb_tags" {
+  description = "Resource tags"
+  type        = map(string)
+  default     = {}
+}
+
+variable "replica_regions" {
+  description = "Monitoring regions that get Global Table replicas of the logs and rollups tables for region-local writes."
+  type        = list(string)
+  default     = []
+}
+
+########  Endpoint Status DynamoDB Table Configuration Variables #########
+
+variable "status_table_name_prefix" {
+  description = "The prefix for the DynamoDB table name."
+  type        = string
+  default     = "central-api"
+}
+
+variable "status_table_dynamodb_tags" {
+  description = "Resource tags"
+  type        = map(string)
+  default     = {}
+}
+
 variable "cognito_region" {
   description = "The region for the Cognito user pool."
   type        = string
@@ -195,35 +276,8 @@ variable "cognito_client_id" {
   type        = string
 }
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+variable "archive_after_days" {
+  description = "Logs older than this many days are moved from DynamoDB to the log archive"
+  type        = number
+  default     = 30
+}
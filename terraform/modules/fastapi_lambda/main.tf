@@ -24,11 +24,26 @@ resource "aws_iam_role_policy_attachment" "lambda_dynamodb_access" {
   policy_arn = "arn:aws:iam::aws:policy/AmazonDynamoDBFullAccess"
 }
 
+# Lets the compaction run write archived partitions and the API read them
+data "aws_iam_policy_document" "lambda_archive_policy" {
+  statement {
+    actions   = ["s3:GetObject", "s3:PutObject", "s3:DeleteObject"]
+    resources = ["${var.archive_bucket_arn}/*"]
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_archive" {
+  name   = "${var.environment}-${var.region}-${var.function_name_prefix}-lambda-archive"
+  role   = aws_iam_role.lambda_role.id
+  policy = data.aws_iam_policy_document.lambda_archive_policy.json
+}
+
 resource "aws_lambda_function" "fastapi_lambda" {
   function_name = "${var.environment}-${var.region}-${var.function_name_prefix}-lambda-function"
   role = aws_iam_role.lambda_role.arn
   handler = var.lambda_handler
   runtime = var.lambda_runtime
+  timeout = var.timeout
 
   filename = "${path.module}/empty.zip"
   source_code_hash = filebase64sha256("${path.module}/empty.zip")
@@ -40,10 +55,18 @@ resource "aws_lambda_function" "fastapi_lambda" {
     variables = {
       USER_TABLE_NAME = var.user_table_name
       ENDPOINT_TABLE_NAME = var.endpoint_table_name
+      ENDPOINT_USER_INDEX_NAME = var.endpoint_user_index_name
       COGNITO_REGION = var.cognito_region
       COGNITO_USER_POOL_ID = var.cognito_user_pool_id
       COGNITO_CLIENT_ID = var.cognito_client_id
       DYNAMODB_TABLE = var.dynamodb_table_name
+      ROLLUPS_TABLE_NAME = var.rollups_table_name
+      STATUS_TABLE_NAME = var.status_table_name
+      ARCHIVE_LOCATION = "s3://${var.archive_bucket_name}/logs"
+      ARCHIVE_AFTER_DAYS = var.archive_after_days
+      RETENTION_POLICIES = var.retention_policies
+      CURSOR_SIGNING_KEY = var.cursor_signing_key
+      ADMIN_USER_IDS = var.admin_user_ids
 
     }
   }
@@ -62,12 +85,24 @@ resource "aws_lambda_function" "fastapi_lambda" {
   
 }
 
+# The same function runs log compaction when invoked with {"job": "compact-logs"}
+resource "aws_cloudwatch_event_rule" "compaction_schedule" {
+  name                = "${var.environment}-${var.function_name_prefix}-compaction-schedule"
+  schedule_expression = var.compaction_schedule_expression
+  description         = "Move aged logs from DynamoDB to the log archive"
+}
 
+resource "aws_cloudwatch_event_target" "compaction_target" {
+  rule      = aws_cloudwatch_event_rule.compaction_schedule.name
+  target_id = "${var.environment}-${var.function_name_prefix}-compaction"
+  arn       = aws_lambda_function.fastapi_lambda.arn
+  input     = jsonencode({ job = "compact-logs" })
+}
 
-
-
-
-
-
-
-
+resource "aws_lambda_permission" "allow_compaction_schedule" {
+  statement_id  = "${var.environment}-allow-compaction-schedule"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.fastapi_lambda.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.compaction_schedule.arn
+}
@@ -39,6 +39,11 @@ variable "endpoint_table_name" {
   type        = string
 }
 
+variable "endpoint_user_index_name" {
+  description = "The name of the endpoints table's user_id GSI."
+  type        = string
+}
+
 variable "cognito_region" {
   description = "The region for the Cognito user pool."
   type        = string
@@ -59,14 +64,58 @@ variable "dynamodb_table_name" {
   type        = string
 }
 
+variable "rollups_table_name" {
+  description = "The name of the DynamoDB table for endpoint rollups."
+  type        = string
+}
 
+variable "status_table_name" {
+  description = "The name of the DynamoDB table for the latest endpoint status."
+  type        = string
+}
 
+variable "timeout" {
+  description = "Timeout in seconds; also bounds each compaction run."
+  type        = number
+  default     = 300
+}
 
+variable "archive_bucket_name" {
+  description = "The name of the S3 bucket holding archived logs."
+  type        = string
+}
 
+variable "archive_bucket_arn" {
+  description = "The ARN of the S3 bucket holding archived logs."
+  type        = string
+}
 
+variable "archive_after_days" {
+  description = "Logs older than this many days are moved to the archive."
+  type        = number
+  default     = 30
+}
 
+variable "compaction_schedule_expression" {
+  description = "Schedule of the log compaction run."
+  type        = string
+  default     = "cron(15 3 * * ? *)"
+}
 
+variable "retention_policies" {
+  description = "JSON of retention days per plan ({plan: {logs, minute, hour, day}}); empty uses the built-in policies."
+  type        = string
+  default     = ""
+}
 
+variable "cursor_signing_key" {
+  description = "Key used to sign pagination cursors (next_token)."
+  type        = string
+  sensitive   = true
+}
 
-
-
+variable "admin_user_ids" {
+  description = "Comma-separated Cognito subs allowed to list every user; empty closes GET /users to everyone."
+  type        = string
+  default     = ""
+}
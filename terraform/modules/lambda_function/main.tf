@@ -31,12 +31,44 @@ resource "aws_iam_role_policy_attachment" "lambda_dynamodb_access"{
     policy_arn = "arn:aws:iam::aws:policy/AmazonDynamoDBFullAccess"
 }
 
+# Lets the coordinator invocation fan endpoint shards out to worker invocations of itself
+data "aws_iam_policy_document" "lambda_self_invoke_policy" {
+  statement {
+    actions   = ["lambda:InvokeFunction"]
+    resources = ["arn:aws:lambda:${var.region}:*:function:${var.environment}-${var.region}-lambda-function"]
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_self_invoke" {
+    name   = "${var.environment}-${var.region}-lambda-self-invoke"
+    role   = aws_iam_role.lambda_role.id
+    policy = data.aws_iam_policy_document.lambda_self_invoke_policy.json
+}
+
+# Lets the SNS notifier publish alert events when a topic is configured
+data "aws_iam_policy_document" "lambda_alerts_policy" {
+  count = var.alert_sns_topic_arn == "" ? 0 : 1
+  statement {
+    actions   = ["sns:Publish"]
+    resources = [var.alert_sns_topic_arn]
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_alerts" {
+    count  = var.alert_sns_topic_arn == "" ? 0 : 1
+    name   = "${var.environment}-${var.region}-lambda-alerts"
+    role   = aws_iam_role.lambda_role.id
+    policy = data.aws_iam_policy_document.lambda_alerts_policy[0].json
+}
+
 resource "aws_lambda_function" "lambda_function" {
     function_name = "${var.environment}-${var.region}-lambda-function"
     role = aws_iam_role.lambda_role.arn
     
     handler = var.lambda_handler
     runtime = var.lambda_runtime
+    timeout = var.timeout
+    memory_size = var.memory_size
 
     filename        = "${path.module}/empty.zip"
     source_code_hash = filebase64sha256("${path.module}/empty.zip")
@@ -49,6 +81,26 @@ resource "aws_lambda_function" "lambda_function" {
         variables = {
             ENDPOINTS_TABLE_NAME = var.endpoints_table_name
             LOGS_TABLE_NAME = var.logs_table_name
+            ROLLUPS_TABLE_NAME = var.rollups_table_name
+            STATUS_TABLE_NAME = var.status_table_name
+            USERS_TABLE_NAME = var.users_table_name
+            RETENTION_POLICIES = var.retention_policies
+            PROBE_CONCURRENCY = var.probe_concurrency
+            ENDPOINT_SCAN_SEGMENTS = var.endpoint_scan_segments
+            ENDPOINTS_PER_WORKER = var.endpoints_per_worker
+            MAX_WORKERS = var.max_workers
+            DEFAULT_CHECK_INTERVAL = var.default_check_interval
+            SCHEDULE_TOLERANCE_SECONDS = var.schedule_tolerance_seconds
+            SCHEDULE_LEASE_SECONDS = var.timeout
+            CENTRAL_REGION = var.central_region
+            WRITE_MODE = var.write_mode
+            PROBE_MEASUREMENT_MODE = var.default_measurement_mode
+            PROBE_DNS_CACHE_TTL = var.probe_dns_cache_ttl
+            ALERT_NOTIFIER = var.alert_sns_topic_arn == "" ? "log" : "sns"
+            ALERT_SNS_TOPIC_ARN = var.alert_sns_topic_arn
+            ALERT_FAILURE_THRESHOLD = var.alert_failure_threshold
+            ALERT_REGION_QUORUM = var.alert_region_quorum
+            ALERT_LATENCY_THRESHOLD_MS = var.alert_latency_threshold_ms
         }
     }
 
@@ -16,9 +16,99 @@ variable "environment" {
   default     = "dev"
 }
 variable "schedule_expression" {
-  description = "The schedule expression for the Lambda function."
+  description = "The schedule expression for the Lambda function; the API's minimum check_interval (60s) assumes one tick a minute."
   type        = string
-  default     = "rate(1 minutes)"
+  default     = "rate(1 minute)"
+}
+variable "timeout" {
+  description = "The Lambda timeout in seconds; the probe engine stops starting checks shortly before it, and endpoints claimed by an invocation that never finishes are retried after it."
+  type        = number
+  default     = 300
+}
+variable "memory_size" {
+  description = "The memory size for the Lambda function in MB."
+  type        = number
+  default     = 512
+}
+variable "probe_concurrency" {
+  description = "Maximum number of endpoint checks in flight per invocation."
+  type        = number
+  default     = 50
+}
+variable "endpoint_scan_segments" {
+  description = "Number of parallel scan segments used to load active endpoints."
+  type        = number
+  default     = 4
+}
+variable "endpoints_per_worker" {
+  description = "Target number of endpoints per worker invocation before the coordinator fans out."
+  type        = number
+  default     = 500
+}
+variable "max_workers" {
+  description = "Upper bound on worker invocations per schedule tick."
+  type        = number
+  default     = 50
+}
+variable "default_check_interval" {
+  description = "Check interval in seconds for endpoints that do not set check_interval."
+  type        = number
+  default     = 300
+}
+variable "schedule_tolerance_seconds" {
+  description = "Endpoints due within this many seconds of a tick are checked on that tick; about half the schedule period."
+  type        = number
+  default     = 30
+}
+variable "central_region" {
+  description = "Region of the central endpoints, status, logs and rollups tables."
+  type        = string
+  default     = "us-east-1"
+}
+variable "write_mode" {
+  description = "central writes logs and rollups to central_region; local writes them to the Global Table replica in this region."
+  type        = string
+  default     = "central"
+}
+variable "users_table_name" {
+  description = "Users table in the central region, read for each owner's plan; empty applies the Free retention to everyone."
+  type        = string
+  default     = ""
+}
+variable "retention_policies" {
+  description = "JSON of retention days per plan ({plan: {logs, minute, hour, day}}); empty uses the built-in policies."
+  type        = string
+  default     = ""
+}
+variable "default_measurement_mode" {
+  description = "Measurement mode for endpoints without one: cold (fresh DNS, TCP and TLS per check) or warm (reused connections)."
+  type        = string
+  default     = "cold"
+}
+variable "probe_dns_cache_ttl" {
+  description = "Seconds a resolved address is reused by warm checks."
+  type        = number
+  default     = 60
+}
+variable "alert_sns_topic_arn" {
+  description = "SNS topic receiving alert events; alerts are only logged when empty."
+  type        = string
+  default     = ""
+}
+variable "alert_failure_threshold" {
+  description = "Consecutive failed checks before a region counts an endpoint as down."
+  type        = number
+  default     = 3
+}
+variable "alert_region_quorum" {
+  description = "Regions that must see an endpoint down before a down alert is sent."
+  type        = number
+  default     = 2
+}
+variable "alert_latency_threshold_ms" {
+  description = "Response time in milliseconds that raises a latency alert; 0 disables it."
+  type        = number
+  default     = 0
 }
 variable "endpoints_table_name" {
   description = "The name of the DynamoDB table for endpoints."
@@ -28,6 +118,14 @@ variable "logs_table_name" {
   description = "The name of the DynamoDB table for logs."
   type        = string
 }
+variable "rollups_table_name" {
+  description = "The name of the DynamoDB table for endpoint rollups."
+  type        = string
+}
+variable "status_table_name" {
+  description = "The name of the DynamoDB table for the latest endpoint status."
+  type        = string
+}
 variable "tags"{
   description = "Resource tags"
   type = map(string)
@@ -0,0 +1,31 @@
+# Columnar day partitions of logs older than the hot retention window, written
+# by the central API's scheduled compaction run and read with ranged GETs.
+resource "aws_s3_bucket" "archive_bucket" {
+  bucket = "${var.environment}-${var.region}-${var.bucket_name_prefix}-log-archive"
+  tags   = var.tags
+}
+
+resource "aws_s3_bucket_public_access_block" "archive_bucket" {
+  bucket                  = aws_s3_bucket.archive_bucket.id
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+# Partitions are rarely read once written; move them to a cheaper class
+resource "aws_s3_bucket_lifecycle_configuration" "archive_bucket" {
+  bucket = aws_s3_bucket.archive_bucket.id
+
+  rule {
+    id     = "infrequent-access"
+    status = "Enabled"
+
+    filter {}
+
+    transition {
+      days          = var.infrequent_access_after_days
+      storage_class = "STANDARD_IA"
+    }
+  }
+}
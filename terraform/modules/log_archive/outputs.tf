@@ -0,0 +1,9 @@
+output "bucket_name" {
+  description = "Name of the log archive bucket"
+  value       = aws_s3_bucket.archive_bucket.bucket
+}
+
+output "bucket_arn" {
+  description = "ARN of the log archive bucket"
+  value       = aws_s3_bucket.archive_bucket.arn
+}
@@ -0,0 +1,26 @@
+variable "environment" {
+  description = "The environment name (e.g., dev, prod)"
+  type        = string
+}
+
+variable "region" {
+  description = "AWS region where the bucket will be created"
+  type        = string
+}
+
+variable "bucket_name_prefix" {
+  description = "Prefix for the archive bucket name"
+  type        = string
+}
+
+variable "infrequent_access_after_days" {
+  description = "Days after which archived partitions move to STANDARD_IA"
+  type        = number
+  default     = 30
+}
+
+variable "tags" {
+  description = "Tags for the archive bucket"
+  type        = map(string)
+  default     = {}
+}
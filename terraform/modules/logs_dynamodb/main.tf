@@ -1,8 +1,10 @@
 resource "aws_dynamodb_table" "logs_table" {
-  name         = "${var.environment}-${var.region}-${var.table_name_prefix}-logs-dynamodb-table"
+  name         = "${var.environment}-${var.region}-${var.table_name_prefix}-${var.table_name_suffix}-dynamodb-table"
   billing_mode = var.billing_mode
   hash_key     = var.hash_key
-  
+  range_key    = var.range_key
+
+  deletion_protection_enabled = var.deletion_protection
 
   # Define all attributes passed in the list
   dynamic "attribute" {
@@ -19,11 +21,30 @@ resource "aws_dynamodb_table" "logs_table" {
     content {
       name            = global_secondary_index.value.name
       hash_key        = global_secondary_index.value.hash_key
+      range_key       = global_secondary_index.value.range_key
       projection_type = global_secondary_index.value.projection_type
 
 
     }
   }
 
+  # Items carry an expires_at epoch set from the owner's plan retention
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  # Global Table replicas in the monitoring regions, so each region's Lambda
+  # can write locally (WRITE_MODE=local) and replicate to this region
+  stream_enabled   = length(var.replica_regions) > 0
+  stream_view_type = length(var.replica_regions) > 0 ? "NEW_AND_OLD_IMAGES" : null
+
+  dynamic "replica" {
+    for_each = var.replica_regions
+    content {
+      region_name = replica.value
+    }
+  }
+
   tags = var.tags
 }
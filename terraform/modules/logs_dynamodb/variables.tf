@@ -13,6 +13,18 @@ variable "table_name_prefix" {
   type        = string
 }
 
+variable "table_name_suffix" {
+  description = "Part of the table name after the prefix; a new key schema needs a new name, as DynamoDB cannot change keys in place"
+  type        = string
+  default     = "logs"
+}
+
+variable "deletion_protection" {
+  description = "Reject deletes of the table, including replacements from a key schema change"
+  type        = bool
+  default     = false
+}
+
 variable "billing_mode" {
   description = "DynamoDB billing mode"
   type        = string
@@ -24,6 +36,12 @@ variable "hash_key" {
   type        = string
 }
 
+variable "range_key" {
+  description = "Primary range (sort) key attribute name"
+  type        = string
+  default     = null
+}
+
 
 
 variable "attributes" {
@@ -49,3 +67,9 @@ variable "tags" {
   description = "Resource tags"
   type        = map(string)
 }
+
+variable "replica_regions" {
+  description = "Regions holding Global Table replicas of this table"
+  type        = list(string)
+  default     = []
+}
@@ -0,0 +1,40 @@
+# Pre-aggregated per-endpoint statistics at minute, hour and day granularity.
+# Items are keyed by "<user_id>#<endpoint_id>#<granularity>" and sorted by
+# "<bucket_start>#<region>" so any time range is answered from its buckets.
+resource "aws_dynamodb_table" "rollups_table" {
+  name         = "${var.environment}-${var.region}-${var.table_name_prefix}-rollups-dynamodb-table"
+  billing_mode = var.billing_mode
+
+  hash_key  = var.hash_key
+  range_key = var.range_key
+
+  attribute {
+    name = var.hash_key
+    type = "S"
+  }
+
+  attribute {
+    name = var.range_key
+    type = "S"
+  }
+
+  # Items carry an expires_at epoch set from the owner's plan retention
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  # Global Table replicas in the monitoring regions, so each region's Lambda
+  # can write locally (WRITE_MODE=local) and replicate to this region
+  stream_enabled   = length(var.replica_regions) > 0
+  stream_view_type = length(var.replica_regions) > 0 ? "NEW_AND_OLD_IMAGES" : null
+
+  dynamic "replica" {
+    for_each = var.replica_regions
+    content {
+      region_name = replica.value
+    }
+  }
+
+  tags = var.tags
+}
@@ -0,0 +1,9 @@
+output "table_name" {
+  description = "Name of the rollups DynamoDB table"
+  value       = aws_dynamodb_table.rollups_table.name
+}
+
+output "table_arn" {
+  description = "ARN of the rollups DynamoDB table"
+  value       = aws_dynamodb_table.rollups_table.arn
+}
@@ -0,0 +1,44 @@
+variable "environment" {
+  description = "The environment name (e.g., dev, prod)"
+  type        = string
+}
+
+variable "region" {
+  description = "AWS region where the table will be created"
+  type        = string
+}
+
+variable "table_name_prefix" {
+  description = "Prefix for the DynamoDB table name"
+  type        = string
+}
+
+variable "billing_mode" {
+  description = "Billing mode for the DynamoDB table"
+  type        = string
+  default     = "PAY_PER_REQUEST"
+}
+
+variable "hash_key" {
+  description = "Partition key: <user_id>#<endpoint_id>#<granularity>"
+  type        = string
+  default     = "rollup_key"
+}
+
+variable "range_key" {
+  description = "Sort key: <bucket_start>#<region>"
+  type        = string
+  default     = "bucket_key"
+}
+
+variable "tags" {
+  description = "Tags for the DynamoDB table"
+  type        = map(string)
+  default     = {}
+}
+
+variable "replica_regions" {
+  description = "Regions holding Global Table replicas of this table"
+  type        = list(string)
+  default     = []
+}
@@ -0,0 +1,21 @@
+# Latest check result per endpoint and region, overwritten on every check so
+# current state is a key lookup instead of a query over the logs table.
+resource "aws_dynamodb_table" "status_table" {
+  name         = "${var.environment}-${var.region}-${var.table_name_prefix}-status-dynamodb-table"
+  billing_mode = var.billing_mode
+
+  hash_key  = var.hash_key
+  range_key = var.range_key
+
+  attribute {
+    name = var.hash_key
+    type = "S"
+  }
+
+  attribute {
+    name = var.range_key
+    type = "S"
+  }
+
+  tags = var.tags
+}
@@ -0,0 +1,9 @@
+output "table_name" {
+  description = "Name of the endpoint status DynamoDB table"
+  value       = aws_dynamodb_table.status_table.name
+}
+
+output "table_arn" {
+  description = "ARN of the endpoint status DynamoDB table"
+  value       = aws_dynamodb_table.status_table.arn
+}
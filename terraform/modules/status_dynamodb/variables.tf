@@ -0,0 +1,38 @@
+variable "environment" {
+  description = "The environment name (e.g., dev, prod)"
+  type        = string
+}
+
+variable "region" {
+  description = "AWS region where the table will be created"
+  type        = string
+}
+
+variable "table_name_prefix" {
+  description = "Prefix for the DynamoDB table name"
+  type        = string
+}
+
+variable "billing_mode" {
+  description = "Billing mode for the DynamoDB table"
+  type        = string
+  default     = "PAY_PER_REQUEST"
+}
+
+variable "hash_key" {
+  description = "Partition key: the endpoint id"
+  type        = string
+  default     = "endpoint_id"
+}
+
+variable "range_key" {
+  description = "Sort key: the monitoring region"
+  type        = string
+  default     = "region"
+}
+
+variable "tags" {
+  description = "Tags for the DynamoDB table"
+  type        = map(string)
+  default     = {}
+}